@@ -3,8 +3,6 @@ from abc import ABC, abstractmethod
 import re
 from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
-import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import Dict, Any, List
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
@@ -12,11 +10,16 @@ from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 from pathlib import Path
 from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.embedding_registry import get_embedder
+from py_engineering_chat.util.chroma_search import search_chroma
 from py_engineering_chat.research.scan_codebase import scan_codebase
 from langchain_core.messages import AIMessage, HumanMessage
 from py_engineering_chat.util.command_parser import parse_commands
+from py_engineering_chat.util.context_packer import pack_context
 
 class BaseAgent(ABC):
+    model_name = "gpt-4-0125-preview"
+
     def __init__(self):
         self.store = {}
         
@@ -34,11 +37,11 @@ class BaseAgent(ABC):
         self.shadow_path = Path(self.shadow_dir)
         self.shadow_path.mkdir(parents=True, exist_ok=True)
         
-        # Initialize Chroma client
+        # Collections are opened on demand through the vector store pool
         chroma_db_path = self.shadow_path / '.chroma_db'
-        self.client = chromadb.PersistentClient(path=str(chroma_db_path))
+        self.chroma_db_path = str(chroma_db_path)
         
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = get_embedder()
         self.settings_manager = ChatSettingsManager()
 
     def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
@@ -47,19 +50,14 @@ class BaseAgent(ABC):
         return self.store[session_id]
 
     def search_context(self, collection_name, query):
-        try:
-            collection = self.client.get_collection(name=collection_name)
-            query_embedding = self.model.encode([query]).tolist()
-            results = collection.query(query_embeddings=query_embedding, n_results=3)
-            return results['documents'][0]
-        except Exception as e:
-            print(f"Error searching context: {str(e)}")
-            return []
+        # Same pipeline as @docs and @codebase: cached, diversified with MMR and optionally reranked
+        results = search_chroma(collection_name, query, n_results=3)
+        return results[0] if results else []
 
     def process_input(self, inputs):
         user_input = inputs['input']
-        context_data = parse_commands(user_input, self.settings_manager)
-        inputs['context'] = context_data['context']
+        context_data_list = parse_commands(user_input, self.settings_manager)
+        inputs['context'] = pack_context(context_data_list, model_name=self.model_name).text
         return inputs
 
     def create_prompt(self, prompt_type: str, inputs: Dict[str, Any]) -> str:
@@ -71,7 +69,7 @@ class BaseAgent(ABC):
 
     def select_model(self, task: str) -> ChatOpenAI:
         # Default model selection
-        return ChatOpenAI(temperature=0, model="gpt-4-0125-preview")
+        return ChatOpenAI(temperature=0, model=self.model_name)
 
     def process_structured_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         # Basic implementation for processing structured input
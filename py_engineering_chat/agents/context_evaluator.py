@@ -2,10 +2,32 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableSequence
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from langchain.output_parsers import ResponseSchema, StructuredOutputParser, PydanticOutputParser
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+import threading
+from py_engineering_chat.util.context_rules import evaluate_path_rules
+
+EVALUATION_GUIDELINES = (
+    "Consider the following guidelines:\n"
+    "- Files and folders likely to be checked into git are generally important\n"
+    "- Exclude files and folders in directories like node_modules, composer dependencies, python modules, build artifacts\n"
+    "- Exclude database files (e.g., .sql, .db)\n"
+    "- Include source code files, configuration files, and documentation\n\n"
+)
+
+class PathDecision(BaseModel):
+    path: str = Field(..., description="The path exactly as it was given")
+    is_contextual: bool = Field(..., description="Whether the path is likely to add context")
+    reason: str = Field(..., description="Reason for the decision")
+
+class PathDecisions(BaseModel):
+    decisions: List[PathDecision] = Field(..., description="One decision for every path that was given")
 
 class ContextEvaluator:
-    def __init__(self):
+    def __init__(self, decision_cache=None, use_rules=True):
+        self.decision_cache = decision_cache
+        self.use_rules = use_rules
         self.llm = ChatOpenAI(temperature=0, model="gpt-4o-mini")
 
         response_schemas = [
@@ -16,11 +38,7 @@ class ContextEvaluator:
         
         self.evaluation_prompt = ChatPromptTemplate.from_template(
             "You are an AI assistant focused on evaluating file or folder paths to determine if they are likely to add context to a codebase analysis. "
-            "Consider the following guidelines:\n"
-            "- Files and folders likely to be checked into git are generally important\n"
-            "- Exclude files and folders in directories like node_modules, composer dependencies, python modules, build artifacts\n"
-            "- Exclude database files (e.g., .sql, .db)\n"
-            "- Include source code files, configuration files, and documentation\n\n"
+            + EVALUATION_GUIDELINES +
             "Given the path: {path}\n"
             "Type: {path_type} (file or folder)\n"
             "{format_instructions}\n"
@@ -28,21 +46,101 @@ class ContextEvaluator:
         )
         
         self.evaluation_chain = self.evaluation_prompt | self.llm | self.output_parser
+
+        # Batch variant: classify every entry of a directory in a single structured-output call
+        self.batch_output_parser = PydanticOutputParser(pydantic_object=PathDecisions)
+        self.batch_evaluation_prompt = ChatPromptTemplate.from_template(
+            "You are an AI assistant focused on evaluating file or folder paths to determine if they are likely to add context to a codebase analysis. "
+            + EVALUATION_GUIDELINES +
+            "Evaluate each of the following {path_type} paths independently:\n"
+            "{paths}\n\n"
+            "{format_instructions}\n"
+            "Provide one evaluation per path:"
+        )
+        self.batch_evaluation_chain = self.batch_evaluation_prompt | self.llm | self.batch_output_parser
         
         self.total_evaluations = 0
+        self.total_requests = 0
         self.contextual_count = 0
+        self.rule_decisions = 0
+        # The scan pipeline evaluates paths from several worker threads
+        self._stats_lock = threading.Lock()
+
+    def _decide_locally(self, path: str, path_type: str) -> Optional[tuple[bool, str]]:
+        """Answer from the rule layer or the decision cache, or return None if the LLM is needed."""
+        # Deterministic rules settle known source files and artifacts without a round trip
+        if self.use_rules:
+            decision = evaluate_path_rules(path, path_type)
+            if decision is not None:
+                with self._stats_lock:
+                    self.rule_decisions += 1
+                return decision
+
+        # Then reuse any earlier LLM decision for the same path pattern
+        if self.decision_cache is not None:
+            return self.decision_cache.get(path, path_type)
+        return None
+
+    def _record(self, path: str, path_type: str, is_contextual: bool, reason: str):
+        with self._stats_lock:
+            self.total_evaluations += 1
+            if is_contextual:
+                self.contextual_count += 1
+        if self.decision_cache is not None:
+            self.decision_cache.set(path, path_type, is_contextual, reason)
 
     def is_contextual(self, path: str, path_type: str) -> tuple[bool, str]:
+        decision = self._decide_locally(path, path_type)
+        if decision is not None:
+            return decision
+
         result = self.evaluation_chain.invoke({
             "path": path,
             "path_type": path_type,
             "format_instructions": self.output_parser.get_format_instructions()
         })
-        self.total_evaluations += 1
-        if result['is_contextual']:
-            self.contextual_count += 1
+        with self._stats_lock:
+            self.total_requests += 1
+        self._record(path, path_type, result['is_contextual'], result['reason'])
         return result['is_contextual'], result['reason']
 
+    def evaluate_batch(self, paths: List[str], path_type: str, max_batch_size: int = 50) -> Dict[str, tuple[bool, str]]:
+        """
+        Classify many paths of the same type, typically the entries of one directory.
+        Paths the rules or cache can answer never reach the LLM; the rest are sent
+        in groups of max_batch_size per structured-output request.
+        """
+        decisions = {}
+        pending = []
+        for path in paths:
+            decision = self._decide_locally(path, path_type)
+            if decision is not None:
+                decisions[path] = decision
+            else:
+                pending.append(path)
+
+        for start in range(0, len(pending), max_batch_size):
+            group = pending[start:start + max_batch_size]
+            result = self.batch_evaluation_chain.invoke({
+                "paths": "\n".join(f"- {path}" for path in group),
+                "path_type": path_type,
+                "format_instructions": self.batch_output_parser.get_format_instructions()
+            })
+            with self._stats_lock:
+                self.total_requests += 1
+
+            for decision in result.decisions:
+                if decision.path in group and decision.path not in decisions:
+                    decisions[decision.path] = (decision.is_contextual, decision.reason)
+                    self._record(decision.path, path_type, decision.is_contextual, decision.reason)
+
+            # The model occasionally drops or rewrites a path; ask about those one at a time
+            for path in group:
+                if path not in decisions:
+                    decisions[path] = self.is_contextual(path, path_type)
+
+        return decisions
+
     @property
     def contextual_ratio(self):
         return self.contextual_count / self.total_evaluations if self.total_evaluations > 0 else 0
\ No newline at end of file
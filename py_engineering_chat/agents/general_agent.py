@@ -12,10 +12,12 @@ from prompt_toolkit import PromptSession
 from py_engineering_chat.util.file_completer import FileCompleter
 from py_engineering_chat.util.enter_key_bindings import kb
 from py_engineering_chat.util.context_model import ContextData
+from py_engineering_chat.util.context_packer import pack_context
+from py_engineering_chat.util.retrieval_cache import get_retrieval_cache
 from py_engineering_chat.tools.custom_tools import get_tools
 from py_engineering_chat.util.logger_util import get_configured_logger
 from py_engineering_chat.util.tiered_memory import TieredMemory
-from sentence_transformers import SentenceTransformer
+from py_engineering_chat.util.embedding_registry import get_embedder
 import time
 
 class State(TypedDict):
@@ -23,11 +25,13 @@ class State(TypedDict):
     context: str
     edit_mode: bool
 
+MODEL_NAME = "gpt-4"
+
 class GeneralAgent:
     def __init__(self):
         self.graph_builder = StateGraph(State)
         self.tiered_memory = TieredMemory()
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = get_embedder()
         self.logger = get_configured_logger(__name__)
         self.edit_mode = False  # Default to read-only mode
         self.setup_graph()
@@ -55,7 +59,7 @@ class GeneralAgent:
         Respond to the user's request:
         """)
 
-        llm = ChatOpenAI(temperature=0, model_name="gpt-4", verbose=False)
+        llm = ChatOpenAI(temperature=0, model_name=MODEL_NAME, verbose=False)
         tools = get_tools()
         llm_with_tools = llm.bind_tools(tools)
         llm_with_prompt = prompt | llm_with_tools
@@ -89,16 +93,21 @@ class GeneralAgent:
         metadata = {"role": role, "timestamp": time.time()}
         self.tiered_memory.add_memory(content, metadata, embedding)
 
-    def get_context(self, query: str, n_results: int = 5) -> str:
+    def get_context(self, query: str, n_results: int = 5) -> ContextData:
         query_embedding = self.embedding_model.encode([query])[0].tolist()
         context = self.tiered_memory.get_context(query_embedding, n_results)
-        return "\n".join([f"{item['metadata']['role']}: {item['content']}" for item in context])
+        return ContextData(context=[f"{item['metadata']['role']}: {item['content']}" for item in context],
+                           context_description="Relevant memory context")
 
     def toggle_edit_mode(self):
         self.edit_mode = not self.edit_mode
         mode = "enabled" if self.edit_mode else "disabled"
         print(f"Edit mode {mode}")
 
+    def print_cache_stats(self):
+        cache = get_retrieval_cache()
+        print(f"Retrieval cache: {cache.summary()}" if cache else "Retrieval cache is disabled.")
+
     def run_conversation(self):
         state = {"messages": [], "context": "", "edit_mode": self.edit_mode}
         config = {"configurable": {"thread_id": "1"}}
@@ -106,6 +115,7 @@ class GeneralAgent:
 
         print("Welcome to the General Agent! Type 'exit' to end the conversation.")
         print("Type '/toggle_edit' to switch between read-only and edit modes.")
+        print("Type '/cache_stats' to see how often searches were served from the retrieval cache.")
 
         while True:
             try:
@@ -117,17 +127,23 @@ class GeneralAgent:
                     self.toggle_edit_mode()
                     state["edit_mode"] = self.edit_mode
                     continue
+                elif user_input.lower() == '/cache_stats':
+                    self.print_cache_stats()
+                    continue
 
                 context_data_list = parse_commands(user_input, ChatSettingsManager())
-                context_strings = [context_data.toString() for context_data in context_data_list]
-                state["context"] = " ".join(context_strings)
 
                 # Add user input to memory
                 self.add_to_memory("user", user_input)
 
                 # Get relevant context from memory
                 memory_context = self.get_context(user_input)
-                state["context"] += f"\nRelevant memory context:\n{memory_context}"
+
+                # Commands first, memory last; whatever exceeds the model's budget is dropped
+                packed = pack_context(context_data_list + [memory_context], model_name=MODEL_NAME)
+                state["context"] = packed.text
+                if packed.dropped:
+                    self.logger.debug(f"Context packing dropped {len(packed.dropped)} snippets: {packed.summary()}")
 
                 state["messages"].append(HumanMessage(content=user_input))
 
@@ -9,6 +9,10 @@ from py_engineering_chat.research.research import crawl_and_store
 from py_engineering_chat.research.list_collections import list_collections, list_collection_content
 from py_engineering_chat.util.add_codebase import add_codebase
 from py_engineering_chat.research.scan_codebase import scan_codebase
+from py_engineering_chat.research.watch_project import watch_project
+from py_engineering_chat.research.benchmark_embeddings import benchmark_embedding_backends
+from py_engineering_chat.research.benchmark_vector_stores import benchmark_vector_stores
+from py_engineering_chat.util.embedding_server import serve_embeddings, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS
 from py_engineering_chat.agents.general_agent import run_continuous_conversation  # Import the new function
 from py_engineering_chat.util.logger_util import get_configured_logger  # Import the logger utility
 import requests
@@ -74,9 +78,58 @@ def add_codebase_command(project_name, directory, github_origin):
 @click.argument('project_name')
 @click.option('--skip-summarization', is_flag=False, default=False, help='Skip model summarization')
 @click.option('--max-file-count', type=int, default=-1, help='Maximum number of files to process')
-def scan_project(project_name, skip_summarization, max_file_count):
-    """Scan a project's codebase and store in Chroma."""
-    scan_codebase(project_name, skip_summarization, max_file_count)
+@click.option('--incremental', is_flag=True, default=False, help='Only re-embed files that changed since the last scan')
+@click.option('--batch-size', type=int, default=32, help='Number of files to embed and store per batch')
+@click.option('--batch-token-budget', type=int, default=None, help='Flush a batch early once it holds roughly this many tokens')
+@click.option('--reader-workers', type=int, default=4, help='Number of threads reading and hashing files')
+@click.option('--evaluator-workers', type=int, default=4, help='Number of concurrent context evaluations')
+@click.option('--since-last', is_flag=True, default=False, help='Only reindex paths changed since the last indexed commit')
+@click.option('--resume', is_flag=True, default=False, help='Continue an interrupted scan from its last checkpoint')
+@click.option('--no-progress', is_flag=True, default=False, help='Do not show the live progress display')
+def scan_project(project_name, skip_summarization, max_file_count, incremental, batch_size, batch_token_budget,
+                 reader_workers, evaluator_workers, since_last, resume, no_progress):
+    """Scan a project's codebase (its shadow clone, if it has one) and store in Chroma."""
+    scan_codebase(project_name, skip_summarization, max_file_count, incremental=incremental,
+                  batch_size=batch_size, batch_token_budget=batch_token_budget,
+                  reader_workers=reader_workers, evaluator_workers=evaluator_workers,
+                  since_last=since_last, resume=resume, progress=not no_progress)
+
+@cli.command(name='watch-project')
+@click.argument('project_name')
+@click.option('--debounce', type=float, default=1.0, help='Seconds without changes before the index is updated')
+@click.option('--poll-interval', type=float, default=2.0, help='Seconds between scans when polling for changes')
+@click.option('--polling', is_flag=True, default=False, help='Poll the directory instead of using filesystem events')
+def watch_project_command(project_name, debounce, poll_interval, polling):
+    """Watch the directory scan-project indexes (the shadow clone, if any) and keep the collection up to date."""
+    watch_project(project_name, debounce_seconds=debounce, poll_interval=poll_interval, use_polling=polling)
+
+@cli.command()
+@click.option('--model', default=None, help='Embedding model to serve (defaults to the embedding_model setting)')
+@click.option('--device', default=None, help='Device to load the model on, e.g. cpu or cuda')
+@click.option('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE, help='Maximum number of texts per micro-batch')
+@click.option('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS, help='How long to wait for more requests before encoding a batch')
+def embedding_server(model, device, max_batch_size, max_wait_ms):
+    """Serve one shared embedding model to every local process over a unix socket."""
+    serve_embeddings(model, device, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+@cli.command()
+@click.option('--project', 'project_name', default=None, help='Project whose files are used as sample text (defaults to this package)')
+@click.option('--backend', 'backends', multiple=True, default=['onnx-int8'], help='Backend to compare against sentence_transformers')
+@click.option('--sample-size', type=int, default=512, help='Number of chunks to encode')
+@click.option('--batch-size', type=int, default=32, help='Encode batch size')
+def benchmark_embeddings(project_name, backends, sample_size, batch_size):
+    """Compare embedding backend throughput and agreement with the FP32 vectors."""
+    benchmark_embedding_backends(project_name, backends=backends, sample_size=sample_size, batch_size=batch_size)
+
+@cli.command(name='benchmark-vector-stores')
+@click.option('--backend', 'backends', multiple=True, default=['numpy', 'chroma'], help='Vector store to benchmark')
+@click.option('--count', type=int, default=20000, help='Number of vectors to store')
+@click.option('--dim', type=int, default=384, help='Vector dimension')
+@click.option('--queries', type=int, default=200, help='Number of queries to time')
+@click.option('--k', type=int, default=10, help='Results per query')
+def benchmark_vector_stores_command(backends, count, dim, queries, k):
+    """Compare the NumPy and Chroma vector stores on build, open and query time."""
+    benchmark_vector_stores(backends=backends, count=count, dim=dim, queries=queries, k=k)
 
 @cli.command()
 @click.argument('url')
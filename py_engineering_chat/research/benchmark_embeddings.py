@@ -0,0 +1,78 @@
+import time
+import numpy as np
+from pathlib import Path
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.code_chunker import chunk_file
+from py_engineering_chat.util.embedding_registry import get_embedding_model, DEFAULT_EMBEDDING_BACKEND
+from py_engineering_chat.util.file_enumerator import FileEnumerator
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+def collect_sample_texts(directory, sample_size=512):
+    """Chunk files from directory the way scan-project does, until sample_size chunks are collected."""
+    texts = []
+    for relative_path in sorted(FileEnumerator(directory).list_files()):
+        if not relative_path.endswith(('.py', '.js', '.ts', '.go', '.java', '.rs', '.txt', '.md')):
+            continue
+        try:
+            content = (Path(directory) / relative_path).read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            continue
+        texts.extend(chunk.content for chunk in chunk_file(relative_path, content))
+        if len(texts) >= sample_size:
+            break
+    return texts[:sample_size]
+
+def _time_encode(model, texts, batch_size):
+    # Warm up first so one-time graph setup and allocations are not counted
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    return embeddings, time.perf_counter() - start
+
+def _cosine(a, b):
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return (a * b).sum(axis=1)
+
+def benchmark_embedding_backends(project_name=None, backends=('onnx-int8',), sample_size=512, batch_size=32):
+    """
+    Encode the same code chunks with the sentence_transformers model and each backend in backends,
+    and report throughput and cosine agreement with the FP32 vectors.
+    """
+    logger = get_configured_logger(__name__)
+    settings_manager = ChatSettingsManager()
+    directory = settings_manager.get_setting(f'projects.{project_name}.directory') if project_name else None
+    directory = directory or Path(__file__).resolve().parents[1]
+
+    texts = collect_sample_texts(directory, sample_size)
+    if not texts:
+        print(f"No text files found in {directory}.")
+        return {}
+    print(f"Benchmarking {len(texts)} chunks from {directory} (batch size {batch_size})")
+
+    baseline, baseline_seconds = _time_encode(
+        get_embedding_model(backend=DEFAULT_EMBEDDING_BACKEND, device='cpu'), texts, batch_size)
+    results = {DEFAULT_EMBEDDING_BACKEND: {'texts_per_second': len(texts) / baseline_seconds, 'speedup': 1.0}}
+
+    for backend in backends:
+        try:
+            embeddings, seconds = _time_encode(get_embedding_model(backend=backend, device='cpu'), texts, batch_size)
+        except ImportError as e:
+            logger.error(f"Backend {backend} is not available: {e}")
+            print(f"Skipping {backend}: {e}")
+            continue
+        cosine = _cosine(baseline, embeddings)
+        results[backend] = {
+            'texts_per_second': len(texts) / seconds,
+            'speedup': baseline_seconds / seconds,
+            'cosine_mean': float(cosine.mean()),
+            'cosine_min': float(cosine.min()),
+            'cosine_p1': float(np.percentile(cosine, 1)),
+        }
+
+    print(f"{'backend':<24}{'texts/s':>10}{'speedup':>9}{'cos mean':>10}{'cos p1':>9}{'cos min':>9}")
+    for backend, result in results.items():
+        agreement = (f"{result['cosine_mean']:>10.4f}{result['cosine_p1']:>9.4f}{result['cosine_min']:>9.4f}"
+                     if 'cosine_mean' in result else f"{'-':>10}{'-':>9}{'-':>9}")
+        print(f"{backend:<24}{result['texts_per_second']:>10.1f}{result['speedup']:>8.2f}x{agreement}")
+    return results
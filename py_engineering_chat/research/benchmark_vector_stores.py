@@ -0,0 +1,98 @@
+import multiprocessing
+import shutil
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from py_engineering_chat.research.scan_progress import peak_rss_mb
+from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.numpy_vector_store import NumpyVectorStore
+from py_engineering_chat.util.vector_store import ChromaVectorStore, VectorStore
+
+COLLECTION_NAME = 'benchmark'
+
+def _vectors(count, dim, seed):
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _open_store(backend, directory) -> VectorStore:
+    # Both backends go through the VectorStore interface, with the same batching the app uses
+    if backend == 'numpy':
+        return NumpyVectorStore(Path(directory) / 'numpy', COLLECTION_NAME)
+    return ChromaVectorStore(COLLECTION_NAME, str(Path(directory) / 'chroma'), create=True)
+
+def _build(backend, directory, count, dim, batch_size):
+    store = _open_store(backend, directory)
+    vectors = _vectors(count, dim, seed=0)
+    start = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        end = min(offset + batch_size, count)
+        store.upsert(ids=[str(i) for i in range(offset, end)], embeddings=vectors[offset:end],
+                     documents=[f"document {i}" for i in range(offset, end)],
+                     metadatas=[{"path": f"file_{i % 100}.py"} for i in range(offset, end)])
+    return time.perf_counter() - start
+
+def _search(backend, directory, count, dim, queries, k):
+    # Runs in a fresh process, so open time and RSS are what a chat session would pay
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    store = _open_store(backend, directory)
+    store.count()
+    open_seconds = time.perf_counter() - start
+
+    noise = _vectors(queries, dim, seed=1) * 0.3
+    query_vectors = _vectors(count, dim, seed=0)[:queries] + noise
+    latencies, results = [], []
+    for query in query_vectors:
+        start = time.perf_counter()
+        result = store.query(query_embeddings=[query.tolist()], n_results=k, include=['documents', 'distances'])
+        latencies.append(time.perf_counter() - start)
+        results.append(result['ids'][0])
+    return {
+        'open_ms': open_seconds * 1000,
+        'query_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'query_p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_growth_mb': peak_rss_mb() - rss_before,
+        'results': results,
+    }
+
+def _exact_top_k(count, dim, queries, k):
+    vectors = _vectors(count, dim, seed=0)
+    query_vectors = vectors[:queries] + _vectors(queries, dim, seed=1) * 0.3
+    # Stored vectors have unit length, so the L2 ranking is the ranking by dot product
+    scores = query_vectors @ vectors.T
+    return [[str(i) for i in np.argsort(-row, kind='stable')[:k]] for row in scores]
+
+def benchmark_vector_stores(backends=('numpy', 'chroma'), count=20000, dim=384, queries=200, k=10, batch_size=1000):
+    """
+    Build the same collection with each backend, then open and query it from a fresh process.
+    Reports build time, open time, query latency, memory and recall against exact search.
+    """
+    logger = get_configured_logger(__name__)
+    context = multiprocessing.get_context('spawn')
+    exact = _exact_top_k(count, dim, queries, k)
+    results = {}
+    print(f"Benchmarking {count} vectors of dimension {dim}, {queries} queries, top {k}")
+
+    for backend in backends:
+        directory = tempfile.mkdtemp(prefix=f'vector_store_benchmark_{backend}_')
+        try:
+            with context.Pool(1) as pool:
+                build_seconds = pool.apply(_build, (backend, directory, count, dim, batch_size))
+            with context.Pool(1) as pool:
+                search = pool.apply(_search, (backend, directory, count, dim, queries, k))
+        except ImportError as e:
+            logger.error(f"Vector store {backend} is not available: {e}")
+            print(f"Skipping {backend}: {e}")
+            continue
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        recall = np.mean([len(set(found) & set(expected)) / k for found, expected in zip(search.pop('results'), exact)])
+        results[backend] = {'build_seconds': build_seconds, 'recall': float(recall), **search}
+
+    print(f"{'backend':<10}{'build s':>9}{'open ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'recall':>8}")
+    for backend, result in results.items():
+        print(f"{backend:<10}{result['build_seconds']:>9.2f}{result['open_ms']:>9.1f}{result['query_p50_ms']:>9.2f}"
+              f"{result['query_p95_ms']:>9.2f}{result['peak_rss_mb']:>9.1f}{result['recall']:>8.3f}")
+    return results
@@ -1,48 +1,48 @@
 import os
-import chromadb
+from py_engineering_chat.util.chroma_pool import get_chroma_path
+from py_engineering_chat.util.vector_store_pool import list_vector_stores, open_vector_store
 
 def list_collections():
-    """List available collections in Chroma."""
+    """List available collections in every vector store."""
     # Get AI_SHADOW_DIRECTORY from environment variables
     ai_shadow_directory = os.getenv('AI_SHADOW_DIRECTORY')
     if not ai_shadow_directory:
         raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
 
     # Construct the Chroma DB path
-    chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
+    chroma_db_path = get_chroma_path(ai_shadow_directory)
 
-    client = chromadb.PersistentClient(path=chroma_db_path)
-    collections = client.list_collections()
+    collections = list_vector_stores(chroma_db_path)
     if collections:
-        print("Available collections in Chroma:")
-        for collection in collections:
-            print(f"- Name: {collection.name}")
-            print(f"  Number of documents: {collection.count()}")
-            metadata = collection.metadata
-            if metadata:
-                print(f"  Metadata: {metadata}")
+        print("Available collections:")
+        for name, backend in collections:
+            print(f"- Name: {name}")
+            print(f"  Vector store: {backend}")
+            try:
+                print(f"  Number of documents: {open_vector_store(name, chroma_db_path).count()}")
+            except ValueError:
+                # Stored with a backend other than the one its vector_store setting now selects
+                print("  Not the configured vector store for this collection")
             print()  # Add a blank line between collections for better readability
     else:
-        print("No collections found in Chroma.")
+        print("No collections found.")
 
 import json
 import uuid
 import os
 
 def list_collection_content(collection_name):
-    """List content of a specific collection in Chroma and save to a JSON file."""
+    """List content of a specific collection and save to a JSON file."""
     # Get AI_SHADOW_DIRECTORY from environment variables
     ai_shadow_directory = os.getenv('AI_SHADOW_DIRECTORY')
     if not ai_shadow_directory:
         raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
 
     # Construct the Chroma DB path
-    chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
+    chroma_db_path = get_chroma_path(ai_shadow_directory)
 
-    client = chromadb.PersistentClient(path=chroma_db_path)
     try:
-        collection = client.get_collection(name=collection_name)
-        results = collection.get()
+        collection = open_vector_store(collection_name, chroma_db_path)
         
         data = {
             "collection_name": collection_name,
@@ -52,10 +52,11 @@ def list_collection_content(collection_name):
                     "document": document,
                     "metadata": metadata
                 }
-                for id, document, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+                for page in collection.iter_pages()
+                for id, document, metadata in zip(page['ids'], page['documents'], page['metadatas'])
             ],
-            "total_items": len(results['ids'])
         }
+        data["total_items"] = len(data["items"])
         
         filename = f"collection_content_{uuid.uuid4().hex[:8]}.json"
         with open(filename, 'w') as f:
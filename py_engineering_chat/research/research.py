@@ -2,14 +2,14 @@ import click
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import chromadb
-from chromadb.config import Settings
 import os
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 from py_engineering_chat.agents.text_summarizer import TextSummarizer
 from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
 from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.embedding_registry import get_embedder
+from py_engineering_chat.util.chroma_pool import get_chroma_path
+from py_engineering_chat.util.vector_store_pool import recreate_vector_store, vector_store_exists
 import sys
 from contextlib import contextmanager
 from py_engineering_chat.util.content_chunker import ContentChunker
@@ -52,32 +52,25 @@ def crawl_and_store(url, depth, collection_name, debug=False, suppress_output=Tr
         if not ai_shadow_directory:
             raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
 
-        chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
+        chroma_db_path = get_chroma_path(ai_shadow_directory)
         logger.debug(f"Chroma DB Path: {chroma_db_path}")
         
         try:
-            client = chromadb.PersistentClient(path=chroma_db_path)
-        except Exception as e:
-            logger.error(f"Error initializing Chroma client: {e}")
-            return
-
-        try:
-            collections = client.list_collections()
-            if collection_name in [col.name for col in collections]:
-                client.delete_collection(name=collection_name)
-                print(f"Deleted existing collection '{collection_name}'.")
+            if vector_store_exists(collection_name, chroma_db_path):
+                print(f"Deleting existing collection '{collection_name}'.")
             else:
                 print(f"Collection '{collection_name}' does not exist.")
 
-            collection = client.create_collection(name=collection_name)
+            # Also refreshes the pooled handle other callers in this process share
+            collection = recreate_vector_store(collection_name, chroma_db_path)
         except Exception as e:
             logger.error(f"Error managing collections: {e}")
             return
 
         try:
-            model = SentenceTransformer('all-MiniLM-L6-v2')
+            model = get_embedder()
         except Exception as e:
-            logger.error(f"Error initializing SentenceTransformer: {e}")
+            logger.error(f"Error loading embedding model: {e}")
             return
 
         summarizer = TextSummarizer()
@@ -119,10 +112,11 @@ def crawl_and_store(url, depth, collection_name, debug=False, suppress_output=Tr
             
             embeddings = model.encode(documents)
 
+            # Written in batches by the vector store, which also invalidates cached search results
             collection.add(
                 ids=ids,
                 documents=documents,
-                embeddings=embeddings.tolist(),
+                embeddings=embeddings,
                 metadatas=metadatas
             )
         except Exception as e:
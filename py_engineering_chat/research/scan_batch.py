@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from py_engineering_chat.util.code_chunker import CodeChunk
+from py_engineering_chat.util.symbol_index import Symbol
+
+# Rough characters-per-token ratio used to budget a batch without running a tokenizer
+CHARS_PER_TOKEN = 4
+
+class ScanItem(BaseModel):
+    """A file that passed the scan filters and is waiting to be embedded."""
+    id: str
+    path: str
+    content: str
+    chunks: List[CodeChunk]
+    status: str
+    size: int
+    mtime: float
+    sha256: str
+    symbols: List[Symbol] = []
+    imports: List[str] = []
+
+class ScanBatch:
+    """Collects scan items until either the file count or the token budget is reached."""
+
+    def __init__(self, max_files: int = 32, max_tokens: Optional[int] = None):
+        self.max_files = max(1, max_files)
+        self.max_tokens = max_tokens
+        self.items: List[ScanItem] = []
+        self.token_count = 0
+
+    def add(self, item: ScanItem):
+        self.items.append(item)
+        self.token_count += len(item.content) // CHARS_PER_TOKEN
+
+    def is_full(self) -> bool:
+        if len(self.items) >= self.max_files:
+            return True
+        return self.max_tokens is not None and self.token_count >= self.max_tokens
+
+    def drain(self) -> List[ScanItem]:
+        """Return the pending items and start a new, empty batch."""
+        items = self.items
+        self.items = []
+        self.token_count = 0
+        return items
+
+    def __len__(self):
+        return len(self.items)
@@ -1,14 +1,24 @@
 import os
-import chromadb
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from py_engineering_chat.agents.text_summarizer import TextSummarizer
 from py_engineering_chat.agents.context_evaluator import ContextEvaluator
-from sentence_transformers import SentenceTransformer
 import json
 from dotenv import load_dotenv
 from datetime import datetime
 from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
 from py_engineering_chat.util.logger_util import get_configured_logger  # Import the logger
+from py_engineering_chat.util.embedding_registry import get_embedder
+from py_engineering_chat.util.chroma_pool import get_chroma_path
+from py_engineering_chat.util.vector_store_pool import delete_vector_store, open_vector_store
+from py_engineering_chat.util.lexical_index import LexicalIndex
+from py_engineering_chat.util.symbol_index import SymbolIndex, extract_symbols
+from py_engineering_chat.util.scan_manifest import ScanManifest
+from py_engineering_chat.util.context_decision_cache import ContextDecisionCache
+from py_engineering_chat.util.git_changes import get_head_commit, get_changes_since
+from py_engineering_chat.research.scan_pipeline import ScanPipeline
+from py_engineering_chat.research.scan_progress import ScanProgress, peak_rss_mb
+import time
 
 # Configuration for directories to always skip
 ALWAYS_SKIP_DIRS = {'.git', 'node_modules', 'vendor', 'build', 'dist', 'venv', '__pycache__'}
@@ -39,148 +49,300 @@ ALWAYS_SKIP_FILES = {
     # Add more patterns as needed
 }
 
-def scan_codebase(project_name, skip_summarization=False, max_files=-1):
-    # Initialize logger
+class CodebaseScanner:
+    """
+    Holds everything a scan needs (Chroma collection, manifest, evaluator and embedding model)
+    so one-shot scans and long-running updaters like watch-project share the same setup.
+    """
+
+    def __init__(self, project_name, project_dir=None, batch_size=32, batch_token_budget=None,
+                 reader_workers=4, evaluator_workers=4):
+        # Initialize logger
+        self.logger = get_configured_logger(__name__)
+
+        # Load environment variables
+        load_dotenv()
+        self.logger.debug("Environment variables loaded.")
+
+        # Load settings manager
+        self.settings_manager = ChatSettingsManager()
+        self.settings_manager.load_settings()
+        self.logger.debug("Settings manager loaded.")
+
+        # Retrieve project directory from settings; scan-project and watch-project must index the same root
+        self.project_name = project_name
+        self.project_dir = project_dir or self.settings_manager.get_project_index_directory(project_name)
+        if not self.project_dir:
+            self.logger.error(f"Directory for project '{project_name}' not found in settings.")
+            raise ValueError(f"Directory for project '{project_name}' not found in settings.")
+
+        # Get AI_SHADOW_DIRECTORY from environment variables
+        self.ai_shadow_directory = os.getenv('AI_SHADOW_DIRECTORY')
+        if not self.ai_shadow_directory:
+            self.logger.error("AI_SHADOW_DIRECTORY environment variable is not set")
+            raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
+
+        # The collection itself is opened through the pool, with whichever vector store it is configured for
+        self.chroma_db_path = get_chroma_path(self.ai_shadow_directory)
+
+        self.collection_name = f"codebase_{project_name}"
+        self.collection = None
+        self.resumed = False
+        self.manifest = ScanManifest(self.ai_shadow_directory, self.collection_name)
+        # BM25 index over the same chunks, kept in step with the collection for hybrid search
+        self.lexical_index = LexicalIndex.for_collection(self.chroma_db_path, self.collection_name)
+        # Definitions and import edges for exact symbol lookups
+        self.symbol_index = SymbolIndex.for_collection(self.ai_shadow_directory, self.collection_name)
+
+        # Initialize ContextEvaluator behind the persistent decision cache
+        self.decision_cache = ContextDecisionCache(self.ai_shadow_directory)
+        self.context_evaluator = ContextEvaluator(decision_cache=self.decision_cache)
+        self.logger.debug("ContextEvaluator initialized.")
+
+        # Get the shared embedding model
+        self.model = get_embedder()
+        self.logger.debug("Embedding model ready.")
+
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.reader_workers = reader_workers
+        self.evaluator_workers = evaluator_workers
+
+    def open_collection(self, incremental=False, resume=False):
+        """
+        Open the project collection. A full scan normally starts from an empty collection, but with
+        resume=True a previous full scan that was interrupted is continued from its last checkpoint.
+        """
+        self.resumed = False
+        if not incremental and self.manifest.was_interrupted():
+            if resume:
+                self.logger.info(f"Resuming interrupted scan of '{self.collection_name}' from its last checkpoint.")
+                self.resumed = True
+                incremental = True
+            else:
+                self.logger.info(f"Previous scan of '{self.collection_name}' did not finish; starting over. Use --resume to continue it.")
+
+        if incremental:
+            # Keep the existing collection and only touch files that changed since the last scan
+            self.collection = open_vector_store(self.collection_name, self.chroma_db_path, create=True)
+            self.manifest.load()
+            self.logger.debug(f"Incremental scan of '{self.collection_name}' with {len(self.manifest.entries)} files in manifest.")
+            if len(self.lexical_index) == 0 and self.collection.count() > 0:
+                self.backfill_lexical_index()
+            if self.manifest.entries and not self.symbol_index.indexed_paths():
+                self.backfill_symbol_index()
+        else:
+            # Delete existing collection if it exists
+            if delete_vector_store(self.collection_name, self.chroma_db_path):
+                self.logger.debug(f"Existing collection '{self.collection_name}' deleted.")
+            else:
+                self.logger.debug(f"No existing collection '{self.collection_name}' to delete.")
+
+            # Create new collection
+            self.collection = open_vector_store(self.collection_name, self.chroma_db_path, create=True)
+            self.manifest.reset()
+            self.lexical_index.clear()
+            self.symbol_index.clear()
+            self.logger.debug(f"New collection '{self.collection_name}' created.")
+        return self.collection
+
+    def backfill_lexical_index(self, page_size=1000):
+        """Build the lexical index from the documents already in the collection."""
+        self.logger.info(f"Building lexical index for '{self.collection_name}' from the existing collection.")
+        for page in self.collection.iter_pages(page_size, include=['documents', 'metadatas']):
+            self.lexical_index.add_documents(page['ids'], page['documents'],
+                                             [metadata.get('path', '') for metadata in page['metadatas']])
+
+    def backfill_symbol_index(self):
+        """Parse every file in the manifest; unchanged files are otherwise never read again."""
+        self.logger.info(f"Building symbol index for '{self.collection_name}' from {len(self.manifest.entries)} files.")
+
+        def parse(path):
+            try:
+                with open(Path(self.project_dir) / path, 'r', encoding='utf-8', errors='ignore') as f:
+                    return (path,) + extract_symbols(path, f.read())
+            except OSError as e:
+                self.logger.error(f"Error reading file {path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, self.reader_workers)) as executor:
+            parsed = [entry for entry in executor.map(parse, sorted(self.manifest.paths())) if entry]
+        self.symbol_index.update_files(parsed)
+
+    def run_pipeline(self, paths=None, incremental=False, max_files=-1, progress=False) -> ScanPipeline:
+        """Walk, read, evaluate, embed and store in overlapping stages."""
+        pipeline = ScanPipeline(
+            self.project_dir, self.collection, self.manifest, self.context_evaluator, self.model,
+            skip_dirs=ALWAYS_SKIP_DIRS,
+            skip_files=ALWAYS_SKIP_FILES,
+            incremental=incremental,
+            max_files=max_files,
+            batch_size=self.batch_size,
+            batch_token_budget=self.batch_token_budget,
+            reader_workers=self.reader_workers,
+            evaluator_workers=self.evaluator_workers,
+            lexical_index=self.lexical_index,
+            symbol_index=self.symbol_index
+        )
+        reporter = ScanProgress(pipeline) if progress else None
+        if reporter:
+            reporter.start()
+        try:
+            pipeline.run(paths=paths)
+        finally:
+            if reporter:
+                reporter.stop()
+        return pipeline
+
+    def delete_paths(self, paths) -> int:
+        """Remove every vector stored for the given relative paths."""
+        paths = set(paths)
+        if paths:
+            self.collection.delete(where={"path": {"$in": [str(Path(path)) for path in paths]}})
+            self.lexical_index.delete_paths([str(Path(path)) for path in paths])
+            self.symbol_index.delete_paths(paths)
+            for path in paths:
+                self.manifest.remove(path)
+                self.logger.debug(f"Deleted file: {path}")
+        return len(paths)
+
+    def write_report(self, report: dict) -> Path:
+        """Write a machine-readable summary of the last scan into the shadow directory."""
+        report_dir = Path(self.ai_shadow_directory) / '.scan_reports'
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report_file = report_dir / f"{self.collection_name}.json"
+        with report_file.open('w') as f:
+            json.dump(report, f, indent=2)
+        self.logger.debug(f"Scan report written to {report_file}")
+        return report_file
+
+    def close(self):
+        self.manifest.save()
+        self.decision_cache.close()
+        self.lexical_index.close()
+        self.symbol_index.close()
+
+def scan_codebase(project_name, skip_summarization=False, max_files=-1, incremental=False, batch_size=32,
+                  batch_token_budget=None, reader_workers=4, evaluator_workers=4, since_last=False,
+                  resume=False, progress=True):
     logger = get_configured_logger(__name__)
-    
-    # Load environment variables
-    load_dotenv()
-    logger.debug("Environment variables loaded.")
-    
-    # Load settings manager
-    settings_manager = ChatSettingsManager()
-    settings_manager.load_settings()
-    logger.debug("Settings manager loaded.")
-    
-    # Retrieve project directory from settings
-    project_dir = settings_manager.get_setting(f'projects.{project_name}.directory')
-    if not project_dir:
-        logger.error(f"Directory for project '{project_name}' not found in settings.")
-        raise ValueError(f"Directory for project '{project_name}' not found in settings.")
-    
-    # Get AI_SHADOW_DIRECTORY from environment variables
-    ai_shadow_directory = os.getenv('AI_SHADOW_DIRECTORY')
-    if not ai_shadow_directory:
-        logger.error("AI_SHADOW_DIRECTORY environment variable is not set")
-        raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
-    
-    # Initialize Chroma client
-    chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
-    client = chromadb.PersistentClient(path=chroma_db_path)
-    logger.debug("Chroma client initialized.")
-    
-    # Delete existing collection if it exists
-    collection_name = f"codebase_{project_name}"
+    scanner = CodebaseScanner(project_name, batch_size=batch_size, batch_token_budget=batch_token_budget,
+                              reader_workers=reader_workers, evaluator_workers=evaluator_workers)
+    settings_manager = scanner.settings_manager
+    context_evaluator = scanner.context_evaluator
+    decision_cache = scanner.decision_cache
+
+    # The decision cache and indexes hold sqlite connections that must be closed even if the scan fails
     try:
-        client.delete_collection(name=collection_name)
-        logger.debug(f"Existing collection '{collection_name}' deleted.")
-    except ValueError:
-        logger.debug(f"No existing collection '{collection_name}' to delete.")
-    
-    # Create new collection
-    collection = client.create_collection(name=collection_name)
-    logger.debug(f"New collection '{collection_name}' created.")
-    
-    # Initialize ContextEvaluator
-    context_evaluator = ContextEvaluator()
-    logger.debug("ContextEvaluator initialized.")
-
-    # Initialize TextSummarizer only if needed
-    # Remove the summarizer initialization
-    # summarizer = None if skip_summarization else TextSummarizer()
-    # if summarizer:
-    #     logger.debug("TextSummarizer initialized.")
-    
-    # Initialize SentenceTransformer model
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.debug("SentenceTransformer model initialized.")
-    
-    files_processed = 0
-    folders_skipped = 0
-    files_skipped = 0
-
-    # Walk through the project directory
-    for root, dirs, files in os.walk(project_dir):
-        relative_root = Path(root).relative_to(project_dir)
-        if relative_root == Path('.'):
-            is_contextual = True
-        elif any(part in ALWAYS_SKIP_DIRS for part in relative_root.parts):
-            dirs[:] = []
-            folders_skipped += 1
-            logger.debug(f"Skipped folder: {relative_root}")
-            continue
+        # Remember which commit this scan reflects so the next one can diff from it
+        head_commit = get_head_commit(scanner.project_dir)
+        changes = None
+        if since_last:
+            last_commit = settings_manager.get_setting(f'projects.{project_name}.last_indexed_commit')
+            changes = get_changes_since(scanner.project_dir, last_commit) if last_commit else None
+            if changes is None:
+                logger.warning(f"No usable last indexed commit for '{project_name}'. Falling back to an incremental scan.")
+            else:
+                head_commit = changes.head_commit
+                logger.info(f"Reindexing {len(changes.changed)} changed and {len(changes.deleted)} deleted paths since {last_commit[:10]}.")
+            # A diff-driven scan always updates the existing collection in place
+            incremental = True
+
+        collection = scanner.open_collection(incremental, resume=resume)
+        incremental = incremental or scanner.resumed
+
+        # Stays marked in progress on disk until the scan finishes, so a crash can be resumed
+        scanner.manifest.begin_scan()
+        started_at = datetime.now()
+        start_time = time.perf_counter()
+        pipeline = scanner.run_pipeline(paths=changes.changed if changes else None,
+                                        incremental=incremental, max_files=max_files, progress=progress)
+        stats = pipeline.stats
+        elapsed = time.perf_counter() - start_time
+        files_processed = stats['files_processed']
+
+        # Drop vectors for files that disappeared since the last scan. A truncated
+        # walk has not seen every file, so nothing can be considered removed.
+        if changes is not None:
+            files_deleted = scanner.delete_paths(changes.deleted)
+        elif incremental and not pipeline.truncated:
+            files_deleted = scanner.delete_paths(scanner.manifest.paths() - pipeline.seen_paths)
         else:
-            is_contextual, _ = context_evaluator.is_contextual(str(relative_root), "folder")
-        
-        if not is_contextual:
-            dirs[:] = []
-            folders_skipped += 1
-            logger.debug(f"Non-contextual folder skipped: {relative_root}")
-            continue
-
-        # Remove ignored directories during traversal
-        dirs[:] = [d for d in dirs if os.path.join(root, d) not in ALWAYS_SKIP_DIRS and d not in ALWAYS_SKIP_DIRS]
-        
-        for file in files:
-            # Check if we've reached the max file count (if set)
-            if max_files != -1 and files_processed >= max_files:
-                logger.info(f"Reached maximum file count of {max_files}. Stopping scan.")
-                break
-
-            file_path = Path(root) / file
-            relative_path = file_path.relative_to(project_dir)
-            
-            # Check if the file should be skipped
-            if any(file_path.match(pattern) for pattern in ALWAYS_SKIP_FILES):
-                files_skipped += 1
-                logger.debug(f"Skipped file: {relative_path}")
-                continue
-            
-            # Check if the file is likely to add context
-            is_contextual, _ = context_evaluator.is_contextual(str(relative_path), "file")
-            if not is_contextual:
-                files_skipped += 1
-                logger.debug(f"Non-contextual file skipped: {relative_path}")
-                continue
-
-            # Read file content
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                logger.debug(f"Reading file: {relative_path}")
-                content = f.read()
-
-            # Include the file path with the content
-            content_with_path = f"Path: {relative_path}\n\n{content}"
-
-            # Remove summarization logic
-            # if summarizer:
-            #     try:
-            #         summary = summarizer.summarize(content)
-            #     except Exception as e:
-            #         logger.error(f"Error summarizing file {relative_path}: {e}")
-            #         summary = content[:1000]  # Fallback to using first 1000 characters
-            # else:
-            #     summary = content[:1000]  # Use first 1000 characters as summary
-
-            # Calculate embedding
-            embedding = model.encode(content).tolist()  # Use full content for embedding
-            
-            # Add to collection
-            collection.add(
-                ids=[str(relative_path)],
-                documents=[content_with_path],  # Store content with path
-                embeddings=[embedding],
-                metadatas=[{"path": str(relative_path)}]  # Remove summary from metadata
-            )
-            files_processed += 1
-            logger.debug(f"Processed file: {relative_path}")
+            files_deleted = 0
+
+        # Files that failed are not in the manifest yet; keeping the checkpoint lets --resume retry just those
+        completed = stats['files_failed'] == 0
+        if completed:
+            scanner.manifest.finish_scan()
+    finally:
+        scanner.close()
+
+    # Absent when the embedding_cache.enabled setting is off
+    embedding_cache = getattr(scanner.model, 'cache', None)
+    report = {
+        'project': project_name,
+        'collection': scanner.collection_name,
+        'started_at': started_at.isoformat(),
+        'finished_at': datetime.now().isoformat(),
+        'elapsed_seconds': round(elapsed, 3),
+        'mode': 'since_last' if changes is not None else 'incremental' if incremental else 'full',
+        'resumed': scanner.resumed,
+        'completed': completed,
+        'truncated': pipeline.truncated,
+        'head_commit': head_commit,
+        'files': {
+            'queued': stats['files_queued'],
+            'processed': files_processed,
+            'added': stats['files_added'],
+            'updated': stats['files_updated'],
+            'deleted': files_deleted,
+            'unchanged': stats['files_unchanged'],
+            'failed': stats['files_failed'],
+            'skipped': stats['files_skipped'],
+        },
+        'folders_skipped': stats['folders_skipped'],
+        'embeddings': stats['embeddings'],
+        'files_per_second': round(files_processed / elapsed, 2) if elapsed > 0 else 0.0,
+        'embeddings_per_second': round(stats['embeddings'] / elapsed, 2) if elapsed > 0 else 0.0,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'evaluator': {
+            'evaluations': context_evaluator.total_evaluations,
+            'requests': context_evaluator.total_requests,
+            'rule_decisions': context_evaluator.rule_decisions,
+            'cache_hits': decision_cache.hits,
+            'cache_misses': decision_cache.misses,
+        },
+        'embedding_cache': {
+            'hits': embedding_cache.hits,
+            'misses': embedding_cache.misses,
+        } if embedding_cache else None,
+    }
+    report_file = scanner.write_report(report)
     
     # Print summary statistics
     logger.info(f"Scan complete for project '{project_name}':")
     logger.info(f"  Files processed: {files_processed}")
-    logger.info(f"  Folders skipped: {folders_skipped}")
-    logger.info(f"  Files skipped: {files_skipped}")
+    logger.info(f"  Files added: {stats['files_added']}")
+    logger.info(f"  Files updated: {stats['files_updated']}")
+    logger.info(f"  Files deleted: {files_deleted}")
+    logger.info(f"  Files unchanged: {stats['files_unchanged']}")
+    logger.info(f"  Files failed: {stats['files_failed']}")
+    logger.info(f"  Folders skipped: {stats['folders_skipped']}")
+    logger.info(f"  Elapsed: {elapsed:.1f}s ({report['files_per_second']:.1f} files/sec, "
+                f"{report['embeddings_per_second']:.1f} embeddings/sec)")
+    logger.info(f"  Peak RSS: {report['peak_rss_mb']:.0f} MB")
+    logger.info(f"  Files skipped: {stats['files_skipped']}")
     logger.info(f"  Total evaluations: {context_evaluator.total_evaluations}")
+    logger.info(f"  Evaluation requests: {context_evaluator.total_requests}")
+    logger.info(f"  Rule decisions: {context_evaluator.rule_decisions}")
+    logger.info(f"  Decision cache hits: {decision_cache.hits}")
+    logger.info(f"  Decision cache misses: {decision_cache.misses} ({decision_cache.hit_ratio:.2%} hit ratio)")
+    if embedding_cache:
+        logger.info(f"  Embedding cache hits: {embedding_cache.hits} ({embedding_cache.hit_ratio:.2%} hit ratio)")
     logger.info(f"  Contextual ratio: {context_evaluator.contextual_ratio:.2%}")
+    if scanner.resumed:
+        logger.info("  Resumed from an interrupted scan.")
+    logger.info(f"  Report: {report_file}")
     if skip_summarization:
         logger.info("  Summarization was skipped.")
     
@@ -194,10 +356,6 @@ def scan_codebase(project_name, skip_summarization=False, max_files=-1):
     if collection.count() == 0:
         logger.warning("The collection is empty. No files were added.")
 
-    # Load settings manager
-    settings_manager = ChatSettingsManager()
-    settings = settings_manager.load_settings()
-
     # After scanning is complete
     if collection.count() > 0:
         # Update the project's scanned status and scan date
@@ -205,4 +363,10 @@ def scan_codebase(project_name, skip_summarization=False, max_files=-1):
         settings_manager.set_setting(f'projects.{project_name}.last_scanned', datetime.now().isoformat())
         logger.debug("Project scan status updated.")
 
+    # Only advance the indexed commit when every file up to it made it into the collection
+    if head_commit and not pipeline.truncated and stats['files_failed'] == 0:
+        settings_manager.set_setting(f'projects.{project_name}.last_indexed_commit', head_commit)
+    elif head_commit:
+        logger.warning("Scan was incomplete; the last indexed commit was not advanced.")
+
     return collection
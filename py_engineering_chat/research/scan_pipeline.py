@@ -0,0 +1,358 @@
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from py_engineering_chat.research.scan_batch import ScanBatch, ScanItem
+from py_engineering_chat.util.file_enumerator import FileEnumerator
+from py_engineering_chat.util.code_chunker import chunk_file
+from py_engineering_chat.util.symbol_index import extract_symbols
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+# Marker put on a queue to tell the consuming stage that no more work is coming
+_SENTINEL = object()
+
+# How long the embedding worker waits for more input before flushing a partial batch
+IDLE_FLUSH_SECONDS = 1.0
+
+class ScanStats:
+    """Thread-safe counters shared by every stage of the scan pipeline."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def __getitem__(self, name: str) -> int:
+        with self._lock:
+            return self.counts[name]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+def embed_items(items, model, encode_batch_size=32):
+    """Embed the chunks of every item in a single encode call."""
+    texts = [chunk.content for item in items for chunk in item.chunks]
+    if not texts:
+        return []
+    return model.encode(texts, batch_size=encode_batch_size).tolist()
+
+def write_items(items, embeddings, collection, manifest, lexical_index=None, symbol_index=None):
+    """Replace the stored chunks of every item with one bulk upsert, then record them in the manifest."""
+    # Chunk boundaries move when a file changes, so drop all of its previous vectors first
+    updated_paths = [item.id for item in items if item.status != 'added']
+    if updated_paths:
+        collection.delete(where={"path": {"$in": updated_paths}})
+        if lexical_index is not None:
+            lexical_index.delete_paths(updated_paths)
+
+    chunks = [chunk for item in items for chunk in item.chunks]
+    if chunks:
+        collection.upsert(
+            ids=[chunk.id for chunk in chunks],
+            documents=[chunk.document for chunk in chunks],  # Store content with path and lines
+            embeddings=embeddings,
+            metadatas=[{"path": chunk.path, "start_line": chunk.start_line, "end_line": chunk.end_line}
+                       for chunk in chunks]
+        )
+        if lexical_index is not None:
+            lexical_index.add_documents([chunk.id for chunk in chunks], [chunk.document for chunk in chunks],
+                                        [chunk.path for chunk in chunks])
+
+    if symbol_index is not None:
+        symbol_index.update_files((item.path, item.symbols, item.imports) for item in items)
+
+    # Only record files in the manifest once they are safely stored
+    for item in items:
+        manifest.record(item.path, item.size, item.mtime, item.sha256)
+
+class ScanPipeline:
+    """
+    Staged scan of a project directory:
+    walker -> reader pool -> evaluator pool -> embedding worker -> Chroma writer.
+    Stages are connected by bounded queues so memory stays flat on large repositories
+    while file I/O, LLM evaluations and embedding overlap.
+    """
+
+    def __init__(self, project_dir, collection, manifest, context_evaluator, model,
+                 skip_dirs, skip_files, incremental=False, max_files=-1, batch_size=32,
+                 batch_token_budget=None, reader_workers=4, evaluator_workers=4, queue_size=None,
+                 evaluation_batch_size=50, lexical_index=None, symbol_index=None):
+        self.logger = get_configured_logger(__name__)
+        self.project_dir = project_dir
+        self.collection = collection
+        self.manifest = manifest
+        self.lexical_index = lexical_index
+        self.symbol_index = symbol_index
+        self.context_evaluator = context_evaluator
+        self.model = model
+        self.enumerator = FileEnumerator(project_dir, skip_dirs=skip_dirs, skip_files=skip_files)
+        self.incremental = incremental
+        self.max_files = max_files
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.reader_workers = max(1, reader_workers)
+        self.evaluator_workers = max(1, evaluator_workers)
+        self.evaluation_batch_size = max(1, evaluation_batch_size)
+
+        # The read and evaluate queues carry groups of up to evaluation_batch_size files
+        queue_size = queue_size or max(batch_size * 4, 64)
+        self.read_queue = queue.Queue(maxsize=self.reader_workers * 2)
+        self.evaluate_queue = queue.Queue(maxsize=self.evaluator_workers * 2)
+        self.embed_queue = queue.Queue(maxsize=queue_size)
+        # Each entry on the write queue is a whole batch, so keep only a couple in flight
+        self.write_queue = queue.Queue(maxsize=2)
+
+        self.stats = ScanStats()
+        self.seen_paths = set()
+        # Folder decisions made while scanning an explicit path list, keyed by relative folder
+        self.folder_decisions = {}
+        self.truncated = False
+        self.walk_complete = False
+        self.stop_event = threading.Event()
+
+    def run(self, paths=None) -> ScanStats:
+        """
+        Run every stage to completion and return the collected statistics.
+        When paths is given only those relative paths are scanned instead of the whole tree.
+        """
+        readers = self._start_workers(self._read_worker, self.reader_workers, "scan-reader")
+        evaluators = self._start_workers(self._evaluate_worker, self.evaluator_workers, "scan-evaluator")
+        embedder = self._start_workers(self._embed_worker, 1, "scan-embedder")
+        writer = self._start_workers(self._write_worker, 1, "scan-writer")
+
+        # The walker runs on the calling thread; each stage is shut down once its producers finish
+        try:
+            self._walk(paths)
+        except BaseException:
+            # Interrupted (e.g. Ctrl-C): let in-flight batches commit but drop everything still queued
+            self.stop_event.set()
+            raise
+        finally:
+            self._close_stage(self.read_queue, readers)
+            self._close_stage(self.evaluate_queue, evaluators)
+            self._close_stage(self.embed_queue, embedder)
+            self._close_stage(self.write_queue, writer)
+        return self.stats
+
+    def _start_workers(self, target, count, name):
+        workers = []
+        for i in range(count):
+            worker = threading.Thread(target=target, name=f"{name}-{i}", daemon=True)
+            worker.start()
+            workers.append(worker)
+        return workers
+
+    def _close_stage(self, stage_queue, workers):
+        for _ in workers:
+            stage_queue.put(_SENTINEL)
+        for worker in workers:
+            worker.join()
+
+    def _walk(self, paths=None):
+        walker = self.enumerator.walk() if paths is None else self.enumerator.walk_paths(paths)
+        for root, dirs, files in walker:
+            if self.stop_event.is_set():
+                break
+
+            relative_root = Path(root).relative_to(self.project_dir)
+
+            # Explicit paths skip the top-down walk, so their folders are checked here instead
+            if paths is not None and not self._is_folder_kept(relative_root):
+                self.stats.increment('files_skipped', len(files))
+                continue
+
+            # Decide on all subfolders at once; rejected ones are never descended into
+            dirs[:] = self._filter_folders(relative_root, dirs)
+
+            # Hand files over per directory so the evaluator can classify them in one request
+            file_paths = [Path(root) / file for file in files]
+            self.stats.increment('files_queued', len(file_paths))
+            for start in range(0, len(file_paths), self.evaluation_batch_size):
+                self.read_queue.put(file_paths[start:start + self.evaluation_batch_size])
+
+        # Folders and files dropped by the skip rules never reach the pipeline
+        self.stats.increment('folders_skipped', self.enumerator.dirs_skipped)
+        self.stats.increment('files_skipped', self.enumerator.files_skipped)
+        self.walk_complete = True
+
+    def _is_folder_kept(self, relative_root):
+        """Apply the folder filter to every ancestor of relative_root, as a full walk would."""
+        parent = Path('.')
+        for part in relative_root.parts:
+            relative_dir = parent / part
+            if relative_dir not in self.folder_decisions:
+                self.folder_decisions[relative_dir] = bool(self._filter_folders(parent, [part]))
+            if not self.folder_decisions[relative_dir]:
+                return False
+            parent = relative_dir
+        return True
+
+    def _filter_folders(self, relative_root, dirs):
+        kept = []
+        to_evaluate = {}
+        for d in dirs:
+            relative_dir = (relative_root / d).as_posix()
+            if self.incremental and self.manifest.contains_directory(relative_dir):
+                # Folder already has indexed files, no need to ask the evaluator again
+                kept.append(d)
+            else:
+                to_evaluate[relative_dir] = d
+
+        if to_evaluate:
+            decisions = self.context_evaluator.evaluate_batch(list(to_evaluate), "folder")
+            for relative_dir, d in to_evaluate.items():
+                is_contextual, _ = decisions[relative_dir]
+                if is_contextual:
+                    kept.append(d)
+                else:
+                    self.stats.increment('folders_skipped')
+                    self.logger.debug(f"Non-contextual folder skipped: {relative_dir}")
+        return kept
+
+    def _read_worker(self):
+        while True:
+            file_paths = self.read_queue.get()
+            if file_paths is _SENTINEL:
+                return
+            if self.stop_event.is_set():
+                continue
+
+            items = []
+            for file_path in file_paths:
+                item = self._read_file(file_path)
+                if item is not None:
+                    items.append(item)
+            if items:
+                self.evaluate_queue.put(items)
+
+    def _read_file(self, file_path):
+        relative_path = file_path.relative_to(self.project_dir)
+        manifest_path = relative_path.as_posix()
+        try:
+            # Compare against the manifest before spending an evaluation on the file
+            status, stat, sha256 = self.manifest.classify(manifest_path, file_path)
+            if status == 'unchanged':
+                self.seen_paths.add(manifest_path)
+                self.stats.increment('files_unchanged')
+                self.logger.debug(f"Unchanged file: {relative_path}")
+                return None
+
+            # Read file content
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                self.logger.debug(f"Reading file: {relative_path}")
+                content = f.read()
+
+            # Parsing runs here so it is spread over the reader pool
+            symbols, imports = extract_symbols(manifest_path, content) if self.symbol_index is not None else ([], [])
+
+            return ScanItem(
+                id=str(relative_path),
+                path=manifest_path,
+                content=content,
+                # Large files are embedded in pieces so nothing past the model's input limit is lost
+                chunks=chunk_file(str(relative_path), content),
+                status=status,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                sha256=sha256,
+                symbols=symbols,
+                imports=imports
+            )
+        except OSError as e:
+            # A file that failed is still there; it must not count as deleted from the project
+            self.seen_paths.add(manifest_path)
+            self.stats.increment('files_failed')
+            self.logger.error(f"Error reading file {file_path}: {e}")
+            return None
+
+    def _evaluate_worker(self):
+        while True:
+            items = self.evaluate_queue.get()
+            if items is _SENTINEL:
+                return
+            if self.stop_event.is_set():
+                continue
+            # Files already in the index were judged contextual on an earlier scan
+            new_items = [item for item in items if item.status == 'added']
+            decisions = {}
+            if new_items:
+                try:
+                    decisions = self.context_evaluator.evaluate_batch([item.id for item in new_items], "file")
+                except Exception as e:
+                    # Only the new files wait for the next scan; updated files need no evaluation
+                    for item in new_items:
+                        self.seen_paths.add(item.path)
+                    self.stats.increment('files_failed', len(new_items))
+                    self.logger.error(f"Error evaluating {len(new_items)} files: {e}")
+                    items = [item for item in items if item.status != 'added']
+
+            for item in items:
+                if item.status == 'added' and not decisions[item.id][0]:
+                    self.stats.increment('files_skipped')
+                    self.logger.debug(f"Non-contextual file skipped: {item.id}")
+                    continue
+                self.embed_queue.put(item)
+
+    def _embed_worker(self):
+        batch = ScanBatch(max_files=self.batch_size, max_tokens=self.batch_token_budget)
+        while True:
+            try:
+                item = self.embed_queue.get(timeout=IDLE_FLUSH_SECONDS)
+            except queue.Empty:
+                # Upstream is busy (usually waiting on the LLM); don't hold a partial batch hostage
+                self._flush(batch)
+                continue
+            if item is _SENTINEL:
+                self._flush(batch)
+                return
+
+            if self.max_files != -1 and self.stats['files_processed'] >= self.max_files:
+                if not self.stop_event.is_set():
+                    self.logger.info(f"Reached maximum file count of {self.max_files}. Stopping scan.")
+                    self.truncated = True
+                    self.stop_event.set()
+                continue
+
+            batch.add(item)
+            self.seen_paths.add(item.path)
+            self.stats.increment('files_processed')
+            if batch.is_full():
+                self._flush(batch)
+
+    def _flush(self, batch):
+        items = batch.drain()
+        if not items:
+            return
+        try:
+            embeddings = embed_items(items, self.model, encode_batch_size=self.batch_size)
+        except Exception as e:
+            self.stats.increment('files_failed', len(items))
+            self.logger.error(f"Error embedding batch of {len(items)} files: {e}")
+            return
+        self.stats.increment('embeddings', len(embeddings))
+        self.write_queue.put((items, embeddings))
+
+    def _write_worker(self):
+        while True:
+            entry = self.write_queue.get()
+            if entry is _SENTINEL:
+                return
+            items, embeddings = entry
+            try:
+                write_items(items, embeddings, self.collection, self.manifest, self.lexical_index,
+                            self.symbol_index)
+            except Exception as e:
+                self.stats.increment('files_failed', len(items))
+                self.logger.error(f"Error writing batch of {len(items)} files: {e}")
+                continue
+            # Checkpoint after every committed batch so an interrupted scan resumes from here
+            self.manifest.save()
+            for item in items:
+                self.stats.increment('files_added' if item.status == 'added' else 'files_updated')
+                self.logger.debug(f"Processed file: {item.id}")
@@ -0,0 +1,79 @@
+import sys
+import threading
+import time
+from datetime import timedelta
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is simply not reported there
+    resource = None
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB, or 0.0 when unknown."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes everywhere else
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class ScanProgress:
+    """
+    Periodically reports the progress of a running ScanPipeline.
+    On a terminal the report is a single line redrawn in place; otherwise it is logged.
+    """
+
+    def __init__(self, pipeline, interval=1.0, log_interval=10.0, stream=None):
+        self.logger = get_configured_logger(__name__)
+        self.pipeline = pipeline
+        self.stream = stream or sys.stderr
+        self.interactive = self.stream.isatty()
+        self.interval = interval if self.interactive else log_interval
+        self.start_time = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="scan-progress", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.interactive:
+            # Leave the final figures on screen and move past the progress line
+            self.stream.write(f"\r{self.format_line()}\n")
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            if self.interactive:
+                self.stream.write(f"\r{self.format_line()}")
+                self.stream.flush()
+            else:
+                self.logger.info(self.format_line())
+
+    def format_line(self) -> str:
+        stats = self.pipeline.stats.snapshot()
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        files_done = (stats.get('files_processed', 0) + stats.get('files_unchanged', 0)
+                      + stats.get('files_failed', 0) + stats.get('files_skipped', 0))
+        files_queued = stats.get('files_queued', 0)
+        files_rate = stats.get('files_processed', 0) / elapsed
+        embeddings_rate = stats.get('embeddings', 0) / elapsed
+
+        # Files are discovered while the scan runs, so the ETA only covers files found so far
+        done_rate = files_done / elapsed
+        remaining = max(files_queued - files_done, 0)
+        if done_rate > 0:
+            eta = str(timedelta(seconds=int(remaining / done_rate)))
+            if not self.pipeline.walk_complete:
+                eta = f"~{eta}"
+        else:
+            eta = "?"
+
+        return (f"{files_done}/{files_queued} files | {files_rate:.1f} files/s | "
+                f"{embeddings_rate:.1f} embeddings/s | ETA {eta} | peak RSS {peak_rss_mb():.0f} MB")
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from pathlib import Path
+from py_engineering_chat.research.scan_codebase import CodebaseScanner, ALWAYS_SKIP_DIRS, ALWAYS_SKIP_FILES
+from py_engineering_chat.util.file_enumerator import FileEnumerator
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+try:
+    # watchdog uses inotify on Linux; without it we fall back to polling snapshots
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+class ChangeCollector:
+    """Coalesces change events into a set of relative paths and releases them once things go quiet."""
+
+    def __init__(self, debounce_seconds=1.0, max_wait_seconds=10.0):
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._first_event = None
+        self._last_event = None
+
+    def add(self, relative_path: str):
+        now = time.monotonic()
+        with self._lock:
+            self._pending.add(relative_path)
+            self._last_event = now
+            if self._first_event is None:
+                self._first_event = now
+
+    def drain_ready(self) -> set:
+        """
+        Return the pending paths if no event arrived for debounce_seconds, or if events
+        have kept coming for longer than max_wait_seconds (e.g. a long branch switch).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending:
+                return set()
+            quiet = now - self._last_event >= self.debounce_seconds
+            overdue = now - self._first_event >= self.max_wait_seconds
+            if not (quiet or overdue):
+                return set()
+            paths = self._pending
+            self._pending = set()
+            self._first_event = None
+            self._last_event = None
+            return paths
+
+class _WatchdogHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory and event.event_type != 'moved':
+            return
+        self.watcher.record_change(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.watcher.record_change(dest_path)
+
+class ProjectWatcher:
+    """
+    Keeps the codebase_{project} collection in sync with the directory scan-project indexes: the
+    project's shadow clone, where FileWriteTool edits land, or its directory when it has no clone.
+    Change events are debounced and coalesced, then pushed through the regular scan
+    pipeline so the scanner's skip rules, evaluator and embedding model all apply.
+    """
+
+    def __init__(self, project_name, debounce_seconds=1.0, max_wait_seconds=10.0, poll_interval=2.0,
+                 full_rescan_threshold=500, use_polling=False, batch_size=32):
+        self.logger = get_configured_logger(__name__)
+        # Watch the same root scan-project indexes, so both write the same manifest paths
+        self.scanner = CodebaseScanner(project_name, batch_size=batch_size)
+        self.watch_dir = Path(os.path.abspath(self.scanner.project_dir))
+
+        self.project_name = project_name
+        self.poll_interval = poll_interval
+        self.full_rescan_threshold = full_rescan_threshold
+        self.use_polling = use_polling or Observer is None
+        self.collector = ChangeCollector(debounce_seconds, max_wait_seconds)
+        self.stop_event = threading.Event()
+        self.scanner.open_collection(incremental=True)
+
+    def record_change(self, path: str):
+        try:
+            relative_path = Path(path).resolve().relative_to(self.watch_dir.resolve())
+        except ValueError:
+            return
+        if relative_path.parts and relative_path.parts[0] == '.git':
+            return
+        self.collector.add(relative_path.as_posix())
+
+    def _snapshot(self) -> dict:
+        enumerator = FileEnumerator(self.watch_dir, skip_dirs=ALWAYS_SKIP_DIRS, skip_files=ALWAYS_SKIP_FILES)
+        snapshot = {}
+        for relative_path in enumerator.list_files():
+            try:
+                stat = os.stat(self.watch_dir / relative_path)
+            except OSError:
+                continue
+            snapshot[relative_path] = (stat.st_size, stat.st_mtime)
+        return snapshot
+
+    def _poll(self):
+        previous = self._snapshot()
+        while not self.stop_event.wait(self.poll_interval):
+            current = self._snapshot()
+            for relative_path in previous.keys() | current.keys():
+                if previous.get(relative_path) != current.get(relative_path):
+                    self.collector.add(relative_path)
+            previous = current
+
+    def apply_changes(self, relative_paths):
+        """Re-embed changed paths and drop vectors for paths that no longer exist."""
+        existing, removed = [], []
+        for relative_path in relative_paths:
+            full_path = self.watch_dir / relative_path
+            if full_path.is_file():
+                existing.append(relative_path)
+            elif full_path.is_dir():
+                # A folder moved into place arrives as a single event for the folder itself
+                enumerator = FileEnumerator(full_path, skip_dirs=ALWAYS_SKIP_DIRS, use_git=False)
+                existing.extend(f"{relative_path}/{f}" for f in enumerator.list_files())
+            else:
+                removed.append(relative_path)
+
+        if len(relative_paths) >= self.full_rescan_threshold:
+            # Large bursts (branch switches, big merges) are cheaper as one incremental sweep
+            self.logger.info(f"{len(relative_paths)} paths changed, running an incremental rescan.")
+            pipeline = self.scanner.run_pipeline(incremental=True)
+            deleted = self.scanner.delete_paths(self.scanner.manifest.paths() - pipeline.seen_paths)
+        else:
+            pipeline = self.scanner.run_pipeline(paths=existing, incremental=True)
+            # A removed folder shows up as one path; drop everything indexed beneath it too
+            indexed = self.scanner.manifest.paths()
+            to_delete = {p for p in indexed for r in removed if p == r or p.startswith(r.rstrip('/') + '/')}
+            deleted = self.scanner.delete_paths(to_delete)
+
+        self.scanner.manifest.save()
+        stats = pipeline.stats
+        self.logger.info(
+            f"Index updated: {stats['files_added']} added, {stats['files_updated']} updated, "
+            f"{deleted} deleted, {stats['files_unchanged']} unchanged."
+        )
+
+    def run(self):
+        if self.use_polling:
+            if Observer is None:
+                self.logger.info("watchdog is not installed, so changes are found by polling. "
+                                 "Install the 'watch' extra for event-based watching.")
+            self.logger.info(f"Watching {self.watch_dir} by polling every {self.poll_interval}s.")
+            watcher_thread = threading.Thread(target=self._poll, name="watch-poller", daemon=True)
+            watcher_thread.start()
+            observer = None
+        else:
+            self.logger.info(f"Watching {self.watch_dir} for changes.")
+            observer = Observer()
+            observer.schedule(_WatchdogHandler(self), str(self.watch_dir), recursive=True)
+            observer.start()
+
+        try:
+            while not self.stop_event.is_set():
+                paths = self.collector.drain_ready()
+                if paths:
+                    try:
+                        self.apply_changes(sorted(paths))
+                    except Exception as e:
+                        self.logger.error(f"Error updating index for {len(paths)} changed paths: {e}", exc_info=True)
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            self.logger.info("Stopping watcher.")
+        finally:
+            self.stop_event.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self.scanner.close()
+
+def watch_project(project_name, debounce_seconds=1.0, poll_interval=2.0, use_polling=False):
+    watcher = ProjectWatcher(project_name, debounce_seconds=debounce_seconds, poll_interval=poll_interval,
+                             use_polling=use_polling)
+    watcher.run()
@@ -0,0 +1,44 @@
+from py_engineering_chat.util.code_chunker import chunk_by_size, chunk_file, chunk_python
+
+PYTHON_SOURCE = '''import os
+
+CONSTANT = 1
+
+@decorator
+def first():
+    return 1
+
+class Second:
+    def method(self):
+        return 2
+
+print(first())
+'''
+
+def test_chunk_python_splits_on_top_level_definitions():
+    chunks = chunk_python('module.py', PYTHON_SOURCE)
+    spans = [(chunk.start_line, chunk.end_line) for chunk in chunks]
+    assert spans == [(1, 4), (5, 7), (9, 11), (12, 13)]
+    assert chunks[1].content.startswith('@decorator')
+    assert chunks[2].id == 'module.py:9-11'
+    assert chunks[2].document.startswith('Path: module.py (lines 9-11)')
+
+def test_chunk_python_falls_back_to_size_on_syntax_error():
+    chunks = chunk_python('broken.py', 'def broken(:\n    pass\n')
+    assert len(chunks) == 1
+    assert (chunks[0].start_line, chunks[0].end_line) == (1, 2)
+
+def test_chunk_by_size_overlaps_windows():
+    content = ''.join(f"line {i}\n" for i in range(1, 101))
+    chunks = chunk_by_size('notes.txt', content, max_chars=200, overlap_lines=2)
+    assert chunks[0].start_line == 1
+    assert chunks[-1].end_line == 100
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start_line == previous.end_line - 1
+
+def test_chunk_file_splits_large_definitions():
+    body = ''.join(f"    value_{i} = {i}\n" for i in range(200))
+    chunks = chunk_file('big.py', f"def big():\n{body}", max_chars=500)
+    assert len(chunks) > 1
+    assert chunks[0].start_line == 1
+    assert chunks[-1].end_line == 201
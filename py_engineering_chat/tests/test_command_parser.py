@@ -0,0 +1,45 @@
+import threading
+import time
+from py_engineering_chat.util import command_parser
+from py_engineering_chat.util.context_model import ContextData
+
+class _Settings:
+    def get_setting(self, key, default=None):
+        return 0.2 if key == 'command_timeout_seconds' else default
+
+class _Logger:
+    def __init__(self):
+        self.warnings = []
+
+    def debug(self, message):
+        pass
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+    def error(self, message):
+        raise AssertionError(message)
+
+def test_slow_handler_times_out_without_holding_up_the_rest(monkeypatch):
+    release = threading.Event()
+
+    def slow(user_input, settings_manager, deadline):
+        release.wait(5)
+        return ContextData(context=["slow"])
+
+    def fast(user_input, settings_manager, deadline):
+        return ContextData(context=["fast"])
+
+    logger = _Logger()
+    monkeypatch.setattr(command_parser, 'get_configured_logger', lambda name: logger)
+    monkeypatch.setattr(command_parser, 'COMMAND_HANDLERS', {r'@slow': slow, r'@fast': fast, r'@also': fast})
+    try:
+        start = time.monotonic()
+        results = command_parser.parse_commands("@slow @fast @also", _Settings())
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+
+    assert [context_data.context for context_data in results] == [["fast"], ["fast"]]
+    assert elapsed < 2
+    assert len(logger.warnings) == 1 and logger.warnings[0].startswith("Handler for @slow timed out")
@@ -0,0 +1,34 @@
+from py_engineering_chat.util.context_model import ContextData
+from py_engineering_chat.util.context_packer import count_tokens, pack_context
+
+def test_add_context_keeps_strings_whole():
+    context_data = ContextData()
+    context_data.add_context("def scan(): pass")
+    assert context_data.context == ["def scan(): pass"]
+
+def test_pack_context_dedupes_and_respects_budget():
+    chunk = "\n".join(f"line {i} of the scanner" for i in range(40))
+    overlapping = "\n".join(f"line {i} of the scanner" for i in range(2, 40))
+    search = ContextData(context=[chunk, overlapping, "x = 1\n" * 400, "y = 2\n" * 400], context_description="Search")
+    memory = ContextData(context=["user: how does scanning work?"], context_description="Memory")
+
+    packed = pack_context([search, memory], max_tokens=400)
+
+    assert packed.tokens <= 400
+    assert count_tokens(packed.text) <= 400
+    assert "user: how does scanning work?" in packed.text
+    assert packed.truncated == 1
+    assert [snippet.reason for snippet in packed.dropped] == ['duplicate', 'budget']
+
+def test_pack_context_only_marks_included_lines_as_seen():
+    long_chunk = "\n".join(f"head line {i} of the module" for i in range(20)) + "\n" + \
+        "\n".join(f"tail line {i} of the module" for i in range(200))
+    tail = "\n".join(f"tail line {i} of the module" for i in range(150, 200))
+    search = ContextData(context=[long_chunk, tail], context_description="Search")
+
+    packed = pack_context([search], max_tokens=300)
+
+    assert packed.truncated == 1
+    assert "tail line 199" not in packed.text
+    # The tail was cut from the first snippet, so the second one is not a duplicate of the prompt
+    assert [snippet.reason for snippet in packed.dropped] == ['budget']
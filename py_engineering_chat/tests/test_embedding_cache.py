@@ -0,0 +1,68 @@
+import numpy as np
+from py_engineering_chat.util.embedding_cache import CachedEmbedder, EmbeddingCache
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, show_progress_bar=False):
+        self.encoded.extend(texts)
+        vectors = np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True) if normalize_embeddings else vectors
+
+def test_cached_embedder_encodes_each_text_once(tmp_path):
+    model = CountingModel()
+    cache = EmbeddingCache(tmp_path)
+    embedder = CachedEmbedder('test-model', cache, lambda name, device: model)
+
+    first = embedder.encode(['a', 'bb', 'a'])
+    second = embedder.encode(['bb', 'ccc'])
+
+    assert model.encoded == ['a', 'bb', 'ccc']
+    assert first.tolist() == [[1, 1], [2, 1], [1, 1]]
+    assert second.tolist() == [[2, 1], [3, 1]]
+    assert embedder.encode('a').tolist() == [1, 1]
+    assert cache.hits == 2
+    assert cache.misses == 4
+
+def test_cached_embedder_keys_vectors_on_encode_options(tmp_path):
+    model = CountingModel()
+    embedder = CachedEmbedder('test-model', EmbeddingCache(tmp_path), lambda name, device: model)
+
+    assert embedder.encode(['ab']).tolist() == [[2, 1]]
+    normalized = embedder.encode(['ab'], normalize_embeddings=True)
+    assert np.allclose(np.linalg.norm(normalized, axis=1), 1.0)
+    # Options that only affect how results are reported share the plain entries
+    assert embedder.encode(['ab'], show_progress_bar=True).tolist() == [[2, 1]]
+    assert model.encoded == ['ab', 'ab']
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_entries=2)
+    cache.put_many('m', {'one': np.ones(2)})
+    cache.put_many('m', {'two': np.ones(2)})
+    cache.get_many('m', ['one'])
+    cache.put_many('m', {'three': np.ones(2)})
+    assert set(cache.get_many('m', ['one', 'two', 'three'])) == {'one', 'three'}
+
+def test_cache_batches_last_used_updates_and_tracks_its_size(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_entries=3)
+    for name in ['one', 'two', 'three', 'four']:
+        cache.put_many('m', {name: np.ones(2)})
+    cache.put_many('m', {'four': np.ones(2)})
+    assert cache._count == 3
+
+    def last_used(text_hash):
+        reader = EmbeddingCache(tmp_path, max_entries=3)
+        try:
+            assert reader._count == 3
+            return reader._conn.execute("SELECT last_used FROM embeddings WHERE text_hash = ?",
+                                        (text_hash,)).fetchone()[0]
+        finally:
+            reader.close()
+
+    before = last_used('two')
+    cache.get_many('m', ['two'])
+    # Lookups are only written out in batches
+    assert last_used('two') == before
+    cache.flush()
+    assert last_used('two') > before
@@ -0,0 +1,41 @@
+import threading
+import numpy as np
+import pytest
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.embedding_server import EmbeddingServer, get_server_client
+
+class _Model:
+    def __init__(self, value):
+        self.value = value
+
+    def encode(self, texts, batch_size=32):
+        return np.full((len(texts), 2), self.value, dtype=np.float32)
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(tmp_path))
+    path = tmp_path / 'embed.sock'
+    ChatSettingsManager().set_setting('embedding_server.socket_path', str(path))
+    return path
+
+def test_client_falls_back_without_a_running_server(socket_path):
+    local = _Model(1.0)
+    assert get_server_client('model', lambda: local) is None
+
+    # A socket file left by a server that died is not a server
+    socket_path.touch()
+    client = get_server_client('model', lambda: local)
+    assert client.encode(['a', 'b']).tolist() == [[1.0, 1.0], [1.0, 1.0]]
+
+def test_server_serves_clients_and_is_not_taken_over(socket_path):
+    server = EmbeddingServer(socket_path, _Model(2.0), 'model')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = get_server_client('model', lambda: _Model(1.0))
+        assert client.encode('a').tolist() == [2.0, 2.0]
+        with pytest.raises(OSError):
+            EmbeddingServer(socket_path, _Model(3.0), 'model')
+        assert client.encode('a').tolist() == [2.0, 2.0]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+import pygit2
+import pytest
+from py_engineering_chat.util.file_enumerator import FileEnumerator, compile_skip_patterns
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'app.py').write_text('print("app")')
+    (tmp_path / 'src' / 'app.pyc').write_text('')
+    (tmp_path / 'node_modules').mkdir()
+    (tmp_path / 'node_modules' / 'lib.js').write_text('')
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'logs' / 'today.txt').write_text('')
+    (tmp_path / 'README.md').write_text('# readme')
+    (tmp_path / '.gitignore').write_text('logs/\n*.pyc\n')
+    return tmp_path
+
+def test_compile_skip_patterns():
+    regex = compile_skip_patterns(['*.pyc', 'README*', '.env'])
+    assert regex.match('module.pyc')
+    assert regex.match('README.md')
+    assert regex.match('.env')
+    assert not regex.match('module.py')
+
+def test_list_files_honors_gitignore_and_skip_rules(project):
+    enumerator = FileEnumerator(project, skip_dirs={'node_modules'}, skip_files={'*.md'}, use_git=False)
+    assert sorted(enumerator.list_files()) == ['.gitignore', 'src/app.py']
+    assert enumerator.dirs_skipped == 1
+    assert enumerator.files_skipped == 1
+
+def test_walk_allows_pruning(project):
+    enumerator = FileEnumerator(project, use_git=False)
+    seen = []
+    for root, dirs, files in enumerator.walk():
+        dirs[:] = [d for d in dirs if d != 'src']
+        seen.extend(files)
+    assert 'app.py' not in seen
+    assert 'lib.js' in seen
+
+def test_list_files_from_git_index(project):
+    repo = pygit2.init_repository(str(project))
+    (project / 'src' / 'removed.py').write_text('')
+    for path in ['src/app.py', 'src/removed.py', 'node_modules/lib.js', 'README.md', '.gitignore']:
+        repo.index.add(path)
+    repo.index.write()
+    (project / 'src' / 'removed.py').unlink()
+    (project / 'src' / 'new.py').write_text('')
+
+    # Deleted index entries are dropped, untracked files are added unless ignored
+    enumerator = FileEnumerator(project, skip_dirs={'node_modules'}, skip_files={'*.md'})
+    assert sorted(enumerator.list_files()) == ['.gitignore', 'src/app.py', 'src/new.py']
+    assert enumerator.dirs_skipped == 1
+    assert enumerator.files_skipped == 1
+
+    tracked_only = FileEnumerator(project, skip_dirs={'node_modules'}, skip_files={'*.md'}, include_untracked=False)
+    assert sorted(tracked_only.list_files()) == ['.gitignore', 'src/app.py']
+
+    # A project inside the repository only sees its own paths, relative to itself
+    assert FileEnumerator(project / 'src').list_files() == ['app.py', 'new.py']
+
+def test_git_index_skips_submodules_and_folder_symlinks(project):
+    repo = pygit2.init_repository(str(project))
+    repo.index.add('src/app.py')
+    # A submodule is a gitlink entry pointing at a folder with its own repository
+    submodule = pygit2.init_repository(str(project / 'vendor'))
+    (project / 'vendor' / 'lib.py').write_text('')
+    repo.index.add(pygit2.IndexEntry('vendor', submodule.index.write_tree(), pygit2.GIT_FILEMODE_COMMIT))
+    (project / 'src_link').symlink_to(project / 'src', target_is_directory=True)
+    repo.index.add('src_link')
+    repo.index.write()
+    (project / 'untracked_link').symlink_to(project / 'src', target_is_directory=True)
+
+    enumerator = FileEnumerator(project, skip_dirs={'node_modules'}, skip_files={'*.md'})
+    assert sorted(enumerator.list_files()) == ['.gitignore', 'src/app.py']
@@ -0,0 +1,43 @@
+import pygit2
+from py_engineering_chat.util.git_changes import get_changes_since, get_head_commit
+
+def _commit(repo, message):
+    repo.index.add_all()
+    repo.index.write()
+    tree = repo.index.write_tree()
+    signature = pygit2.Signature('test', 'test@example.com')
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+    return str(repo.create_commit('HEAD', signature, signature, message, tree, parents))
+
+def test_changes_since_reports_renames_and_deletes(tmp_path):
+    repo = pygit2.init_repository(str(tmp_path))
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'kept.py').write_text('x = 1\n')
+    (tmp_path / 'src' / 'old_name.py').write_text('def moved():\n    return "same content"\n')
+    (tmp_path / 'removed.py').write_text('y = 2\n')
+    first = _commit(repo, 'first')
+
+    (tmp_path / 'src' / 'old_name.py').rename(tmp_path / 'src' / 'new_name.py')
+    (tmp_path / 'removed.py').unlink()
+    (tmp_path / 'src' / 'kept.py').write_text('x = 3\n')
+    (tmp_path / 'added.py').write_text('z = 4\n')
+    repo.index.remove('src/old_name.py')
+    repo.index.remove('removed.py')
+    second = _commit(repo, 'second')
+
+    changes = get_changes_since(tmp_path, first)
+    assert changes.head_commit == second == get_head_commit(tmp_path)
+    assert changes.changed == ['added.py', 'src/kept.py', 'src/new_name.py']
+    assert changes.deleted == ['removed.py', 'src/old_name.py']
+
+    # A project inside the repository only sees its own paths, relative to itself
+    nested = get_changes_since(tmp_path / 'src', first)
+    assert nested.changed == ['kept.py', 'new_name.py']
+    assert nested.deleted == ['old_name.py']
+
+def test_changes_since_unknown_commit_or_directory(tmp_path):
+    assert get_changes_since(tmp_path, 'HEAD') is None
+    repo = pygit2.init_repository(str(tmp_path))
+    (tmp_path / 'a.py').write_text('')
+    _commit(repo, 'first')
+    assert get_changes_since(tmp_path, '0' * 40) is None
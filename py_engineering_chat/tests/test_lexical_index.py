@@ -0,0 +1,29 @@
+from py_engineering_chat.util.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize_code
+
+def test_tokenize_code_splits_snake_and_camel_case():
+    tokens = tokenize_code("def getProjectShadow(get_project_shadow_directory): HTTPServer")
+    assert 'getprojectshadow' in tokens
+    assert 'get_project_shadow_directory' in tokens
+    assert {'project', 'shadow', 'directory', 'http', 'server'} <= set(tokens)
+
+def test_search_ranks_exact_identifier_first_and_deletes_by_path(tmp_path):
+    index = LexicalIndex(tmp_path / 'index.sqlite')
+    index.add_documents(
+        ['a.py:1-3', 'b.py:1-3', 'c.py:1-3'],
+        ['def get_project_shadow_directory(self): pass',
+         'shadow = settings.get_setting("shadow_directory")',
+         'def unrelated(): return 1'],
+        ['a.py', 'b.py', 'c.py']
+    )
+    results = index.search('where is get_project_shadow_directory used')
+    assert results[0][0] == 'a.py:1-3'
+    assert 'c.py:1-3' not in dict(results)
+
+    index.delete_paths(['a.py'])
+    assert len(index) == 2
+    assert 'a.py:1-3' not in dict(index.search('get_project_shadow_directory'))
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = [doc_id for doc_id, _ in reciprocal_rank_fusion([['x', 'y', 'z'], ['y', 'w']])]
+    assert fused[0] == 'y'
+    assert set(fused) == {'x', 'y', 'z', 'w'}
@@ -0,0 +1,17 @@
+import numpy as np
+from py_engineering_chat.util.mmr import maximal_marginal_relevance
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [0.95, 0.31, 0.0],   # near-copy of the best match
+        [0.95, 0.30, 0.01],  # best match
+        [0.80, 0.0, 0.60],   # slightly less relevant but different
+    ])
+    assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=0.5) == [1, 2]
+    # With lambda 1 it is plain similarity ranking
+    assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=1.0) == [1, 0]
+
+def test_mmr_handles_fewer_candidates_than_k():
+    assert maximal_marginal_relevance([1.0, 0.0], [[1.0, 0.0]], 3) == [0]
+    assert maximal_marginal_relevance([1.0, 0.0], np.zeros((0, 2)), 3) == []
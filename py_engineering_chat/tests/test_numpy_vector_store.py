@@ -0,0 +1,42 @@
+import numpy as np
+from py_engineering_chat.util import numpy_vector_store
+from py_engineering_chat.util.numpy_vector_store import NumpyVectorStore
+
+def _vectors(count, dim=8):
+    vectors = np.random.default_rng(0).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_query_returns_exact_nearest_neighbours_and_filters(tmp_path):
+    vectors = _vectors(50)
+    store = NumpyVectorStore(tmp_path, 'test')
+    store.add(ids=[str(i) for i in range(50)], embeddings=vectors, documents=[f"doc {i}" for i in range(50)],
+              metadatas=[{"path": f"file_{i % 5}.py"} for i in range(50)])
+
+    result = store.query(query_embeddings=[vectors[7]], n_results=3)
+    assert result['ids'][0][0] == '7'
+    assert result['documents'][0][0] == 'doc 7'
+    assert result['distances'][0][0] < 1e-2
+    assert result['embeddings'] is None
+
+    filtered = store.query(query_embeddings=[vectors[7]], n_results=50, where={"path": "file_1.py"})
+    assert sorted(filtered['ids'][0], key=int) == [str(i) for i in range(1, 50, 5)]
+
+def test_updates_and_deletes_survive_reopen_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(numpy_vector_store, 'COMPACT_MIN_DEAD_ROWS', 4)
+    vectors = _vectors(20)
+    store = NumpyVectorStore(tmp_path, 'test')
+    store.upsert(ids=[str(i) for i in range(10)], embeddings=vectors[:10], documents=['old'] * 10,
+                 metadatas=[{"path": "a.py"}] * 10)
+    reader = NumpyVectorStore(tmp_path, 'test')
+
+    store.upsert(ids=['0', '1'], embeddings=vectors[10:12], documents=['new', 'new'], metadatas=[{"path": "b.py"}] * 2)
+    store.update(ids=['2'], metadatas=[{"path": "c.py"}])
+    store.delete(where={"path": "a.py"})
+
+    # Seven dead rows against three live ones triggers compaction
+    assert store._rows == 3
+    for handle in (store, reader, NumpyVectorStore(tmp_path, 'test')):
+        assert handle.count() == 3
+        assert handle.get(ids=['0'])['documents'] == ['new']
+        assert handle.get(where={"path": "c.py"})['ids'] == ['2']
+        assert handle.query(query_embeddings=[vectors[10]], n_results=1)['ids'] == [['0']]
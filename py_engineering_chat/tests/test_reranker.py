@@ -0,0 +1,42 @@
+import time
+from py_engineering_chat.util import reranker
+
+class _SlowCrossEncoder:
+    def __init__(self, seconds_per_batch):
+        self.seconds_per_batch = seconds_per_batch
+        self.scored = 0
+
+    def predict(self, pairs):
+        time.sleep(self.seconds_per_batch)
+        self.scored += len(pairs)
+        # Longer documents score higher, so a full rerank reverses the incoming order
+        return [len(document) for _, document in pairs]
+
+def test_rerank_orders_by_score_within_budget(monkeypatch):
+    model = _SlowCrossEncoder(0)
+    monkeypatch.setattr(reranker, 'get_cross_encoder', lambda model_name: model)
+    documents = ['x' * length for length in range(1, 11)]
+    assert reranker.rerank('query', documents, k=3, time_budget_ms=1000) == [9, 8, 7]
+
+def test_rerank_stops_at_budget_and_keeps_vector_order_for_the_rest(monkeypatch):
+    model = _SlowCrossEncoder(0.05)
+    monkeypatch.setattr(reranker, 'get_cross_encoder', lambda model_name: model)
+    documents = ['x' * length for length in range(1, 4 * reranker.RERANK_BATCH_SIZE + 1)]
+
+    order = reranker.rerank('query', documents, k=len(documents), time_budget_ms=30)
+
+    # Only the first batch is scored before the budget runs out
+    assert model.scored == reranker.RERANK_BATCH_SIZE
+    assert order == list(range(reranker.RERANK_BATCH_SIZE))[::-1] + list(range(reranker.RERANK_BATCH_SIZE, len(documents)))
+
+def test_model_load_does_not_count_against_budget(monkeypatch):
+    model = _SlowCrossEncoder(0)
+
+    def load(model_name):
+        time.sleep(0.1)
+        return model
+
+    monkeypatch.setattr(reranker, 'get_cross_encoder', load)
+    documents = ['x' * length for length in range(1, 11)]
+    assert reranker.rerank('query', documents, k=2, time_budget_ms=50) == [9, 8]
+    assert model.scored == len(documents)
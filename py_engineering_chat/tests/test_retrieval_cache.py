@@ -0,0 +1,28 @@
+from py_engineering_chat.util.collection_versions import bump_collection_version
+from py_engineering_chat.util.retrieval_cache import RetrievalCache
+
+def test_cache_serves_rephrased_queries_until_collection_version_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(tmp_path))
+    cache = RetrievalCache(max_entries=2)
+    calls = []
+
+    def search():
+        calls.append(1)
+        return [[f"result {len(calls)}"]]
+
+    assert cache.get_or_compute('docs', 'How do I scan?', 3, search) == [['result 1']]
+    assert cache.get_or_compute('docs', '  how do i   scan ', 3, search) == [['result 1']]
+    assert cache.get_or_compute('docs', 'how do i scan', 5, search) == [['result 2']]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.summary() == "1 hits, 2 misses, 2 entries (33% hit ratio)"
+
+    bump_collection_version('docs')
+    assert cache.get_or_compute('docs', 'how do i scan', 3, search) == [['result 3']]
+
+def test_cache_expires_entries_after_ttl(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(tmp_path))
+    cache = RetrievalCache(ttl_seconds=0)
+    calls = []
+    cache.get_or_compute('docs', 'query', 3, lambda: calls.append(1) or [['x']])
+    cache.get_or_compute('docs', 'query', 3, lambda: calls.append(1) or [['x']])
+    assert len(calls) == 2
@@ -0,0 +1,75 @@
+import json
+import numpy as np
+import pytest
+from py_engineering_chat.research import scan_codebase as scan_module
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.scan_manifest import ScanManifest
+
+class _Model:
+    def __init__(self):
+        self.texts = []
+
+    def encode(self, texts, batch_size=32):
+        self.texts.extend(texts)
+        return np.ones((len(texts), 4))
+
+class _Evaluator:
+    total_evaluations = total_requests = rule_decisions = 0
+    contextual_ratio = 1.0
+
+    def __init__(self, decision_cache=None):
+        pass
+
+    def evaluate_batch(self, paths, item_type):
+        return {path: (True, '') for path in paths}
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    shadow = tmp_path / 'shadow'
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(shadow))
+    model = _Model()
+    monkeypatch.setattr(scan_module, 'get_embedder', lambda: model)
+    monkeypatch.setattr(scan_module, 'ContextEvaluator', _Evaluator)
+    settings = ChatSettingsManager()
+    settings.set_setting('retrieval.vector_store', 'numpy')
+    directory = tmp_path / 'demo'
+    directory.mkdir()
+    for name in ['a.py', 'b.py', 'c.py']:
+        (directory / name).write_text(f"# {name}\n")
+    settings.set_setting('projects.demo.directory', str(directory))
+    return shadow, model
+
+def _interrupt_after_first_file(shadow):
+    # What a scan killed after its first checkpoint leaves behind
+    manifest = ScanManifest(str(shadow), 'codebase_demo').load()
+    for path in ['b.py', 'c.py']:
+        manifest.remove(path)
+    manifest.begin_scan()
+
+def _report(shadow):
+    return json.loads((shadow / '.scan_reports' / 'codebase_demo.json').read_text())
+
+def test_resume_continues_an_interrupted_scan(project):
+    shadow, model = project
+    scan_module.scan_codebase('demo', progress=False)
+    _interrupt_after_first_file(shadow)
+    model.texts.clear()
+
+    collection = scan_module.scan_codebase('demo', resume=True, progress=False)
+
+    report = _report(shadow)
+    assert report['resumed'] and report['completed'] and report['mode'] == 'incremental'
+    assert (report['files']['unchanged'], report['files']['added']) == (1, 2)
+    assert len(model.texts) == 2 and collection.count() == 3
+    assert not ScanManifest(str(shadow), 'codebase_demo').was_interrupted()
+
+def test_interrupted_scan_starts_over_without_resume(project):
+    shadow, model = project
+    scan_module.scan_codebase('demo', progress=False)
+    _interrupt_after_first_file(shadow)
+
+    collection = scan_module.scan_codebase('demo', progress=False)
+
+    report = _report(shadow)
+    assert not report['resumed'] and report['mode'] == 'full'
+    assert report['files']['added'] == 3 and collection.count() == 3
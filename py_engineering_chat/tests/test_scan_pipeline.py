@@ -0,0 +1,69 @@
+import numpy as np
+from py_engineering_chat.research.scan_pipeline import ScanPipeline
+from py_engineering_chat.util.scan_manifest import ScanManifest, file_sha256
+
+class _Model:
+    def encode(self, texts, batch_size=32):
+        return np.zeros((len(texts), 4))
+
+class _Collection:
+    def __init__(self):
+        self.paths = set()
+
+    def delete(self, ids=None, where=None):
+        pass
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.paths.update(metadata['path'] for metadata in metadatas)
+
+class _FailingEvaluator:
+    def evaluate_batch(self, paths, item_type):
+        raise TimeoutError("evaluation timed out")
+
+def test_failed_evaluation_keeps_new_files_seen_and_still_writes_updated_ones(tmp_path):
+    project = tmp_path / 'project'
+    project.mkdir()
+    updated = project / 'updated.py'
+    updated.write_text('x = 1\n')
+    stat = updated.stat()
+    manifest = ScanManifest(str(tmp_path), 'codebase_test')
+    manifest.record('updated.py', stat.st_size, stat.st_mtime, file_sha256(updated))
+    updated.write_text('x = 2\ny = 3\n')
+    (project / 'added.py').write_text('z = 1\n')
+
+    collection = _Collection()
+    pipeline = ScanPipeline(project, collection, manifest, _FailingEvaluator(), _Model(), set(), set(),
+                            incremental=True)
+    stats = pipeline.run()
+
+    assert collection.paths == {'updated.py'}
+    assert stats['files_failed'] == 1
+    # Nothing that still exists may look deleted to the manifest-difference pass
+    assert pipeline.seen_paths == {'updated.py', 'added.py'}
+
+class _FolderEvaluator:
+    def __init__(self):
+        self.folders = []
+
+    def evaluate_batch(self, paths, item_type):
+        if item_type == 'folder':
+            self.folders.extend(paths)
+            return {path: (path != 'build', '') for path in paths}
+        return {path: (True, '') for path in paths}
+
+def test_explicit_paths_apply_folder_decisions_to_ancestors(tmp_path):
+    project = tmp_path / 'project'
+    for path in ['src/pkg/a.py', 'src/pkg/b.py', 'build/lib/out.py', 'top.py']:
+        (project / path).parent.mkdir(parents=True, exist_ok=True)
+        (project / path).write_text('x = 1\n')
+    manifest = ScanManifest(str(tmp_path), 'codebase_test')
+
+    collection = _Collection()
+    evaluator = _FolderEvaluator()
+    pipeline = ScanPipeline(project, collection, manifest, evaluator, _Model(), set(), set())
+    stats = pipeline.run(paths=['src/pkg/a.py', 'src/pkg/b.py', 'build/lib/out.py', 'top.py'])
+
+    assert collection.paths == {'src/pkg/a.py', 'src/pkg/b.py', 'top.py'}
+    # Each folder is decided once; nothing below a rejected folder is asked about
+    assert sorted(evaluator.folders) == ['build', 'src', 'src/pkg']
+    assert stats['files_skipped'] == 1
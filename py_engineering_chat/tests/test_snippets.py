@@ -0,0 +1,18 @@
+from py_engineering_chat.util.code_chunker import CodeChunk
+from py_engineering_chat.util.snippets import extract_snippet
+
+def test_extract_snippet_finds_matching_lines_with_file_line_numbers():
+    lines = [f"    value_{i} = compute({i})" for i in range(40)]
+    lines[25] = "    manifest = ScanManifest(shadow_dir)"
+    chunk = CodeChunk(path='research/scan.py', start_line=101, end_line=140, content='\n'.join(lines) + '\n')
+
+    snippet = extract_snippet('where is ScanManifest created?', chunk.document, window_lines=5)
+
+    assert snippet.path == 'research/scan.py'
+    assert snippet.start_line <= 126 <= snippet.end_line
+    assert snippet.end_line - snippet.start_line == 4
+    assert "126:     manifest = ScanManifest(shadow_dir)" in snippet.format()
+    assert "lines 101-140" in snippet.format()
+
+def test_extract_snippet_ignores_documents_without_header():
+    assert extract_snippet('query', 'plain crawled text') is None
@@ -0,0 +1,42 @@
+from py_engineering_chat.util.symbol_index import SymbolIndex, extract_symbols
+
+PYTHON_SOURCE = '''import os
+from .base import Base
+
+LIMIT = 10
+
+class Scanner(Base):
+    def run(self):
+        def helper():
+            pass
+        return helper()
+
+def main():
+    pass
+'''
+
+def test_extract_python_symbols_and_imports():
+    symbols, imports = extract_symbols('scanner.py', PYTHON_SOURCE)
+    found = {(s.qualname, s.kind, s.start_line, s.end_line) for s in symbols}
+    assert ('LIMIT', 'variable', 4, 4) in found
+    assert ('Scanner', 'class', 6, 10) in found
+    assert ('Scanner.run', 'method', 7, 10) in found
+    assert ('Scanner.run.helper', 'function', 8, 9) in found
+    assert ('main', 'function', 12, 13) in found
+    assert imports == ['os', '.base']
+
+def test_extract_symbols_regex_fallback():
+    source = "import { x } from './util';\nexport async function loadData() {}\nclass Widget {}\n"
+    symbols, imports = extract_symbols('app.js', source)
+    assert [(s.name, s.kind, s.start_line) for s in symbols] == [('loadData', 'function', 2), ('Widget', 'class', 3)]
+    assert imports == ['./util']
+
+def test_symbol_index_lookup_and_replace(tmp_path):
+    index = SymbolIndex(tmp_path / 'symbols.sqlite')
+    index.update_files([('scanner.py',) + extract_symbols('scanner.py', PYTHON_SOURCE)])
+    assert [s.path for s in index.lookup('Scanner.run')] == ['scanner.py']
+    assert index.lookup('run')[0].qualname == 'Scanner.run'
+    assert index.importers('os') == ['scanner.py']
+
+    index.update_files([('scanner.py', [], [])])
+    assert index.lookup('Scanner') == []
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from py_engineering_chat.util import chroma_pool, vector_store
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.collection_versions import get_collection_version
+from py_engineering_chat.util.vector_store import ChromaVectorStore
+from py_engineering_chat.util.vector_store_pool import delete_vector_store, open_vector_store, vector_store_exists
+
+def test_numpy_store_writes_in_batches_pages_and_bumps_version(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(tmp_path))
+    monkeypatch.setattr(vector_store, 'MAX_BATCH_SIZE', 4)
+    ChatSettingsManager().set_setting('retrieval.vector_store', 'numpy')
+    path = str(tmp_path / 'chroma_db')
+
+    with pytest.raises(ValueError):
+        open_vector_store('docs', path)
+    store = open_vector_store('docs', path, create=True)
+    assert open_vector_store('docs', path) is store
+
+    version = get_collection_version('docs')
+    vectors = np.eye(10, dtype=np.float32)
+    store.add(ids=[str(i) for i in range(10)], embeddings=vectors, documents=[f"doc {i}" for i in range(10)],
+              metadatas=[{"path": f"file_{i % 2}.py"} for i in range(10)])
+    assert store.count() == 10
+    assert get_collection_version('docs') != version
+
+    pages = list(store.iter_pages(page_size=3, where={"path": "file_0.py"}))
+    assert [len(page['ids']) for page in pages] == [3, 2]
+
+    version = get_collection_version('docs')
+    store.delete()
+    assert store.count() == 10 and get_collection_version('docs') == version
+
+    assert delete_vector_store('docs', path)
+    assert not vector_store_exists('docs', path)
+
+class _Collection:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def upsert(self, ids, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+
+def test_chroma_store_only_retries_stale_handles(monkeypatch):
+    handles = [_Collection(ValueError("Collection abc does not exist.")), _Collection()]
+    monkeypatch.setattr(chroma_pool, 'get_collection', lambda name, path=None, create=False: handles[0])
+    monkeypatch.setattr(chroma_pool, 'invalidate_collection', lambda name, path=None: handles.pop(0))
+    store = ChromaVectorStore('docs')
+    store.upsert(ids=['a'], documents=['a'])
+    assert handles[0].calls == 1
+
+    handles[0].error = ValueError("Expected metadata value to be a str, int, float or bool")
+    with pytest.raises(ValueError):
+        store.upsert(ids=['b'], documents=['b'])
+    assert handles[0].calls == 2
+
+def test_missing_chroma_collection_is_reported_as_missing(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_SHADOW_DIRECTORY', str(tmp_path))
+    path = str(tmp_path / 'chroma_db')
+
+    # Newer Chroma versions raise NotFoundError here instead of ValueError
+    assert not vector_store_exists('missing', path)
+    with pytest.raises(ValueError):
+        open_vector_store('missing', path)
+    assert not delete_vector_store('missing', path)
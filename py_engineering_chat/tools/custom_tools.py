@@ -6,6 +6,7 @@ from py_engineering_chat.tools.file_read_tool import FileReadTool
 from py_engineering_chat.tools.shell_command_tool import SafeShellCommandTool
 from py_engineering_chat.tools.git_create_branch import GitCreateBranchTool
 from py_engineering_chat.tools.git_commit_tool import GitCommitTool
+from py_engineering_chat.tools.symbol_lookup_tool import SymbolLookupTool
 
 class WeatherInput(BaseModel):
     location: str = Field(description="The name of the location to get weather for. This can be a city, state, country, or any recognizable place name.")
@@ -30,6 +31,7 @@ def get_tools():
     shell_command_tool = SafeShellCommandTool()
     git_create_branch = GitCreateBranchTool()
     git_commit_tool = GitCommitTool()
+    symbol_lookup_tool = SymbolLookupTool()
     
     return [
         directory_structure_tool,
@@ -37,5 +39,6 @@ def get_tools():
         file_read_tool,
         shell_command_tool,
         git_create_branch,
-        git_commit_tool
+        git_commit_tool,
+        symbol_lookup_tool
     ]
@@ -1,18 +1,22 @@
 import os
+from typing import Optional
 from langchain.pydantic_v1 import BaseModel, Field
 from py_engineering_chat.util.logger_util import get_configured_logger
 from py_engineering_chat.tools.base_tool import BaseProjectTool  # Import the base class
 
 class FileReadInput(BaseModel):
     path: str = Field(description="The path to the file to read from, relative to the project shadow directory.")
+    start_line: Optional[int] = Field(default=None, description="First line to read (1-based). Omit to read the whole file.")
+    end_line: Optional[int] = Field(default=None, description="Last line to read, inclusive. Omit to read to the end of the file.")
 
 class FileReadTool(BaseProjectTool):
     name = "file_read"
-    description = "Read content from a file within the project shadow directory"
+    description = ("Read content from a file within the project shadow directory. Give start_line and end_line "
+                   "to read only that range, returned with line numbers, e.g. to expand a codebase search result.")
     args_schema: type[BaseModel] = FileReadInput
 
-    def _run(self, path: str) -> str:
-        """Read content from a file."""
+    def _run(self, path: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> str:
+        """Read content from a file, or the given range of its lines."""
         logger = get_configured_logger(__name__)
         
         # Remove '@' prefix if present
@@ -28,11 +32,18 @@ class FileReadTool(BaseProjectTool):
         try:
             with open(full_path, 'r') as file:
                 content = file.read()
-            return content
+            if start_line is None and end_line is None:
+                return content
+            lines = content.splitlines()
+            first = max(start_line or 1, 1)
+            last = min(end_line or len(lines), len(lines))
+            if first > last:
+                return f"Error: Line range {first}-{last} is outside the file, which has {len(lines)} lines."
+            return '\n'.join(f"{number}: {lines[number - 1]}" for number in range(first, last + 1))
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             return f"Error reading file: {str(e)}"
 
-    async def _arun(self, path: str) -> str:
+    async def _arun(self, path: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> str:
         """Asynchronous version of the file read tool."""
-        return self._run(path)
\ No newline at end of file
+        return self._run(path, start_line, end_line)
\ No newline at end of file
@@ -0,0 +1,40 @@
+from langchain.pydantic_v1 import BaseModel, Field
+from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.symbol_index import format_symbol_definitions, open_project_symbol_index
+from py_engineering_chat.tools.base_tool import BaseProjectTool  # Import the base class
+
+class SymbolLookupInput(BaseModel):
+    name: str = Field(description="The class, function, method or variable name to look up, optionally qualified like 'ClassName.method'.")
+
+class SymbolLookupTool(BaseProjectTool):
+    name = "symbol_lookup"
+    description = """
+    Find where a class, function, method or variable is defined in the current project and return its source.
+    Use this before directory_structure or file_read when you know the name you are looking for.
+    """
+    args_schema: type[BaseModel] = SymbolLookupInput
+
+    def _run(self, name: str) -> str:
+        """Look up a symbol in the project's symbol index."""
+        logger = get_configured_logger(__name__)
+        logger.debug(f"Looking up symbol: {name}")
+        settings_manager = ChatSettingsManager()
+
+        symbol_index = open_project_symbol_index(settings_manager)
+        if symbol_index is None:
+            return "Error: No symbol index for the current project. Run scan-project first."
+
+        try:
+            symbols = symbol_index.lookup(name.strip().lstrip('@'))
+            if not symbols:
+                return f"No definition found for '{name}'."
+            current_project = settings_manager.get_setting('current_project')
+            project_dir = settings_manager.get_project_index_directory(current_project)
+            return format_symbol_definitions(symbols, project_dir)
+        finally:
+            symbol_index.close()
+
+    async def _arun(self, name: str) -> str:
+        """Asynchronous version of the symbol lookup tool."""
+        return self._run(name)
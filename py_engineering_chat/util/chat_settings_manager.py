@@ -22,12 +22,13 @@ class ChatSettingsManager:
         logger = logging.getLogger(__name__)
         logger.setLevel(logging.CRITICAL)  # Default to DEBUG for internal logging
 
-        # Create a console handler for simplicity
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.CRITICAL)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        # Every instance shares this logger, so only the first one adds a handler
+        if not logger.handlers:
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.CRITICAL)
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            console_handler.setFormatter(formatter)
+            logger.addHandler(console_handler)
 
         return logger
 
@@ -130,6 +131,15 @@ class ChatSettingsManager:
             current[keys[-1]].append(value)
             self.save_settings(settings)
 
+    def get_project_index_directory(self, project_name: str):
+        """
+        Return the directory a project's codebase index is built from. The shadow clone is
+        authoritative when there is one: the chat tools read and write files there, so indexed
+        paths and line numbers match what file_read shows. Otherwise it is the project directory.
+        """
+        return (self.get_setting(f'projects.{project_name}.shadow_directory')
+                or self.get_setting(f'projects.{project_name}.directory'))
+
     def get_shadow_directory(self) -> str:
         """Return the shadow directory path."""
         return self.shadow_directory
@@ -160,6 +170,10 @@ class ChatSettingsManager:
 
         return logger
 
+    def get_embedding_backend(self) -> str:
+        """Return the embedding backend to use: 'sentence_transformers', 'onnx' or 'onnx-int8'."""
+        return self.get_setting('embedding_backend', 'sentence_transformers')
+
     def get_docs_options(self) -> list:
         """
         Retrieve the list of documentation options from the settings.
@@ -1,30 +1,23 @@
 import os
 from typing import List, Dict, Any
-import chromadb
-from chromadb.config import Settings
 from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
 from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.chroma_pool import get_chroma_path
+from py_engineering_chat.util.vector_store_pool import open_vector_store, vector_store_exists
 
 class ChromaDB:
     def __init__(self):
         self.settings_manager = ChatSettingsManager()
         self.logger = get_configured_logger(__name__)
-        self.client = self._initialize_client()
+        self.chroma_db_path = get_chroma_path(self.settings_manager.get_ai_shadow_directory())
         self.collection = self._get_or_create_collection()
 
-    def _initialize_client(self):
-        ai_shadow_directory = self.settings_manager.get_ai_shadow_directory()
-        chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
-        self.logger.debug(f"Initializing Chroma client with path: {chroma_db_path}")
-        return chromadb.PersistentClient(path=chroma_db_path)
-
     def _get_or_create_collection(self):
+        # Goes through the vector store pool, so the conversation_history vector_store setting picks the backend
         collection_name = "conversation_history"
-        try:
-            return self.client.get_collection(name=collection_name)
-        except ValueError:
+        if not vector_store_exists(collection_name, self.chroma_db_path):
             self.logger.info(f"Creating new collection: {collection_name}")
-            return self.client.create_collection(name=collection_name)
+        return open_vector_store(collection_name, self.chroma_db_path, create=True)
 
     def add_conversation(self, conversation_id: str, content: str, metadata: Dict[str, Any], embedding: List[float]):
         self.logger.debug(f"Adding conversation with ID: {conversation_id}")
@@ -37,7 +30,7 @@ class ChromaDB:
 
     def get_conversation(self, conversation_id: str):
         self.logger.debug(f"Retrieving conversation with ID: {conversation_id}")
-        result = self.collection.get(ids=[conversation_id])
+        result = self.collection.get(ids=[conversation_id], include=['documents', 'metadatas', 'embeddings'])
         if result['ids']:
             return {
                 'id': result['ids'][0],
@@ -94,7 +87,7 @@ class ChromaDB:
 
     def get_conversations_by_metadata(self, metadata_filter: Dict[str, Any]) -> List[Dict[str, Any]]:
         self.logger.debug(f"Retrieving conversations with metadata filter: {metadata_filter}")
-        results = self.collection.get(where=metadata_filter)
+        results = self.collection.get(where=metadata_filter, include=['documents', 'metadatas', 'embeddings'])
         
         if not results['ids']:
             self.logger.debug("No conversations found matching the metadata filter")
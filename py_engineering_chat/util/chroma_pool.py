@@ -0,0 +1,71 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+# One PersistentClient per store path and one handle per (path, collection) for the whole process,
+# so lookups skip the open cost and every caller shares a single SQLite connection to the store.
+# Callers go through util/vector_store_pool, which wraps these handles in ChromaVectorStore.
+_clients: Dict[str, object] = {}
+_collections: Dict[Tuple[str, str], object] = {}
+_lock = threading.RLock()
+
+def get_chroma_path(shadow_dir: Optional[str] = None) -> str:
+    """Return the absolute path of the Chroma store in the AI shadow directory."""
+    shadow_dir = shadow_dir or ChatSettingsManager.get_ai_shadow_directory()
+    return os.path.abspath(os.path.join(shadow_dir, '.chroma_db'))
+
+def _is_missing_collection_error(error: Exception) -> bool:
+    # Chroma raised ValueError for an unknown collection before 0.5 and NotFoundError since
+    return isinstance(error, ValueError) or type(error).__name__ == 'NotFoundError'
+
+def get_chroma_client(path: Optional[str] = None):
+    # Imported here so processes that only use NumPy collections skip loading chromadb
+    import chromadb
+    path = os.path.abspath(path) if path else get_chroma_path()
+    with _lock:
+        client = _clients.get(path)
+        if client is None:
+            get_configured_logger(__name__).debug(f"Opening Chroma client with path: {path}")
+            client = chromadb.PersistentClient(path=path)
+            _clients[path] = client
+        return client
+
+def get_collection(name: str, path: Optional[str] = None, create: bool = False):
+    """
+    Return the cached handle for a collection. Raises ValueError when the collection does not
+    exist, unless create is set, whichever error the installed Chroma version uses for that.
+    """
+    path = os.path.abspath(path) if path else get_chroma_path()
+    key = (path, name)
+    with _lock:
+        collection = _collections.get(key)
+        if collection is None:
+            client = get_chroma_client(path)
+            try:
+                collection = client.get_or_create_collection(name=name) if create else client.get_collection(name=name)
+            except Exception as e:
+                if not _is_missing_collection_error(e):
+                    raise
+                raise ValueError(f"Collection {name} does not exist.") from e
+            _collections[key] = collection
+        return collection
+
+def invalidate_collection(name: str, path: Optional[str] = None):
+    """Forget the cached handle, e.g. after another process recreated the collection."""
+    path = os.path.abspath(path) if path else get_chroma_path()
+    with _lock:
+        _collections.pop((path, name), None)
+
+def delete_collection(name: str, path: Optional[str] = None) -> bool:
+    """Delete a collection if it exists and drop its cached handle. Returns True if one was deleted."""
+    with _lock:
+        invalidate_collection(name, path)
+        try:
+            get_chroma_client(path).delete_collection(name=name)
+            return True
+        except Exception as e:
+            if not _is_missing_collection_error(e):
+                raise
+            return False
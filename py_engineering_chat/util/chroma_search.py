@@ -1,7 +1,16 @@
-from sentence_transformers import SentenceTransformer
-import chromadb
 from .logger_util import get_configured_logger
+from .embedding_registry import get_embedder
+from .chroma_pool import get_chroma_path
+from .vector_store_pool import open_vector_store
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .chat_settings_manager import ChatSettingsManager
+from .retrieval_settings import get_retrieval_settings
+from .reranker import rerank, DEFAULT_RERANK_BUDGET_MS, DEFAULT_RERANK_FETCH_K, DEFAULT_RERANK_MODEL
+from .retrieval_cache import get_retrieval_cache
+from .mmr import maximal_marginal_relevance, DEFAULT_MMR_FETCH_K, DEFAULT_MMR_LAMBDA
 import os
+import threading
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,7 +19,88 @@ load_dotenv(dotenv_path='../.env')
 # Get a logger instance
 logger = get_configured_logger(__name__)
 
-def search_chroma(collection_name: str, query: str) -> list:
+# Lexical indexes opened for hybrid search, one per collection for the whole process
+_lexical_indexes = {}
+_lexical_lock = threading.Lock()
+
+def _get_lexical_index(chroma_db_path: str, collection_name: str):
+    """Return the collection's lexical index, or None if no scan has built one."""
+    with _lexical_lock:
+        index = _lexical_indexes.get((chroma_db_path, collection_name))
+        if index is None:
+            index_path = LexicalIndex.path_for_collection(chroma_db_path, collection_name)
+            if not index_path.exists():
+                return None
+            index = LexicalIndex(index_path)
+            _lexical_indexes[(chroma_db_path, collection_name)] = index
+        return index
+
+def _candidate_count(settings: dict, n_results: int) -> int:
+    """Over-fetch when the collection is reranked, so the cross-encoder has something to choose from."""
+    if settings.get('rerank', False):
+        return max(n_results, settings.get('rerank_fetch_k', DEFAULT_RERANK_FETCH_K))
+    return n_results
+
+def _rerank_order(collection_name: str, settings: dict, query: str, documents: list):
+    """Cross-encoder order of every document if the collection is reranked; None keeps the incoming order."""
+    if len(documents) <= 1 or not settings.get('rerank', False):
+        return None
+    try:
+        return rerank(
+            query, documents, len(documents),
+            model_name=settings.get('rerank_model', DEFAULT_RERANK_MODEL),
+            time_budget_ms=settings.get('rerank_budget_ms', DEFAULT_RERANK_BUDGET_MS)
+        )
+    except Exception as e:
+        logger.error(f"Error reranking results for {collection_name}: {str(e)}")
+        return None
+
+def _mmr_settings(settings: dict):
+    """Return (enabled, lambda, fetch_k) for the collection's MMR diversification step."""
+    return (bool(settings.get('mmr', False)),
+            float(settings.get('mmr_lambda', DEFAULT_MMR_LAMBDA)),
+            int(settings.get('mmr_fetch_k', DEFAULT_MMR_FETCH_K)))
+
+def _select(collection_name: str, settings: dict, query: str, query_embedding, documents: list, embeddings,
+            n_results: int, relevance=None) -> list:
+    """
+    Pick the final n_results from the candidate pool. The rerank stage orders the pool first; then,
+    if enabled, maximal marginal relevance keeps near-identical files (generated clients,
+    migrations) from filling every slot.
+    """
+    order = _rerank_order(collection_name, settings, query, documents)
+    if order is not None:
+        documents = [documents[index] for index in order]
+        embeddings = [embeddings[index] for index in order] if embeddings is not None else None
+        # The cross-encoder yields a ranking rather than comparable scores, so relevance decays with rank
+        relevance = 1.0 - np.arange(len(documents)) / len(documents)
+    enabled, lambda_mult, _ = _mmr_settings(settings)
+    if not enabled or len(documents) <= n_results or embeddings is None or len(embeddings) != len(documents):
+        return documents[:n_results]
+    picks = maximal_marginal_relevance(query_embedding, embeddings, n_results, lambda_mult, relevance=relevance)
+    return [documents[index] for index in picks]
+
+def _cached(mode: str, collection_name: str, settings_manager, settings: dict, query: str, n_results: int,
+            search) -> list:
+    """Serve repeated queries from the retrieval cache; settings that change the order are part of the key."""
+    cache = get_retrieval_cache(settings_manager)
+    if cache is None:
+        return search()
+    options = (mode, bool(settings.get('rerank', False))) + _mmr_settings(settings)
+    if settings.get('rerank', False):
+        options += (settings.get('rerank_model', DEFAULT_RERANK_MODEL),
+                    settings.get('rerank_fetch_k', DEFAULT_RERANK_FETCH_K),
+                    settings.get('rerank_budget_ms', DEFAULT_RERANK_BUDGET_MS))
+    return cache.get_or_compute(collection_name, query, n_results, search, options=options)
+
+def search_chroma(collection_name: str, query: str, n_results: int = 3) -> list:
+    # Read the settings once; every stage of the search looks them up
+    settings_manager = ChatSettingsManager()
+    settings = get_retrieval_settings(collection_name, settings_manager)
+    return _cached('vector', collection_name, settings_manager, settings, query, n_results,
+                   lambda: _search_chroma(collection_name, settings, query, n_results))
+
+def _search_chroma(collection_name: str, settings: dict, query: str, n_results: int) -> list:
     try:
         logger.debug(f"Starting search in collection: {collection_name} with query: {query}")
         
@@ -20,18 +110,78 @@ def search_chroma(collection_name: str, query: str) -> list:
             raise ValueError("AI_SHADOW_DIRECTORY environment variable is not set")
 
         # Construct the Chroma DB path
-        chroma_db_path = os.path.join(ai_shadow_directory, '.chroma_db')
-        
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        client = chromadb.PersistentClient(path=chroma_db_path)
-        collection = client.get_collection(name=collection_name)
+        chroma_db_path = get_chroma_path(ai_shadow_directory)
         
+        model = get_embedder()
         query_embedding = model.encode([query]).tolist()
         
-        results = collection.query(query_embeddings=query_embedding, n_results=3)
-        logger.debug(f"Search results: {results['documents']}")
+        # Reuse the process-wide store handle instead of opening the store per query
+        candidate_count = _candidate_count(settings, n_results)
+        mmr_enabled, _, mmr_fetch_k = _mmr_settings(settings)
+        fetch_count = max(candidate_count, mmr_fetch_k) if mmr_enabled else candidate_count
+        include = ['documents', 'embeddings'] if mmr_enabled else ['documents']
+        results = open_vector_store(collection_name, chroma_db_path).query(
+            query_embeddings=query_embedding, n_results=fetch_count, include=include)
+        embeddings = results['embeddings'][0] if results.get('embeddings') is not None else None
+        documents = _select(collection_name, settings, query, query_embedding[0], results['documents'][0],
+                            embeddings, n_results)
+        logger.debug(f"Search results: {documents}")
         
-        return results['documents']
+        return [documents]
     except Exception as e:
         logger.error(f"Error searching context: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+def hybrid_search(collection_name: str, query: str, n_results: int = 3, fetch_k: int = 20) -> list:
+    """
+    Fuse vector similarity and BM25 rankings with reciprocal rank fusion, so identifier-heavy
+    queries find exact names the embedding model blurs. Falls back to search_chroma when the
+    collection has no lexical index. Returns documents in the same shape as search_chroma.
+    """
+    settings_manager = ChatSettingsManager()
+    settings = get_retrieval_settings(collection_name, settings_manager)
+    return _cached(f'hybrid:{fetch_k}', collection_name, settings_manager, settings, query, n_results,
+                   lambda: _hybrid_search(collection_name, settings, query, n_results, fetch_k))
+
+def _hybrid_search(collection_name: str, settings: dict, query: str, n_results: int, fetch_k: int) -> list:
+    try:
+        logger.debug(f"Starting hybrid search in collection: {collection_name} with query: {query}")
+        chroma_db_path = get_chroma_path(os.getenv('AI_SHADOW_DIRECTORY'))
+        lexical_index = _get_lexical_index(chroma_db_path, collection_name)
+        if lexical_index is None:
+            return _search_chroma(collection_name, settings, query, n_results)
+
+        query_embedding = get_embedder().encode([query]).tolist()
+        candidate_count = _candidate_count(settings, n_results)
+        mmr_enabled, _, mmr_fetch_k = _mmr_settings(settings)
+        pool_size = max(candidate_count, mmr_fetch_k) if mmr_enabled else candidate_count
+        include = ['documents', 'embeddings'] if mmr_enabled else ['documents']
+        fetch_k = max(fetch_k, pool_size)
+        store = open_vector_store(collection_name, chroma_db_path)
+        vector_results = store.query(query_embeddings=query_embedding, n_results=fetch_k, include=include)
+        documents = dict(zip(vector_results['ids'][0], vector_results['documents'][0]))
+        embeddings = dict(zip(vector_results['ids'][0], vector_results['embeddings'][0])) if mmr_enabled else {}
+        lexical_ids = [doc_id for doc_id, _ in lexical_index.search(query, fetch_k)]
+
+        fused = reciprocal_rank_fusion([vector_results['ids'][0], lexical_ids])[:pool_size]
+
+        # Lexical-only hits were not returned by the vector query, so fetch their text
+        missing_ids = [doc_id for doc_id, _ in fused if doc_id not in documents]
+        if missing_ids:
+            fetched = store.get(ids=missing_ids, include=include)
+            documents.update(zip(fetched['ids'], fetched['documents']))
+            if mmr_enabled:
+                embeddings.update(zip(fetched['ids'], fetched['embeddings']))
+
+        fused = [(doc_id, score) for doc_id, score in fused if doc_id in documents]
+        # MMR weighs the fused rank rather than vector similarity, scaled to the range of cosine scores
+        relevance = np.array([score for _, score in fused]) / max((score for _, score in fused), default=1.0)
+        results = _select(collection_name, settings, query, query_embedding[0],
+                          [documents[doc_id] for doc_id, _ in fused],
+                          [embeddings[doc_id] for doc_id, _ in fused] if mmr_enabled else None,
+                          n_results, relevance=relevance)
+        logger.debug(f"Hybrid search results: {results}")
+        return [results]
+    except Exception as e:
+        logger.error(f"Error in hybrid search: {str(e)}")
+        return []
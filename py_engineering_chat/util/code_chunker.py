@@ -0,0 +1,89 @@
+import ast
+from pydantic import BaseModel
+from typing import List
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces, which is roughly this many characters of code
+DEFAULT_MAX_CHARS = 1200
+DEFAULT_OVERLAP_LINES = 5
+
+class CodeChunk(BaseModel):
+    path: str
+    start_line: int
+    end_line: int
+    content: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.path}:{self.start_line}-{self.end_line}"
+
+    @property
+    def document(self) -> str:
+        return f"Path: {self.path} (lines {self.start_line}-{self.end_line})\n\n{self.content}"
+
+def chunk_by_size(path: str, content: str, max_chars: int = DEFAULT_MAX_CHARS,
+                  overlap_lines: int = DEFAULT_OVERLAP_LINES, first_line: int = 1) -> List[CodeChunk]:
+    """Split text into windows of whole lines of at most max_chars, overlapping by a few lines."""
+    lines = content.splitlines(keepends=True)
+    chunks = []
+    start = 0
+    while start < len(lines):
+        end = start
+        size = 0
+        # Always take at least one line so a single huge line still makes progress
+        while end < len(lines) and (end == start or size + len(lines[end]) <= max_chars):
+            size += len(lines[end])
+            end += 1
+        text = ''.join(lines[start:end])
+        if text.strip():
+            chunks.append(CodeChunk(path=path, start_line=first_line + start,
+                                    end_line=first_line + end - 1, content=text))
+        if end >= len(lines):
+            break
+        start = max(end - overlap_lines, start + 1)
+    return chunks
+
+def chunk_python(path: str, content: str, max_chars: int = DEFAULT_MAX_CHARS,
+                 overlap_lines: int = DEFAULT_OVERLAP_LINES) -> List[CodeChunk]:
+    """
+    Split Python source on top-level functions and classes using ast line ranges.
+    Module-level code between definitions becomes its own chunk, and definitions
+    longer than max_chars are split further by size.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return chunk_by_size(path, content, max_chars, overlap_lines)
+
+    lines = content.splitlines(keepends=True)
+    spans = []
+    cursor = 1
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        # Decorators belong to the definition they wrap
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        end = node.end_lineno
+        if start > cursor:
+            spans.append((cursor, start - 1))
+        spans.append((start, end))
+        cursor = end + 1
+    if cursor <= len(lines):
+        spans.append((cursor, len(lines)))
+
+    chunks = []
+    for start, end in spans:
+        text = ''.join(lines[start - 1:end])
+        if not text.strip():
+            continue
+        if len(text) > max_chars:
+            chunks.extend(chunk_by_size(path, text, max_chars, overlap_lines, first_line=start))
+        else:
+            chunks.append(CodeChunk(path=path, start_line=start, end_line=end, content=text))
+    return chunks
+
+def chunk_file(path: str, content: str, max_chars: int = DEFAULT_MAX_CHARS,
+               overlap_lines: int = DEFAULT_OVERLAP_LINES) -> List[CodeChunk]:
+    """Chunk a file by syntax where supported, falling back to size-based windows."""
+    if path.endswith(('.py', '.pyi')):
+        return chunk_python(path, content, max_chars, overlap_lines)
+    return chunk_by_size(path, content, max_chars, overlap_lines)
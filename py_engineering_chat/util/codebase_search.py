@@ -1,9 +1,11 @@
 import re
-from py_engineering_chat.util.chroma_search import search_chroma
+from typing import Optional
+from py_engineering_chat.util.chroma_search import search_chroma, hybrid_search
 from py_engineering_chat.util.context_model import ContextData
 from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.snippets import DEFAULT_WINDOW_LINES, extract_snippet
 
-def handle_codebase_query(user_input: str, settings_manager) -> ContextData:
+def handle_codebase_query(user_input: str, settings_manager, deadline: Optional[float] = None) -> ContextData:
     logger = get_configured_logger(__name__)
     logger.debug(f"Handling codebase query: {user_input}")
     
@@ -11,11 +13,25 @@ def handle_codebase_query(user_input: str, settings_manager) -> ContextData:
     current_project = settings_manager.get_setting('current_project')
     if current_project:
         collection_name = f"codebase_{current_project}"
-        context_list = search_chroma(collection_name, query)  # Ensure this returns a list
-        context_data = ContextData(context_description="Result of a codebase search based on users query.")
+        # Hybrid BM25 + vector search unless the codebase_search.hybrid setting turns it off
+        if settings_manager.get_setting('codebase_search.hybrid', True):
+            context_list = hybrid_search(collection_name, query)
+        else:
+            context_list = search_chroma(collection_name, query)  # Ensure this returns a list
+        context_data = ContextData(context_description="Result of a codebase search based on users query. "
+                                                       "Use file_read with start_line and end_line to see more of a file.")
+        window_lines = settings_manager.get_setting('codebase_search.snippet_lines', DEFAULT_WINDOW_LINES)
+        snippet_query = re.sub(r'@codebase\b', '', query)
         for context in context_list:  # Iterate over the list
+            # Pass the best-matching lines of each chunk rather than the whole stored document
+            if window_lines:
+                context = [_to_snippet(snippet_query, document, window_lines) for document in context]
             context_data.add_context(context)  # Add each context to context_data
         return context_data
     else:
         logger.error("No current project set. Please set a project first.")
-        return ContextData(context=["Error: No current project set. Please set a project first."])
\ No newline at end of file
+        return ContextData(context=["Error: No current project set. Please set a project first."])
+
+def _to_snippet(query: str, document: str, window_lines: int) -> str:
+    snippet = extract_snippet(query, document, window_lines)
+    return snippet.format() if snippet else document
@@ -0,0 +1,42 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+
+VERSIONS_FILENAME = '.collection_versions.json'
+
+_lock = threading.Lock()
+
+def _versions_file(shadow_dir: Optional[str] = None) -> Path:
+    return Path(shadow_dir or ChatSettingsManager.get_ai_shadow_directory()) / VERSIONS_FILENAME
+
+def _read_versions(versions_file: Path) -> dict:
+    try:
+        with versions_file.open('r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def get_collection_version(collection_name: str, shadow_dir: Optional[str] = None) -> str:
+    """
+    Return the current generation of a collection. It changes whenever a scan, crawl or watcher
+    writes to the collection, in this process or any other, so cached results keyed on it go stale.
+    """
+    return _read_versions(_versions_file(shadow_dir)).get(collection_name, '')
+
+def bump_collection_version(collection_name: str, shadow_dir: Optional[str] = None) -> str:
+    # A random generation rather than a counter, so two processes bumping at once still both invalidate
+    version = uuid.uuid4().hex
+    versions_file = _versions_file(shadow_dir)
+    with _lock:
+        versions = _read_versions(versions_file)
+        versions[collection_name] = version
+        versions_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = versions_file.with_name(f"{versions_file.name}.{os.getpid()}.tmp")
+        with tmp_file.open('w') as f:
+            json.dump(versions, f)
+        os.replace(tmp_file, versions_file)
+    return version
@@ -1,26 +1,77 @@
 import re  # Add this import
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from py_engineering_chat.util.docs_search import handle_docs_query
 from py_engineering_chat.util.codebase_search import handle_codebase_query
+from py_engineering_chat.util.symbol_search import handle_symbol_query
 from py_engineering_chat.util.context_model import ContextData
 from py_engineering_chat.util.logger_util import get_configured_logger
-from typing import Callable, List  # Add this import
-# Define a map of command patterns to handler functions
-COMMAND_HANDLERS: dict[str, Callable[[str, any], ContextData]] = {
+from typing import Callable, List, Optional  # Add this import
+# Define a map of command patterns to handler functions. Each handler gets the user input, the settings
+# manager and the time.monotonic() deadline by which its context must be ready; single lookups may ignore it.
+COMMAND_HANDLERS: dict[str, Callable[[str, any, Optional[float]], ContextData]] = {
     r'@docs:(.+)': handle_docs_query,  # Updated pattern to match any character(s) after @docs:
     r'@codebase\s*(.+)': handle_codebase_query,  # Allow optional whitespace after @codebase:
+    r'@symbol:([\w.]+)': handle_symbol_query,  # Exact definition lookup, e.g. @symbol:ScanPipeline.run
 }
 
+# Handlers mostly wait on I/O (Chroma, sqlite, the embedding server), so threads overlap them well
+MAX_HANDLER_WORKERS = 8
+_executor = ThreadPoolExecutor(max_workers=MAX_HANDLER_WORKERS, thread_name_prefix="command-handler")
+
+# Handlers submitted and not yet finished, including ones abandoned after a timeout
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+def _submit(handler, *args):
+    """Run handler on the pool, or return None when earlier handlers that timed out still hold every worker."""
+    with _in_flight_lock:
+        if len(_in_flight) >= MAX_HANDLER_WORKERS:
+            return None
+        future = _executor.submit(handler, *args)
+        _in_flight.add(future)
+    future.add_done_callback(_finished)
+    return future
+
+def _finished(future):
+    with _in_flight_lock:
+        _in_flight.discard(future)
+
+DEFAULT_COMMAND_TIMEOUT_SECONDS = 15.0
+
 def parse_commands(user_input: str, settings_manager) -> List[ContextData]:
+    """
+    Run every handler whose pattern matches user_input concurrently and return their context
+    in COMMAND_HANDLERS order. A handler that fails or runs past the command_timeout_seconds
+    setting is left out so one slow lookup cannot hold up the whole message.
+    """
     context_data_list = []
     logger = get_configured_logger(__name__)
+    timeout = settings_manager.get_setting('command_timeout_seconds', DEFAULT_COMMAND_TIMEOUT_SECONDS)
 
-    # Iterate over the command handlers
+    # All handlers start together, so they share one deadline
+    deadline = time.monotonic() + timeout
+    futures = []
     for pattern, handler in COMMAND_HANDLERS.items():
         logger.debug(f"Checking pattern: {pattern} against user_input: {user_input}")
         if re.search(pattern, user_input):
             logger.debug(f"Pattern matched: {pattern}")
+            future = _submit(handler, user_input, settings_manager, deadline)
+            if future is None:
+                logger.warning(f"All command workers are busy with handlers that timed out; skipping {pattern}.")
+                continue
+            futures.append((pattern, future))
 
-            context_data = handler(user_input, settings_manager)
+    for pattern, future in futures:
+        try:
+            context_data = future.result(timeout=max(0.0, deadline - time.monotonic()))
             context_data_list.append(context_data)  # Append each matched context data
+        except FutureTimeoutError:
+            # Cancelling only stops a handler that has not started; a running one is counted in _in_flight until done
+            future.cancel()
+            logger.warning(f"Handler for {pattern} timed out after {timeout}s; skipping its context.")
+        except Exception as e:
+            logger.error(f"Handler for {pattern} failed: {e}")
 
-    return context_data_list  # Return the list of context data
\ No newline at end of file
+    return context_data_list  # Return the list of context data
@@ -0,0 +1,74 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+def normalize_path_key(path: str, path_type: str) -> tuple[str, str]:
+    """
+    Reduce a path to the (pattern, extension) key decisions are cached under.
+    Files share a decision with every file of the same extension in the same folder,
+    and runs of digits are collapsed so versioned or numbered folders share one entry.
+    """
+    pure_path = PurePosixPath(path.replace('\\', '/').lower())
+    if path_type == "folder":
+        return re.sub(r'\d+', '#', pure_path.as_posix()), ''
+
+    extension = pure_path.suffix
+    parent = re.sub(r'\d+', '#', pure_path.parent.as_posix())
+    if not extension:
+        # Files like Makefile or LICENSE are only meaningful by name
+        return f"{parent}/{pure_path.name}", ''
+    return f"{parent}/*", extension
+
+class ContextDecisionCache:
+    """Persistent sqlite cache of ContextEvaluator decisions, stored in the AI shadow directory."""
+
+    def __init__(self, shadow_dir: str, filename: str = '.context_decisions.sqlite'):
+        self.db_path = Path(shadow_dir) / filename
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # A single connection shared by the scan pipeline's evaluator threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "path_type TEXT NOT NULL, pattern TEXT NOT NULL, extension TEXT NOT NULL, "
+            "is_contextual INTEGER NOT NULL, reason TEXT, updated_at REAL, "
+            "PRIMARY KEY (path_type, pattern, extension))"
+        )
+        self._conn.commit()
+
+    def get(self, path: str, path_type: str) -> Optional[tuple[bool, str]]:
+        pattern, extension = normalize_path_key(path, path_type)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT is_contextual, reason FROM decisions WHERE path_type = ? AND pattern = ? AND extension = ?",
+                (path_type, pattern, extension)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return bool(row[0]), row[1]
+
+    def set(self, path: str, path_type: str, is_contextual: bool, reason: str):
+        pattern, extension = normalize_path_key(path, path_type)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO decisions (path_type, pattern, extension, is_contextual, reason, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path_type, pattern, extension, int(is_contextual), reason, time.time())
+            )
+            self._conn.commit()
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Union
 
 class ContextData(BaseModel):
     context: List[str] = []
@@ -8,7 +8,10 @@ class ContextData(BaseModel):
     def __init__(self, context=None, context_description=""):
         super().__init__(context=context if context else [], context_description=context_description)
 
-    def add_context(self, new_context: List[str], limit: int = 3):
+    def add_context(self, new_context: Union[str, List[str]], limit: int = 3):
+        # A bare string is one snippet; slicing it would add its first characters one by one
+        if isinstance(new_context, str):
+            new_context = [new_context]
         self.context.extend(new_context[:limit])
 
     def toString(self) -> str:
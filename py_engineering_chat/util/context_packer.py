@@ -0,0 +1,154 @@
+import re
+from functools import lru_cache
+from pydantic import BaseModel
+from typing import List, Optional
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.context_model import ContextData
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+# Used when tiktoken is not installed; close enough for English and code
+CHARS_PER_TOKEN = 4
+# The estimate can undercount dense code, so only this share of the budget is filled without tiktoken
+ESTIMATE_BUDGET_FRACTION = 0.8
+
+# Tokens of retrieved context per prompt, leaving room for history, instructions and the answer
+DEFAULT_CONTEXT_BUDGET = 3000
+MODEL_CONTEXT_BUDGETS = {
+    'gpt-4': 3000,
+    'gpt-4-0125-preview': 12000,
+    'gpt-4-turbo': 12000,
+    'gpt-4o': 12000,
+    'gpt-4o-mini': 12000,
+    'gpt-3.5-turbo': 4000,
+}
+
+# Snippets whose lines are mostly already in the prompt add nothing; overlapping chunks are common
+OVERLAP_THRESHOLD = 0.8
+# Truncating a snippet below this many tokens leaves too little of it to be useful
+MIN_SNIPPET_TOKENS = 64
+TRUNCATION_MARKER = "\n... (truncated)"
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: Optional[str]):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name) if model_name else tiktoken.get_encoding('cl100k_base')
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # The encoding files are downloaded on first use, which fails offline
+        get_configured_logger(__name__).warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """Count tokens with the model's tokenizer, or estimate from length when tiktoken is unavailable."""
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def get_context_budget(model_name: Optional[str], settings_manager=None) -> int:
+    """The context_packer.max_tokens setting, else the model's default budget."""
+    settings_manager = settings_manager or ChatSettingsManager()
+    budget = settings_manager.get_setting('context_packer.max_tokens')
+    if budget:
+        return int(budget)
+    return MODEL_CONTEXT_BUDGETS.get(model_name, DEFAULT_CONTEXT_BUDGET)
+
+class DroppedSnippet(BaseModel):
+    section: str
+    rank: int
+    tokens: int
+    reason: str
+
+class PackedContext(BaseModel):
+    text: str = ""
+    tokens: int = 0
+    budget: int = 0
+    included: int = 0
+    truncated: int = 0
+    dropped: List[DroppedSnippet] = []
+
+    def summary(self) -> str:
+        reasons = {}
+        for snippet in self.dropped:
+            reasons[snippet.reason] = reasons.get(snippet.reason, 0) + 1
+        dropped = ', '.join(f"{count} {reason}" for reason, count in sorted(reasons.items())) or 'none'
+        return (f"{self.tokens}/{self.budget} tokens, {self.included} snippets "
+                f"({self.truncated} truncated), dropped: {dropped}")
+
+def _normalized_lines(text: str) -> List[str]:
+    return [re.sub(r'\s+', ' ', line).strip() for line in text.splitlines() if line.strip()]
+
+def pack_context(sections: List[ContextData], model_name: Optional[str] = None,
+                 max_tokens: Optional[int] = None) -> PackedContext:
+    """
+    Fit the snippets of several ContextData sections into a token budget. Each section's snippets
+    are assumed ranked best first; sections take turns so one large result set cannot crowd out
+    the rest. Snippets already covered by included text are skipped, and the last snippet that
+    does not fit is truncated when enough of it would remain.
+    """
+    logger = get_configured_logger(__name__)
+    budget = max_tokens if max_tokens is not None else get_context_budget(model_name)
+    if _get_encoding(model_name) is None:
+        budget = int(budget * ESTIMATE_BUDGET_FRACTION)
+    packed = PackedContext(budget=budget)
+    sections = [section for section in sections if section.context]
+    headers = [f"Description: {section.context_description}\n" if section.context_description else ""
+               for section in sections]
+    chosen = [[] for _ in sections]
+    seen_lines = set()
+    used = 0
+
+    depth = max((len(section.context) for section in sections), default=0)
+    for rank in range(depth):
+        for index, section in enumerate(sections):
+            if rank >= len(section.context):
+                continue
+            snippet = section.context[rank]
+            name = section.context_description or f"section {index + 1}"
+            tokens = count_tokens(snippet, model_name)
+            lines = _normalized_lines(snippet)
+            if not lines:
+                continue
+            covered = sum(1 for line in lines if line in seen_lines) / len(lines)
+            if covered >= OVERLAP_THRESHOLD:
+                packed.dropped.append(DroppedSnippet(section=name, rank=rank, tokens=tokens,
+                                                     reason='duplicate' if covered == 1 else 'overlap'))
+                continue
+
+            # A section's header is only paid for once it contributes a snippet
+            cost = tokens + (count_tokens(headers[index], model_name) if not chosen[index] else 0)
+            if used + cost > budget:
+                remaining = budget - used - (cost - tokens)
+                if remaining < MIN_SNIPPET_TOKENS:
+                    packed.dropped.append(DroppedSnippet(section=name, rank=rank, tokens=tokens, reason='budget'))
+                    continue
+                marker_tokens = count_tokens(TRUNCATION_MARKER, model_name)
+                snippet = truncate_to_tokens(snippet, remaining - marker_tokens, model_name)
+                # Lines cut off here are not in the prompt and must not hide later snippets
+                lines = _normalized_lines(snippet)
+                snippet += TRUNCATION_MARKER
+                cost = cost - tokens + count_tokens(snippet, model_name)
+                packed.truncated += 1
+
+            chosen[index].append(snippet)
+            seen_lines.update(lines)
+            used += cost
+            packed.included += 1
+
+    packed.text = "\n\n".join(headers[index] + "\n\n".join(snippets)
+                              for index, snippets in enumerate(chosen) if snippets)
+    packed.tokens = used
+    logger.debug(f"Packed context: {packed.summary()}")
+    return packed
@@ -0,0 +1,54 @@
+from pathlib import PurePosixPath
+from typing import Optional
+
+# Extensions that are always worth indexing, no need to ask the LLM about them
+SOURCE_EXTENSIONS = {
+    '.py', '.pyi', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.vue', '.svelte',
+    '.go', '.rs', '.java', '.kt', '.kts', '.scala', '.rb', '.php', '.cs', '.swift',
+    '.c', '.h', '.cc', '.cpp', '.hpp', '.m', '.mm', '.sh', '.bash', '.zsh',
+    '.html', '.css', '.scss', '.sass', '.less', '.graphql', '.proto', '.tf',
+}
+
+# Extensions of generated, binary or otherwise useless files
+ARTIFACT_EXTENSIONS = {
+    '.map', '.lock', '.db', '.sqlite', '.sqlite3', '.pickle', '.pkl', '.npy', '.npz',
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg', '.webp', '.pdf',
+    '.zip', '.gz', '.tgz', '.tar', '.bz2', '.xz', '.7z', '.rar', '.jar', '.war',
+    '.bin', '.dat', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.mp3', '.mp4', '.mov',
+    '.pyc', '.pyo', '.class', '.o', '.so', '.dll', '.dylib', '.exe', '.a', '.lib',
+}
+
+# Minified bundles carry the source extension but are build output
+ARTIFACT_SUFFIXES = ('.min.js', '.min.css', '.bundle.js', '.chunk.js')
+
+# Folder names that only ever hold dependencies, caches or build output
+ARTIFACT_DIRS = {
+    'node_modules', 'vendor', 'bower_components', 'build', 'dist', 'target',
+    'coverage', 'htmlcov', '.cache', '.next', '.nuxt', '.tox', '.nox', '.venv', 'venv',
+    'site-packages', '__pycache__', '.pytest_cache', '.mypy_cache', '.git',
+    '.idea', '.vscode', '.gradle', 'Pods', 'DerivedData',
+}
+
+def evaluate_path_rules(path: str, path_type: str) -> Optional[tuple[bool, str]]:
+    """
+    Decide deterministically whether a path adds context.
+    Returns (is_contextual, reason), or None when the path is ambiguous and needs the LLM.
+    """
+    pure_path = PurePosixPath(path.replace('\\', '/'))
+
+    if any(part in ARTIFACT_DIRS for part in pure_path.parts):
+        return False, "Rule: dependency, cache or build output folder"
+
+    if path_type == "folder":
+        return None
+
+    name = pure_path.name.lower()
+    if name.endswith(ARTIFACT_SUFFIXES):
+        return False, "Rule: minified or bundled build output"
+
+    extension = pure_path.suffix.lower()
+    if extension in ARTIFACT_EXTENSIONS:
+        return False, f"Rule: {extension} files are binary or generated artifacts"
+    if extension in SOURCE_EXTENSIONS:
+        return True, f"Rule: {extension} files are source code"
+    return None
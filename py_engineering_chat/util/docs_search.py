@@ -1,18 +1,46 @@
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
 from py_engineering_chat.util.chroma_search import search_chroma
 from py_engineering_chat.util.context_model import ContextData
 from py_engineering_chat.util.logger_util import get_configured_logger
 
-def handle_docs_query(user_input: str, settings_manager=None) -> ContextData:
+# Separate from the command pool so docs lookups never wait behind the handler that submits them
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="docs-search")
+
+def handle_docs_query(user_input: str, settings_manager=None, deadline: Optional[float] = None) -> ContextData:
+    """
+    Search every @docs:<collection> in the message. deadline is a time.monotonic() value; collections
+    that have not answered by then are left out instead of holding up the others.
+    """
     logger = get_configured_logger(__name__)
     logger.debug(f"Handling docs query: {user_input}")
-    docs_match = re.search(r'@docs:([\w_-]+)', user_input)
-    logger.debug(f"Docs match: {docs_match}")
-    if docs_match:
-        collection_name = docs_match.group(1)
-        context_list = search_chroma(collection_name, user_input)  # Get the list from search_chroma
-        context_data = ContextData(context_description="Documetation that the user asked to be included.")
-        for context in context_list:  # Iterate over the list
-            context_data.add_context(context)  # Add each context to context_data
-        return context_data
-    return ContextData()
\ No newline at end of file
+    collection_names = list(dict.fromkeys(re.findall(r'@docs:([\w_-]+)', user_input)))
+    logger.debug(f"Docs collections: {collection_names}")
+    if not collection_names:
+        return ContextData()
+
+    # The @docs tags carry no meaning for the embedding, so search on the rest of the message
+    query = re.sub(r'@docs:[\w_-]+', '', user_input).strip() or user_input
+
+    # Search every collection at once, then interleave so each contributes its best hits first
+    futures = [_executor.submit(search_chroma, collection_name, query) for collection_name in collection_names]
+    per_collection = []
+    for collection_name, future in zip(collection_names, futures):
+        try:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            results = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # A search that has not started yet is dropped; one already running finishes in the background
+            future.cancel()
+            logger.warning(f"Search of {collection_name} timed out; skipping its results.")
+            results = []
+        per_collection.append(results[0] if results else [])
+        logger.debug(f"{len(per_collection[-1])} results from {collection_name}")
+
+    context_data = ContextData(context_description="Documetation that the user asked to be included.")
+    merged = [documents[rank] for rank in range(max(map(len, per_collection)))
+              for documents in per_collection if rank < len(documents)]
+    context_data.add_context(merged, limit=3 * len(collection_names))
+    return context_data
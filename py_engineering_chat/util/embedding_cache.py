@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Last-used times from lookups are held in memory and written in one batch once this many are
+# pending or this long has passed, instead of committing an UPDATE on every read
+TOUCH_FLUSH_ENTRIES = 1000
+TOUCH_FLUSH_SECONDS = 60.0
+
+# encode() options that change how results are delivered but not the vectors themselves
+OUTPUT_NEUTRAL_OPTIONS = {'show_progress_bar', 'convert_to_numpy', 'device'}
+
+def text_key(text: str) -> str:
+    """Return the sha256 of a text, the content address its embedding is cached under."""
+    return hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent sqlite cache of embeddings keyed by (model name, sha256 of text), stored in
+    the AI shadow directory. Entries carry a last-used time and the least recently used
+    ones are evicted once the cache holds more than max_entries.
+    """
+
+    def __init__(self, shadow_dir: str, filename: str = '.embedding_cache.sqlite',
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = Path(shadow_dir) / filename
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Shared by the scan pipeline's threads and the chat loop
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        # Counted once here and then kept up to date, so writes never scan the table
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._touched: Dict[tuple, float] = {}
+        self._last_flush = time.monotonic()
+
+    def get_many(self, model_name: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors for whichever of the given text hashes are present."""
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below sqlite's bound parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model_name] + chunk
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32)
+            now = time.time()
+            for text_hash in found:
+                self._touched[(model_name, text_hash)] = now
+            if (len(self._touched) >= TOUCH_FLUSH_ENTRIES
+                    or time.monotonic() - self._last_flush >= TOUCH_FLUSH_SECONDS):
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += sum(1 for text_hash in hashes if text_hash in found)
+            self.misses += sum(1 for text_hash in hashes if text_hash not in found)
+        return found
+
+    def put_many(self, model_name: str, vectors: Dict[str, np.ndarray]):
+        if not vectors:
+            return
+        now = time.time()
+        with self._lock:
+            # Vectors are content-addressed, so a row that already exists holds the same vector
+            changes = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model_name, text_hash, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                 for text_hash, vector in vectors.items()]
+            )
+            self._count += self._conn.total_changes - changes
+            # Eviction must see recent lookups to pick the least recently used rows
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def flush(self):
+        """Write pending last-used times to disk."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(last_used, model_name, text_hash) for (model_name, text_hash), last_used in self._touched.items()]
+            )
+            self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def _evict(self):
+        # Rows added by other processes since this one opened the cache are not counted
+        excess = self._count - self.max_entries
+        if excess > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._count -= cursor.rowcount
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+class CachedEmbedder:
+    """
+    Drop-in stand-in for SentenceTransformer.encode that consults an EmbeddingCache first.
+    The underlying model is only loaded when some text is missing from the cache.
+    """
+
+    def __init__(self, model_name: str, cache: EmbeddingCache, load_model, device: Optional[str] = None,
+                 cache_key: Optional[str] = None):
+        self.model_name = model_name
+        # Vectors are cached under cache_key, which tells apart backends producing different vectors
+        self.cache_key = cache_key or model_name
+        self.device = device
+        self.cache = cache
+        self._load_model = load_model
+
+    @property
+    def model(self):
+        return self._load_model(self.model_name, self.device)
+
+    def _options_key(self, options: dict) -> str:
+        """Cache key for vectors encoded with options, e.g. normalize_embeddings=True."""
+        options = {name: value for name, value in options.items() if name not in OUTPUT_NEUTRAL_OPTIONS}
+        if not options:
+            return self.cache_key
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+        return f"{self.cache_key}#{digest[:16]}"
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        cache_key = self._options_key(kwargs)
+        hashes = [text_key(text) for text in texts]
+        cached = self.cache.get_many(cache_key, hashes)
+
+        # Encode each distinct missing text once, in one call
+        missing = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+        if missing:
+            encoded = self.model.encode(list(missing.values()), batch_size=batch_size, **kwargs)
+            new_vectors = {text_hash: np.asarray(vector, dtype=np.float32)
+                           for text_hash, vector in zip(missing, encoded)}
+            self.cache.put_many(cache_key, new_vectors)
+            cached.update(new_vectors)
+
+        embeddings = np.vstack([cached[text_hash] for text_hash in hashes])
+        return embeddings[0] if single else embeddings
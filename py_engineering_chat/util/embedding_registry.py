@@ -0,0 +1,123 @@
+import atexit
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.embedding_cache import CachedEmbedder, EmbeddingCache, DEFAULT_MAX_ENTRIES
+from py_engineering_chat.util.embedding_server import get_server_client
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+# Values of the 'embedding_backend' setting: PyTorch through sentence_transformers, or ONNX Runtime on CPU
+DEFAULT_EMBEDDING_BACKEND = 'sentence_transformers'
+EMBEDDING_BACKENDS = ('sentence_transformers', 'onnx', 'onnx-int8')
+
+# One loaded model per (model name, device, backend), shared by every agent, scanner and search in the process
+_models: Dict[Tuple[str, Optional[str], str], object] = {}
+_load_locks: Dict[Tuple[str, Optional[str], str], threading.Lock] = {}
+_registry_lock = threading.Lock()
+_embedding_cache: Optional[EmbeddingCache] = None
+_server_clients: Dict[Tuple[str, Optional[str], str], object] = {}
+
+def get_embedding_backend() -> str:
+    backend = ChatSettingsManager().get_embedding_backend()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding_backend '{backend}'. Expected one of: {', '.join(EMBEDDING_BACKENDS)}")
+    return backend
+
+def embedding_key(model_name: str, backend: str) -> str:
+    """
+    Name that identifies the vectors a model produces. Quantized vectors differ slightly from
+    the originals, so they are cached and served under their own name.
+    """
+    return model_name if backend == DEFAULT_EMBEDDING_BACKEND else f"{model_name}@{backend}"
+
+def _load_model(model_name: str, device: Optional[str], backend: str):
+    if backend == DEFAULT_EMBEDDING_BACKEND:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device=device)
+    from py_engineering_chat.util.onnx_embedder import OnnxEmbedder
+    cache_dir = Path(ChatSettingsManager.get_ai_shadow_directory()) / '.onnx_models'
+    return OnnxEmbedder(model_name, cache_dir, quantize=backend == 'onnx-int8')
+
+def get_embedding_model(model_name: Optional[str] = None, device: Optional[str] = None,
+                        backend: Optional[str] = None):
+    """
+    Return the shared model for model_name on device, loading it on first use.
+    The model name defaults to the 'embedding_model' setting, the backend to the 'embedding_backend'
+    setting and the device to whatever the backend picks. Concurrent first calls for the same key
+    load the model once.
+    """
+    if model_name is None:
+        model_name = ChatSettingsManager().get_setting('embedding_model', DEFAULT_EMBEDDING_MODEL)
+    backend = backend or get_embedding_backend()
+    key = (model_name, device, backend)
+
+    # Fast path once the model is loaded
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Lock per key so loading one model doesn't block callers of another
+    with load_lock:
+        model = _models.get(key)
+        if model is None:
+            logger = get_configured_logger(__name__)
+            logger.debug(f"Loading embedding model '{model_name}' with {backend} on device '{device or 'auto'}'.")
+            model = _load_model(model_name, device, backend)
+            _models[key] = model
+        return model
+
+def get_encoder(model_name: str, device: Optional[str] = None, backend: Optional[str] = None):
+    """
+    Return a client for the local embedding server when one is running, so processes share
+    a single loaded model; otherwise the in-process model from get_embedding_model.
+    """
+    backend = backend or get_embedding_backend()
+    key = (model_name, device, backend)
+    client = _server_clients.get(key)
+    if client is None:
+        client = get_server_client(embedding_key(model_name, backend),
+                                   lambda: get_embedding_model(model_name, device, backend))
+        if client is not None:
+            _server_clients[key] = client
+    return client or get_embedding_model(model_name, device, backend)
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache stored in the AI shadow directory."""
+    global _embedding_cache
+    with _registry_lock:
+        if _embedding_cache is None:
+            settings_manager = ChatSettingsManager()
+            max_entries = settings_manager.get_setting('embedding_cache.max_entries', DEFAULT_MAX_ENTRIES)
+            _embedding_cache = EmbeddingCache(ChatSettingsManager.get_ai_shadow_directory(), max_entries=max_entries)
+            # Last-used times from lookups are batched in memory; keep the ones still pending at exit
+            atexit.register(_embedding_cache.flush)
+        return _embedding_cache
+
+def get_embedder(model_name: Optional[str] = None, device: Optional[str] = None):
+    """
+    Return an object with SentenceTransformer's encode() for model_name on device.
+    Unless the 'embedding_cache.enabled' setting is false, encodings go through the
+    persistent embedding cache, and misses go to the embedding server if one is running.
+    """
+    settings_manager = ChatSettingsManager()
+    if model_name is None:
+        model_name = settings_manager.get_setting('embedding_model', DEFAULT_EMBEDDING_MODEL)
+    backend = get_embedding_backend()
+    if not settings_manager.get_setting('embedding_cache.enabled', True):
+        return get_encoder(model_name, device, backend)
+    return CachedEmbedder(model_name, get_embedding_cache(),
+                          lambda name, device: get_encoder(name, device, backend),
+                          device=device, cache_key=embedding_key(model_name, backend))
+
+def clear_embedding_models():
+    """Drop every loaded model, e.g. after changing the embedding_model setting."""
+    with _registry_lock:
+        _models.clear()
+        _load_locks.clear()
+        _server_clients.clear()
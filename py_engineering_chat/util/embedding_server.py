@@ -0,0 +1,257 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+DEFAULT_SOCKET_NAME = '.embedding_server.sock'
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+# After a failed connection, clients encode in-process for this long before trying the server again
+RETRY_INTERVAL_SECONDS = 30.0
+
+# The server listens on a unix socket; where there are none (older Windows) everything encodes in-process
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+_ServerBase = socketserver.UnixStreamServer if HAS_UNIX_SOCKETS else socketserver.BaseServer
+
+# Wire format: every message is a 4-byte big-endian length followed by a JSON header, and
+# responses carrying embeddings are followed by the raw float32 matrix described by the header.
+_LENGTH = struct.Struct('>I')
+
+def get_socket_path() -> Path:
+    settings_manager = ChatSettingsManager()
+    socket_path = settings_manager.get_setting('embedding_server.socket_path')
+    if socket_path:
+        return Path(socket_path)
+    return Path(ChatSettingsManager.get_ai_shadow_directory()) / DEFAULT_SOCKET_NAME
+
+def _is_listening(socket_path: Path) -> bool:
+    """Whether a live server accepts connections on socket_path, as opposed to a file left by one that died."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+        return True
+    except ConnectionRefusedError:
+        return False
+    finally:
+        probe.close()
+
+def _recv_exact(sock, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+def _send_message(sock, header: dict, payload: bytes = b''):
+    encoded = json.dumps(header).encode('utf-8')
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + payload)
+
+def _recv_header(sock) -> dict:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, size).decode('utf-8'))
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into one model call. The worker waits at most
+    max_wait_ms after the first request for others to arrive, or until max_batch_size texts are queued.
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.logger = get_configured_logger(__name__)
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.texts_encoded = 0
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        future = Future()
+        self.requests.put((texts, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self.requests.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait_seconds
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(request)
+                size += len(request[0])
+            self._encode(pending)
+
+    def _encode(self, pending):
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        try:
+            embeddings = np.asarray(self.model.encode(texts, batch_size=self.max_batch_size), dtype=np.float32)
+        except Exception as e:
+            self.logger.error(f"Error encoding micro-batch of {len(texts)} texts: {e}")
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.texts_encoded += len(texts)
+
+        # Hand every request back its own slice of the batch
+        offset = 0
+        for request_texts, future in pending:
+            future.set_result(embeddings[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                request = _recv_header(self.request)
+            except (ConnectionError, OSError):
+                return
+            if request.get('model') != server.model_name:
+                _send_message(self.request, {'error': f"Server is running model '{server.model_name}'"})
+                continue
+            try:
+                embeddings = server.batcher.submit(request.get('texts', [])).result()
+            except Exception as e:
+                _send_message(self.request, {'error': str(e)})
+                continue
+            _send_message(self.request, {'shape': list(embeddings.shape)}, embeddings.tobytes())
+
+class EmbeddingServer(socketserver.ThreadingMixIn, _ServerBase):
+    """Serves encode requests for one in-memory model over a unix socket."""
+    daemon_threads = True
+
+    def __init__(self, socket_path, model, model_name, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        if not HAS_UNIX_SOCKETS:
+            raise OSError("The embedding server needs unix domain sockets, which this platform does not provide.")
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            if _is_listening(socket_path):
+                raise OSError(f"An embedding server is already listening on {socket_path}.")
+            # A socket left behind by a server that died would make bind fail
+            socket_path.unlink()
+        self.model_name = model_name
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait_ms)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+
+    def server_close(self):
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+class EmbeddingClient:
+    """
+    encode() compatible client for a running EmbeddingServer. When the server is unreachable
+    or running a different model, requests fall back to the in-process model from fallback().
+    """
+
+    def __init__(self, socket_path, model_name: str, fallback: Callable[[], object]):
+        self.logger = get_configured_logger(__name__)
+        self.socket_path = Path(socket_path)
+        self.model_name = model_name
+        self._fallback = fallback
+        self._local = threading.local()
+        self._retry_after = 0.0
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(str(self.socket_path))
+            self._local.sock = sock
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Options like normalize_embeddings are only honored by the in-process model
+        if kwargs or time.monotonic() < self._retry_after:
+            return self._fallback().encode(sentences, batch_size=batch_size, **kwargs)
+
+        try:
+            embeddings = self._request(texts)
+        except (OSError, ConnectionError, ValueError) as e:
+            self._disconnect()
+            self._retry_after = time.monotonic() + RETRY_INTERVAL_SECONDS
+            self.logger.warning(f"Embedding server unavailable ({e}); encoding in-process.")
+            return self._fallback().encode(sentences, batch_size=batch_size)
+        return embeddings[0] if single else embeddings
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        sock = self._connection()
+        _send_message(sock, {'model': self.model_name, 'texts': texts})
+        response = _recv_header(sock)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        rows, dim = response['shape']
+        payload = _recv_exact(sock, rows * dim * 4)
+        return np.frombuffer(payload, dtype=np.float32).reshape(rows, dim)
+
+def get_server_client(model_name: str, fallback: Callable[[], object]) -> Optional[EmbeddingClient]:
+    """
+    Return a client when the 'embedding_server.enabled' setting allows it and a server socket exists,
+    otherwise None so the caller encodes in-process.
+    """
+    if not HAS_UNIX_SOCKETS or not ChatSettingsManager().get_setting('embedding_server.enabled', True):
+        return None
+    socket_path = get_socket_path()
+    if not socket_path.exists():
+        return None
+    return EmbeddingClient(socket_path, model_name, fallback)
+
+def serve_embeddings(model_name: Optional[str] = None, device: Optional[str] = None,
+                     max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """Load the embedding model once and serve it on the shared socket until interrupted."""
+    from py_engineering_chat.util.embedding_registry import (
+        get_embedding_model, get_embedding_backend, embedding_key, DEFAULT_EMBEDDING_MODEL
+    )
+    logger = get_configured_logger(__name__)
+    model_name = model_name or ChatSettingsManager().get_setting('embedding_model', DEFAULT_EMBEDDING_MODEL)
+    backend = get_embedding_backend()
+    model = get_embedding_model(model_name, device, backend)
+
+    # Clients ask for the same key, so they only use the server when it runs their backend
+    served_name = embedding_key(model_name, backend)
+    socket_path = get_socket_path()
+    server = EmbeddingServer(socket_path, model, served_name, max_batch_size, max_wait_ms)
+    logger.info(f"Serving '{served_name}' on {socket_path}")
+    print(f"Embedding server for '{served_name}' listening on {socket_path}. Press Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping embedding server.")
+    finally:
+        server.server_close()
+        logger.info(f"Encoded {server.batcher.texts_encoded} texts in {server.batcher.batches} batches.")
@@ -0,0 +1,168 @@
+import os
+import re
+import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from py_engineering_chat.util.git_changes import (
+    open_repository, GIT_FILEMODE_COMMIT, GIT_FILEMODE_LINK, GIT_STATUS_WT_NEW, GIT_STATUS_WT_DELETED
+)
+
+def compile_skip_patterns(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    """Compile glob patterns into one regex matched against a file or folder name."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile('|'.join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+def _read_gitignore(directory: Path) -> tuple[List[str], List[str]]:
+    """
+    Read the top-level .gitignore as (name patterns, path patterns).
+    Only the common subset is supported: comments, blank lines and negations are ignored.
+    """
+    gitignore = directory / '.gitignore'
+    name_patterns, path_patterns = [], []
+    if not gitignore.exists():
+        return name_patterns, path_patterns
+    with gitignore.open('r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or line.startswith('!'):
+                continue
+            line = line.rstrip('/')
+            if '/' in line:
+                path_patterns.append(line.lstrip('/'))
+            else:
+                name_patterns.append(line)
+    return name_patterns, path_patterns
+
+class FileEnumerator:
+    """
+    Enumerates a project's files once for both the scanner and the chat file completer.
+    Uses the git index through pygit2 when the directory is a repository, and otherwise
+    walks the tree honoring the top-level .gitignore. Skip patterns are matched with a
+    single precompiled regex instead of one glob test per pattern.
+    """
+
+    def __init__(self, directory, skip_dirs: Iterable[str] = ('.git',), skip_files: Iterable[str] = (),
+                 use_git: bool = True, include_untracked: bool = True):
+        self.directory = Path(directory)
+        self.skip_dirs = set(skip_dirs)
+        self.skip_regex = compile_skip_patterns(skip_files)
+        self.use_git = use_git
+        self.include_untracked = include_untracked
+        self.dirs_skipped = 0
+        self.files_skipped = 0
+
+    def _is_skipped_file(self, name: str) -> bool:
+        return self.skip_regex is not None and self.skip_regex.match(name) is not None
+
+    def _git_paths(self) -> Optional[List[str]]:
+        """Return tracked (and untracked, non-ignored) paths relative to the directory, or None."""
+        if not self.use_git:
+            return None
+        # The project may be a subdirectory of the repository
+        repo, prefix = open_repository(self.directory)
+        if repo is None:
+            return None
+
+        # Submodules and symlinks to folders are index entries, but there is no file to read behind them
+        workdir = Path(repo.workdir)
+        paths = {entry.path for entry in repo.index
+                 if entry.mode != GIT_FILEMODE_COMMIT
+                 and not (entry.mode == GIT_FILEMODE_LINK and (workdir / entry.path).is_dir())}
+        # Index entries for files deleted from the worktree are dropped either way
+        untracked_files = 'all' if self.include_untracked else 'no'
+        for path, flags in repo.status(untracked_files=untracked_files, ignored=False).items():
+            # Untracked nested repositories and symlinks to folders are reported as single paths too
+            if flags & GIT_STATUS_WT_NEW and not (workdir / path).is_dir():
+                paths.add(path)
+            elif flags & GIT_STATUS_WT_DELETED:
+                paths.discard(path)
+        return sorted(path[len(prefix):] for path in paths if path.startswith(prefix))
+
+    def walk(self) -> Iterator[tuple[Path, List[str], List[str]]]:
+        """
+        Yield (root, dirs, files) top-down like os.walk, with skipped folders and files removed.
+        Callers may prune dirs in place to stop descending, exactly as with os.walk.
+        """
+        git_paths = self._git_paths()
+        if git_paths is not None:
+            yield from self._walk_index(git_paths)
+        else:
+            yield from self._walk_tree()
+
+    def _walk_index(self, paths: List[str]):
+        # Rebuild the directory tree from the flat list of index paths
+        tree = {'': (set(), [])}
+        for path in paths:
+            parts = path.split('/')
+            for depth in range(len(parts) - 1):
+                parent = '/'.join(parts[:depth])
+                child = '/'.join(parts[:depth + 1])
+                tree[parent][0].add(parts[depth])
+                tree.setdefault(child, (set(), []))
+            tree['/'.join(parts[:-1])][1].append(parts[-1])
+
+        stack = ['']
+        while stack:
+            relative_root = stack.pop()
+            subdirs, files = tree[relative_root]
+            dirs = self._filter_dirs(sorted(subdirs))
+            yield self.directory / relative_root, dirs, self._filter_files(files)
+            stack.extend(f"{relative_root}/{d}" if relative_root else d for d in reversed(dirs))
+
+    def _walk_tree(self):
+        name_patterns, path_patterns = _read_gitignore(self.directory)
+        ignore_regex = compile_skip_patterns(name_patterns)
+        for root, dirs, files in os.walk(self.directory):
+            relative_root = Path(root).relative_to(self.directory)
+
+            def is_ignored(name):
+                if ignore_regex is not None and ignore_regex.match(name):
+                    return True
+                relative = (relative_root / name).as_posix()
+                return any(fnmatch.fnmatch(relative, pattern) for pattern in path_patterns)
+
+            dirs[:] = self._filter_dirs(sorted(d for d in dirs if not is_ignored(d)))
+            yield Path(root), dirs, self._filter_files(f for f in files if not is_ignored(f))
+
+    def _filter_dirs(self, dirs) -> List[str]:
+        kept = []
+        for d in dirs:
+            if d in self.skip_dirs:
+                self.dirs_skipped += 1
+            else:
+                kept.append(d)
+        return kept
+
+    def _filter_files(self, files) -> List[str]:
+        kept = []
+        for f in files:
+            if self._is_skipped_file(f):
+                self.files_skipped += 1
+            else:
+                kept.append(f)
+        return kept
+
+    def walk_paths(self, relative_paths: Iterable[str]) -> Iterator[tuple[Path, List[str], List[str]]]:
+        """
+        Yield (root, [], files) for an explicit list of relative paths, grouped by folder,
+        applying the same skip rules as walk(). Used when only known paths need rescanning.
+        """
+        groups = {}
+        for relative_path in relative_paths:
+            parts = Path(relative_path).parts
+            if any(part in self.skip_dirs for part in parts[:-1]):
+                self.files_skipped += 1
+                continue
+            groups.setdefault(Path(*parts[:-1]) if len(parts) > 1 else Path('.'), []).append(parts[-1])
+        for relative_root in sorted(groups):
+            yield self.directory / relative_root, [], self._filter_files(groups[relative_root])
+
+    def list_files(self) -> List[str]:
+        """Return every enumerated file as a path relative to the directory."""
+        file_list = []
+        for root, _, files in self.walk():
+            relative_root = Path(root).relative_to(self.directory)
+            file_list.extend((relative_root / f).as_posix() for f in files)
+        return file_list
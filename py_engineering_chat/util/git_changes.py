@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import pygit2
+    GIT_STATUS_WT_NEW = pygit2.GIT_STATUS_WT_NEW
+    GIT_STATUS_WT_DELETED = pygit2.GIT_STATUS_WT_DELETED
+    # Submodules are recorded as gitlinks: a commit id where a file would be
+    GIT_FILEMODE_COMMIT = pygit2.GIT_FILEMODE_COMMIT
+    GIT_FILEMODE_LINK = pygit2.GIT_FILEMODE_LINK
+except ImportError:
+    pygit2 = None
+    GIT_STATUS_WT_NEW = GIT_STATUS_WT_DELETED = 0
+    GIT_FILEMODE_COMMIT = GIT_FILEMODE_LINK = None
+
+def open_repository(directory):
+    """Return (repository, prefix of directory inside the work tree), or (None, '')."""
+    if pygit2 is None:
+        return None, ''
+    repo_path = pygit2.discover_repository(str(directory))
+    if repo_path is None:
+        return None, ''
+    repo = pygit2.Repository(repo_path)
+    if repo.workdir is None:
+        return None, ''
+    prefix = os.path.relpath(Path(directory).resolve(), Path(repo.workdir).resolve())
+    return repo, '' if prefix == '.' else Path(prefix).as_posix() + '/'
+
+def get_head_commit(directory) -> Optional[str]:
+    """Return the hex OID of HEAD for the repository containing directory, if any."""
+    repo, _ = open_repository(directory)
+    if repo is None or repo.head_is_unborn:
+        return None
+    return str(repo.head.target)
+
+class GitChanges:
+    """Paths touched between two commits, relative to the project directory."""
+
+    def __init__(self, head_commit: str, changed: List[str], deleted: List[str]):
+        self.head_commit = head_commit
+        self.changed = changed
+        self.deleted = deleted
+
+def get_changes_since(directory, since_commit: str) -> Optional[GitChanges]:
+    """
+    Diff since_commit against HEAD with pygit2.
+    Added, modified and renamed-to paths are reported as changed; deleted and renamed-from
+    paths as deleted. Returns None when the directory is not a repository or the commit is unknown.
+    """
+    repo, prefix = open_repository(directory)
+    if repo is None or repo.head_is_unborn:
+        return None
+    try:
+        old_commit = repo.revparse_single(since_commit).peel(pygit2.Commit)
+    except (KeyError, ValueError, pygit2.GitError):
+        return None
+    head_commit = repo.head.peel(pygit2.Commit)
+
+    changed, deleted = set(), set()
+    diff = repo.diff(old_commit, head_commit)
+    diff.find_similar()
+    for delta in diff.deltas:
+        if GIT_FILEMODE_COMMIT in (delta.old_file.mode, delta.new_file.mode):
+            # A submodule moved to another commit; there is no file to read
+            continue
+        if delta.status == pygit2.GIT_DELTA_DELETED:
+            deleted.add(delta.old_file.path)
+        elif delta.status == pygit2.GIT_DELTA_RENAMED:
+            deleted.add(delta.old_file.path)
+            changed.add(delta.new_file.path)
+        else:
+            changed.add(delta.new_file.path)
+
+    def relative(paths):
+        return sorted(path[len(prefix):] for path in paths if path.startswith(prefix))
+
+    return GitChanges(str(head_commit.id), relative(changed), relative(deleted))
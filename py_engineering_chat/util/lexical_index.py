@@ -0,0 +1,141 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+# BM25 parameters; the usual defaults work well for code chunks of a few dozen lines
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+')
+_CAMEL_PART = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms. Every identifier is kept whole and also broken into
+    its snake_case and camelCase parts, so 'get_project_shadow_directory' and 'getProjectShadow'
+    match queries for the full name as well as for 'shadow' or 'project'.
+    """
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        lowered = identifier.lower()
+        tokens.append(lowered)
+        parts = [part.lower() for word in identifier.split('_') for part in _CAMEL_PART.findall(word)]
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if len(part) > 1)
+    return tokens
+
+class LexicalIndex:
+    """
+    Persistent BM25 inverted index over the chunks of one collection, stored in sqlite next to
+    the Chroma store. Documents are keyed by the same ids as their vectors and grouped by path,
+    so it can be updated file by file alongside the collection.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written by the scan pipeline's writer thread, read from the chat loop
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (doc_id TEXT PRIMARY KEY, path TEXT NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_path ON documents (path)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL, PRIMARY KEY (term, doc_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)")
+        self._conn.commit()
+
+    @staticmethod
+    def path_for_collection(chroma_db_path, collection_name: str) -> Path:
+        return Path(chroma_db_path).parent / '.lexical_index' / f"{collection_name}.sqlite"
+
+    @classmethod
+    def for_collection(cls, chroma_db_path, collection_name: str) -> 'LexicalIndex':
+        return cls(cls.path_for_collection(chroma_db_path, collection_name))
+
+    def add_documents(self, ids: List[str], texts: List[str], paths: List[str]):
+        """Index documents, replacing any previous version stored under the same id."""
+        with self._lock:
+            self._delete_ids(ids)
+            for doc_id, text, path in zip(ids, texts, paths):
+                counts = Counter(tokenize_code(text))
+                self._conn.execute("INSERT INTO documents (doc_id, path, length) VALUES (?, ?, ?)",
+                                   (doc_id, path, sum(counts.values())))
+                self._conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                                       [(term, doc_id, tf) for term, tf in counts.items()])
+            self._conn.commit()
+
+    def delete_paths(self, paths: Iterable[str]):
+        """Remove every document that belongs to one of the given paths."""
+        paths = list(paths)
+        with self._lock:
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                doc_ids = [row[0] for row in self._conn.execute(
+                    f"SELECT doc_id FROM documents WHERE path IN ({placeholders})", chunk)]
+                self._delete_ids(doc_ids)
+            self._conn.commit()
+
+    def _delete_ids(self, doc_ids: List[str]):
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            self._conn.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", chunk)
+            self._conn.execute(f"DELETE FROM documents WHERE doc_id IN ({placeholders})", chunk)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """Return up to k (doc_id, score) pairs ranked by BM25."""
+        terms = list(dict.fromkeys(tokenize_code(query)))
+        if not terms:
+            return []
+        with self._lock:
+            doc_count, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+            if doc_count == 0:
+                return []
+            average_length = total_length / doc_count
+
+            scores = Counter()
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN documents d ON d.doc_id = p.doc_id "
+                    "WHERE p.term = ?", (term,)
+                ).fetchall()
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores.most_common(k)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists; each id scores the sum of 1 / (k + rank) over the lists it appears in."""
+    scores = Counter()
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return scores.most_common()
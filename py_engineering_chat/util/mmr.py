@@ -0,0 +1,39 @@
+import numpy as np
+from typing import List, Optional
+
+DEFAULT_MMR_LAMBDA = 0.5
+DEFAULT_MMR_FETCH_K = 20
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+def maximal_marginal_relevance(query_embedding, candidate_embeddings, k: int, lambda_mult: float = DEFAULT_MMR_LAMBDA,
+                               relevance: Optional[np.ndarray] = None) -> List[int]:
+    """
+    Pick k candidates that are relevant to the query but not to each other. Each step takes the
+    candidate maximizing lambda * relevance - (1 - lambda) * max similarity to those already picked.
+    Relevance defaults to cosine similarity with the query; pass scores to use another ranking.
+    Returns candidate indices in pick order.
+    """
+    candidates = _normalize(np.asarray(candidate_embeddings, dtype=np.float32))
+    if len(candidates) == 0 or k <= 0:
+        return []
+    if relevance is None:
+        relevance = candidates @ _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(-1))
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of every candidate to anything selected so far, updated one row per pick
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, similarity[pick], out=redundancy)
+    return selected
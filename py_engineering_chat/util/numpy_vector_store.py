@@ -0,0 +1,374 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.vector_store import VectorStore
+
+VECTORS_FILENAME = 'vectors.f16'
+LOG_FILENAME = 'log.jsonl'
+INITIAL_CAPACITY = 1024
+# Rewrite the store once dead rows outnumber live ones and there are at least this many
+COMPACT_MIN_DEAD_ROWS = 1024
+# numpy has no fast float16 matrix product, so queries score a float32 copy of the matrix while
+# it stays under this size, and larger stores convert blocks of rows on every query instead
+FLOAT32_CACHE_BYTES = 128 * 1024 * 1024
+SCORE_BLOCK_ROWS = 16384
+
+def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the subset of Chroma's where syntax the repo uses: equality, $eq/$ne/$in/$nin, $and/$or."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif key == '$or':
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if operator == '$eq' and value != operand:
+                    return False
+                if operator == '$ne' and value == operand:
+                    return False
+                if operator == '$in' and value not in operand:
+                    return False
+                if operator == '$nin' and value in operand:
+                    return False
+                if operator not in ('$eq', '$ne', '$in', '$nin'):
+                    raise ValueError(f"Unsupported where operator: {operator}")
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force VectorStore for small and medium projects, without Chroma's open cost.
+    Vectors live in a memory-mapped float16 matrix and ids, documents and metadata in an
+    append-only JSON log that is replayed on open. Updates and deletes append to the log and
+    leave dead rows behind until compaction rewrites both files. Queries are exact: one
+    matrix-vector product over every row, returning squared L2 distances like Chroma.
+    Readers in other processes follow the log as it grows; writes should come from one
+    process at a time.
+    """
+
+    def __init__(self, directory, name: str):
+        self.logger = get_configured_logger(__name__)
+        self.directory = Path(directory)
+        self.name = name
+        self.vectors_path = self.directory / VECTORS_FILENAME
+        self.log_path = self.directory / LOG_FILENAME
+        self._lock = threading.RLock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path.touch(exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def exists(directory) -> bool:
+        return (Path(directory) / LOG_FILENAME).exists()
+
+    @staticmethod
+    def destroy(directory) -> bool:
+        if not NumpyVectorStore.exists(directory):
+            return False
+        shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    # Loading and log replay
+
+    def _load(self):
+        self._entries: Dict[str, dict] = {}
+        self._rows = 0
+        self._dim = None
+        self._vectors = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._row_ids: List[Optional[str]] = []
+        self._matrix32 = None
+        self._log_offset = 0
+        self._log_inode = os.stat(self.log_path).st_ino
+        self._replay()
+
+    def _replay(self):
+        """Apply log lines written since the last replay, by this or another process."""
+        with self.log_path.open('rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # A line without its newline is still being written; pick it up next time
+        complete = data[:data.rfind(b'\n') + 1]
+        self._log_offset += len(complete)
+        records = [json.loads(line) for line in complete.splitlines() if line.strip()]
+        if not records:
+            return
+        header = next((record for record in records if record['op'] == 'init'), None)
+        if header is not None and self._dim is None:
+            self._dim = header['dim']
+        rows = max([self._rows] + [record['row'] + 1 for record in records if record['op'] == 'put'])
+        self._open_vectors(rows)
+        self._apply(records)
+
+    def _open_vectors(self, rows: int):
+        if self._dim is None or rows <= self._rows and self._vectors is not None:
+            return
+        self._rows = max(self._rows, rows)
+        size = os.path.getsize(self.vectors_path) // (2 * self._dim) if self.vectors_path.exists() else 0
+        if size < self._rows:
+            self._resize_file(max(self._rows, INITIAL_CAPACITY))
+        else:
+            self._map(size)
+        self._norms = np.concatenate([self._norms, np.zeros(self._rows - len(self._norms), dtype=np.float32)])
+        self._live = np.concatenate([self._live, np.zeros(self._rows - len(self._live), dtype=bool)])
+        self._row_ids.extend([None] * (self._rows - len(self._row_ids)))
+
+    def _map(self, capacity: int):
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(capacity, self._dim))
+
+    def _resize_file(self, capacity: int):
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(capacity * self._dim * 2)
+        self._map(capacity)
+
+    def _apply(self, records: List[dict]):
+        written_rows = []
+        for record in records:
+            if record['op'] == 'put':
+                previous = self._entries.get(record['id'])
+                if previous is not None and previous['row'] != record['row']:
+                    self._live[previous['row']] = False
+                self._entries[record['id']] = {'row': record['row'], 'document': record.get('document'),
+                                               'metadata': record.get('metadata') or {}}
+                self._live[record['row']] = True
+                self._row_ids[record['row']] = record['id']
+                written_rows.append(record['row'])
+            elif record['op'] == 'delete':
+                entry = self._entries.pop(record['id'], None)
+                if entry is not None:
+                    self._live[entry['row']] = False
+        if written_rows:
+            # Norms of the stored float16 values, so distances match the matrix product exactly
+            vectors = self._vectors[written_rows].astype(np.float32)
+            self._norms[written_rows] = np.einsum('ij,ij->i', vectors, vectors)
+            if self._matrix32 is not None and max(written_rows) < len(self._matrix32):
+                self._matrix32[written_rows] = vectors
+            else:
+                self._matrix32 = None
+
+    def _refresh(self):
+        """Pick up writes from other processes; a replaced log means another process compacted."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self._load_empty()
+            return
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            self._vectors = None
+            self._load()
+        elif stat.st_size > self._log_offset:
+            self._replay()
+
+    def _load_empty(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path.touch(exist_ok=True)
+        self._load()
+
+    # Writing
+
+    def _append(self, records: List[dict]):
+        payload = b''.join(json.dumps(record).encode('utf-8') + b'\n' for record in records)
+        with self.log_path.open('ab') as f:
+            f.write(payload)
+        self._log_offset += len(payload)
+
+    def _put(self, ids, embeddings, documents, metadatas):
+        embeddings = np.asarray(embeddings, dtype=np.float32) if embeddings is not None else None
+        records = []
+        if self._dim is None:
+            if embeddings is None:
+                raise ValueError("The first write to a collection needs embeddings")
+            self._dim = int(embeddings.shape[1])
+            records.append({'op': 'init', 'dim': self._dim})
+            self._resize_file(INITIAL_CAPACITY)
+            self._norms = np.zeros(0, dtype=np.float32)
+            self._live = np.zeros(0, dtype=bool)
+
+        # Vectors are written and flushed before the log lines that reference them
+        first_row = self._rows
+        new_rows = len(ids) if embeddings is not None else 0
+        if first_row + new_rows > len(self._vectors):
+            self._resize_file(max(first_row + new_rows, 2 * len(self._vectors)))
+        if new_rows:
+            self._vectors[first_row:first_row + new_rows] = embeddings
+            self._vectors.flush()
+
+        for index, doc_id in enumerate(ids):
+            previous = self._entries.get(doc_id, {})
+            row = first_row + index if embeddings is not None else previous['row']
+            records.append({
+                'op': 'put', 'id': doc_id, 'row': row,
+                'document': documents[index] if documents is not None else previous.get('document'),
+                'metadata': metadatas[index] if metadatas is not None else previous.get('metadata', {}),
+            })
+        self._append(records)
+        self._open_vectors(first_row + new_rows)
+        self._apply(records)
+        self._maybe_compact()
+
+    def _write(self, operation, ids, embeddings, documents, metadatas):
+        with self._lock:
+            self._refresh()
+            getattr(self, f"_{operation}")(ids, embeddings, documents, metadatas)
+
+    def _add(self, ids, embeddings, documents, metadatas):
+        # Like Chroma, adding an existing id is a no-op
+        new = [index for index, doc_id in enumerate(ids) if doc_id not in self._entries]
+        if len(new) < len(ids):
+            self.logger.warning(f"Ignoring {len(ids) - len(new)} existing ids added to '{self.name}'")
+        if new:
+            self._put([ids[i] for i in new], _pick(embeddings, new), _pick(documents, new), _pick(metadatas, new))
+
+    def _upsert(self, ids, embeddings, documents, metadatas):
+        if embeddings is None and any(doc_id not in self._entries for doc_id in ids):
+            raise ValueError("Upserting new ids needs embeddings")
+        self._put(list(ids), embeddings, documents, metadatas)
+
+    def _update(self, ids, embeddings, documents, metadatas):
+        existing = [index for index, doc_id in enumerate(ids) if doc_id in self._entries]
+        if existing:
+            self._put([ids[i] for i in existing], _pick(embeddings, existing),
+                      _pick(documents, existing), _pick(metadatas, existing))
+
+    def _delete(self, ids=None, where=None):
+        with self._lock:
+            self._refresh()
+            doc_ids = self._select(ids, where) if ids is not None or where else []
+            if doc_ids:
+                records = [{'op': 'delete', 'id': doc_id} for doc_id in doc_ids]
+                self._append(records)
+                self._apply(records)
+                self._maybe_compact()
+
+    def _maybe_compact(self):
+        dead = self._rows - len(self._entries)
+        if dead >= COMPACT_MIN_DEAD_ROWS and dead > len(self._entries):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the vectors and the log with only the live entries, then swap them in."""
+        with self._lock:
+            self._refresh()
+            if self._dim is None:
+                return
+            doc_ids = list(self._entries)
+            rows = [self._entries[doc_id]['row'] for doc_id in doc_ids]
+            capacity = max(len(rows), INITIAL_CAPACITY)
+            tmp_vectors = self.vectors_path.with_name(f"{VECTORS_FILENAME}.{os.getpid()}.tmp")
+            tmp_log = self.log_path.with_name(f"{LOG_FILENAME}.{os.getpid()}.tmp")
+            compacted = np.memmap(tmp_vectors, dtype=np.float16, mode='w+', shape=(capacity, self._dim))
+            if rows:
+                compacted[:len(rows)] = self._vectors[rows]
+            compacted.flush()
+            del compacted
+            with tmp_log.open('wb') as f:
+                f.write(json.dumps({'op': 'init', 'dim': self._dim}).encode('utf-8') + b'\n')
+                for row, doc_id in enumerate(doc_ids):
+                    entry = self._entries[doc_id]
+                    record = {'op': 'put', 'id': doc_id, 'row': row, 'document': entry['document'],
+                              'metadata': entry['metadata']}
+                    f.write(json.dumps(record).encode('utf-8') + b'\n')
+            self._vectors = None
+            # Vectors first: a reader that sees the new log must find the matching matrix
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_log, self.log_path)
+            self.logger.debug(f"Compacted '{self.name}' from {self._rows} to {len(rows)} rows")
+            self._load()
+
+    # Reading
+
+    def _select(self, ids=None, where=None) -> List[str]:
+        doc_ids = [doc_id for doc_id in ids if doc_id in self._entries] if ids is not None else list(self._entries)
+        if where:
+            doc_ids = [doc_id for doc_id in doc_ids if _matches(self._entries[doc_id]['metadata'], where)]
+        return doc_ids
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        """Dot product of the query with every stored row."""
+        if self._matrix32 is None and self._rows * self._dim * 4 <= FLOAT32_CACHE_BYTES:
+            self._matrix32 = np.array(self._vectors[:self._rows], dtype=np.float32)
+        if self._matrix32 is not None:
+            return self._matrix32 @ query
+        scores = np.empty(self._rows, dtype=np.float32)
+        for start in range(0, self._rows, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, self._rows)
+            scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+        return scores
+
+    def _result(self, doc_ids, include) -> dict:
+        return {
+            'ids': doc_ids,
+            'documents': [self._entries[doc_id]['document'] for doc_id in doc_ids] if 'documents' in include else None,
+            'metadatas': [self._entries[doc_id]['metadata'] for doc_id in doc_ids] if 'metadatas' in include else None,
+            'embeddings': [self._vectors[self._entries[doc_id]['row']].astype(np.float32) for doc_id in doc_ids]
+            if 'embeddings' in include else None,
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('metadatas', 'documents')) -> dict:
+        with self._lock:
+            self._refresh()
+            doc_ids = self._select(ids, where)
+            start = offset or 0
+            doc_ids = doc_ids[start:start + limit] if limit is not None else doc_ids[start:]
+            return self._result(doc_ids, include)
+
+    def query(self, query_embeddings, n_results: int = 10, where=None,
+              include=('metadatas', 'documents', 'distances')) -> dict:
+        with self._lock:
+            self._refresh()
+            keys = ['ids'] + [key for key in ('documents', 'metadatas', 'embeddings', 'distances') if key in include]
+            results = {key: [] for key in keys}
+            if self._dim is None or not self._entries:
+                for _ in query_embeddings:
+                    for key in keys:
+                        results[key].append([])
+                return _with_excluded(results)
+
+            mask = self._live[:self._rows].copy()
+            if where:
+                allowed = np.zeros_like(mask)
+                allowed[[self._entries[doc_id]['row'] for doc_id in self._select(None, where)]] = True
+                mask &= allowed
+            for query in np.asarray(query_embeddings, dtype=np.float32):
+                # |x - q|^2 = |x|^2 - 2 x.q + |q|^2, so one matrix-vector product scores every row
+                distances = self._norms[:self._rows] - 2 * self._scores(query) + query @ query
+                distances[~mask] = np.inf
+                k = min(n_results, int(mask.sum()))
+                top = np.argpartition(distances, k - 1)[:k] if k > 0 else np.zeros(0, dtype=int)
+                top = top[np.argsort(distances[top], kind='stable')]
+                result = self._result([self._row_ids[row] for row in top], include)
+                result['distances'] = [float(distances[row]) for row in top]
+                for key in keys:
+                    results[key].append(result[key])
+            return _with_excluded(results)
+
+def _with_excluded(results: dict) -> dict:
+    # Chroma returns None for fields that were not included
+    for key in ('documents', 'metadatas', 'embeddings', 'distances'):
+        results.setdefault(key, None)
+    return results
+
+def _pick(values, indices):
+    if values is None:
+        return None
+    return [values[index] for index in indices]
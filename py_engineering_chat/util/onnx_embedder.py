@@ -0,0 +1,121 @@
+import inspect
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+# Same limit sentence_transformers applies to all-MiniLM-L6-v2
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+def _require_onnx():
+    """Fail with an install hint when the optional ONNX packages are missing."""
+    try:
+        # onnx is needed by the export and by quantize_dynamic, onnxruntime to run the model
+        import onnx
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(f"The onnx embedding backends need onnx and onnxruntime ({e}). "
+                          "Install them with the 'onnx' extra: pip install 'py_engineering_chat[onnx]'") from e
+
+def _hub_name(model_name: str) -> str:
+    # sentence_transformers resolves bare names like all-MiniLM-L6-v2 under the sentence-transformers org
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+def export_onnx_model(model_name: str, output_dir: Path, quantize: bool = True) -> Path:
+    """
+    Export the transformer behind a sentence-transformers model to ONNX and, when quantize
+    is set, apply dynamic int8 quantization to its weights. Returns the path of the model to load.
+    """
+    logger = get_configured_logger(__name__)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / 'model.onnx'
+    int8_path = output_dir / 'model.int8.onnx'
+
+    if not fp32_path.exists():
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+        logger.info(f"Exporting '{model_name}' to ONNX in {output_dir}")
+        tokenizer = AutoTokenizer.from_pretrained(_hub_name(model_name))
+        model = AutoModel.from_pretrained(_hub_name(model_name)).eval()
+        tokenizer.save_pretrained(str(output_dir))
+        sample = tokenizer(["export sample"], return_tensors='pt')
+        # The tokenizer's key order (input_ids, token_type_ids, attention_mask) is not the forward()
+        # order, so inputs go in by keyword and the graph inputs are named in signature order
+        parameters = inspect.signature(model.forward).parameters
+        input_names = [name for name in parameters if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+        with torch.no_grad():
+            torch.onnx.export(
+                model, ({name: sample[name] for name in input_names},), str(fp32_path),
+                input_names=input_names, output_names=['last_hidden_state'],
+                # Opset 17 has LayerNormalization as a single op, which newer exporters emit directly
+                dynamic_axes=dynamic_axes, opset_version=17
+            )
+
+    if not quantize:
+        return fp32_path
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info(f"Quantizing {fp32_path.name} to int8")
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+class OnnxEmbedder:
+    """
+    CPU embedding backend that runs a sentence-transformers model through ONNX Runtime.
+    Reproduces the model's mean pooling and L2 normalization, so vectors are interchangeable
+    with SentenceTransformer.encode up to quantization error.
+    """
+
+    def __init__(self, model_name: str, cache_dir, quantize: bool = True,
+                 max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH, intra_op_threads: Optional[int] = None):
+        _require_onnx()
+        import onnxruntime
+        from transformers import AutoTokenizer
+        self.logger = get_configured_logger(__name__)
+        self.model_name = model_name
+        self.max_seq_length = max_seq_length
+        model_dir = Path(cache_dir) / model_name.replace('/', '__')
+        model_path = export_onnx_model(model_name, model_dir, quantize=quantize)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = onnxruntime.InferenceSession(str(model_path), options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        # Tokenizers are not safe to call from several threads at once
+        self._tokenizer_lock = threading.Lock()
+        self.logger.debug(f"ONNX embedder ready: {model_path}")
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Batch texts of similar length together to keep padding small, then restore the input order
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        embeddings = [None] * len(texts)
+        for start in range(0, len(texts), batch_size):
+            indices = order[start:start + batch_size]
+            for index, vector in zip(indices, self._encode_batch([texts[i] for i in indices])):
+                embeddings[index] = vector
+
+        result = np.vstack(embeddings)
+        return result[0] if single else result
+
+    def _encode_batch(self, texts) -> np.ndarray:
+        with self._tokenizer_lock:
+            encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length,
+                                     return_tensors='np')
+        inputs = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real tokens, then L2 normalization, as in the model's sentence-transformers config
+        mask = encoded['attention_mask'][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
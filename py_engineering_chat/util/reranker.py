@@ -0,0 +1,50 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+DEFAULT_RERANK_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+DEFAULT_RERANK_FETCH_K = 50
+DEFAULT_RERANK_BUDGET_MS = 300
+# Documents are scored in small batches so the time budget is checked often
+RERANK_BATCH_SIZE = 8
+
+_cross_encoders: Dict[str, object] = {}
+_cross_encoder_lock = threading.Lock()
+
+def get_cross_encoder(model_name: str = DEFAULT_RERANK_MODEL):
+    """Return the shared CPU cross-encoder for model_name, loading it on first use."""
+    with _cross_encoder_lock:
+        model = _cross_encoders.get(model_name)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            get_configured_logger(__name__).debug(f"Loading cross-encoder '{model_name}'.")
+            model = CrossEncoder(model_name, device='cpu')
+            _cross_encoders[model_name] = model
+        return model
+
+def rerank(query: str, documents: List[str], k: int, model_name: str = DEFAULT_RERANK_MODEL,
+           time_budget_ms: Optional[float] = DEFAULT_RERANK_BUDGET_MS) -> List[int]:
+    """
+    Return the indices of the best k documents by cross-encoder score. Documents are scored in
+    their incoming (vector) order; once the time budget is spent the unscored rest keeps that order
+    behind the scored ones, so a slow query degrades to plain vector ranking instead of stalling.
+    """
+    logger = get_configured_logger(__name__)
+    model = get_cross_encoder(model_name)
+    # Loading the model is a one-off cost, so the budget only covers scoring
+    start = time.perf_counter()
+    deadline = start + time_budget_ms / 1000 if time_budget_ms else None
+
+    scores = []
+    for batch_start in range(0, len(documents), RERANK_BATCH_SIZE):
+        if deadline is not None and time.perf_counter() >= deadline:
+            logger.debug(f"Rerank budget of {time_budget_ms}ms spent after {len(scores)} of {len(documents)} documents.")
+            break
+        batch = documents[batch_start:batch_start + RERANK_BATCH_SIZE]
+        scores.extend(float(score) for score in model.predict([(query, document) for document in batch]))
+
+    scored = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+    order = scored + list(range(len(scores), len(documents)))
+    logger.debug(f"Reranked {len(scores)} documents in {(time.perf_counter() - start) * 1000:.0f}ms.")
+    return order[:k]
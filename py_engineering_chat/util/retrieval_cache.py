@@ -0,0 +1,90 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+from py_engineering_chat.util.collection_versions import get_collection_version
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 600
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace and trailing punctuation so trivially rephrased queries share an entry."""
+    return re.sub(r'\s+', ' ', query).strip().rstrip('?!.').strip().lower()
+
+class RetrievalCache:
+    """
+    In-memory LRU of search results keyed by (collection, collection version, normalized query, k, options).
+    Entries also expire after ttl_seconds. Because the collection version is part of the key, results
+    from before a scan or crawl are never served afterwards.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.logger = get_configured_logger(__name__)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, collection_name: str, query: str, k: int, compute: Callable[[], Any], options=()) -> Any:
+        key = (collection_name, get_collection_version(collection_name), normalize_query(query), k, tuple(options))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.logger.debug(f"Retrieval cache hit for {collection_name}: '{key[2]}' ({self.hit_ratio:.0%} hit ratio)")
+                return entry[1]
+            self.misses += 1
+
+        result = compute()
+        # Empty results usually mean a failed lookup; don't pin them for the whole TTL
+        if result:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        self.logger.debug(f"Retrieval cache miss for {collection_name}: '{key[2]}' ({self.hit_ratio:.0%} hit ratio)")
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'hit_ratio': self.hit_ratio}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"{stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries "
+                f"({stats['hit_ratio']:.0%} hit ratio)")
+
+_cache: Optional[RetrievalCache] = None
+_cache_lock = threading.Lock()
+
+def get_retrieval_cache(settings_manager=None) -> Optional[RetrievalCache]:
+    """Return the process-wide retrieval cache, or None when the retrieval_cache.enabled setting is false."""
+    global _cache
+    settings_manager = settings_manager or ChatSettingsManager()
+    if not settings_manager.get_setting('retrieval_cache.enabled', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = RetrievalCache(
+                max_entries=settings_manager.get_setting('retrieval_cache.max_entries', DEFAULT_MAX_ENTRIES),
+                ttl_seconds=settings_manager.get_setting('retrieval_cache.ttl_seconds', DEFAULT_TTL_SECONDS)
+            )
+        return _cache
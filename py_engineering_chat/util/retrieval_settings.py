@@ -0,0 +1,18 @@
+from py_engineering_chat.util.chat_settings_manager import ChatSettingsManager
+
+def get_retrieval_settings(collection_name: str, settings_manager=None) -> dict:
+    """
+    Return every retrieval option for one collection with a single read of the settings file.
+    Values under retrieval.collections.<name> win over the global retrieval values. For example:
+
+        "retrieval": {"rerank": false, "collections": {"codebase_myproject": {"rerank": true}}}
+    """
+    settings_manager = settings_manager or ChatSettingsManager()
+    retrieval = settings_manager.get_setting('retrieval', {}) or {}
+    settings = {key: value for key, value in retrieval.items() if key != 'collections'}
+    settings.update(retrieval.get('collections', {}).get(collection_name, {}))
+    return settings
+
+def get_retrieval_setting(collection_name: str, key: str, default=None, settings_manager=None):
+    """Look up one retrieval option for a collection; see get_retrieval_settings for precedence."""
+    return get_retrieval_settings(collection_name, settings_manager).get(key, default)
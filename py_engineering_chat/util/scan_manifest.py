@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+def file_sha256(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex sha256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ScanManifest:
+    """Per-collection record of the path, size, mtime and sha256 of every indexed file."""
+
+    def __init__(self, shadow_dir: str, collection_name: str):
+        self.collection_name = collection_name
+        self.manifest_dir = Path(shadow_dir) / '.scan_manifests'
+        self.manifest_file = self.manifest_dir / f"{collection_name}.json"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Set while a scan is running; a manifest still marked in progress on disk means the scan was interrupted
+        self.in_progress = False
+        # The scan pipeline records and looks up entries from several threads
+        self._lock = threading.Lock()
+        # The writer checkpoints after every batch, so saves are serialized on their own lock
+        self._save_lock = threading.Lock()
+
+    def load(self) -> 'ScanManifest':
+        if self.manifest_file.exists():
+            with self.manifest_file.open('r') as f:
+                data = json.load(f)
+            self.entries = data.get('files', {})
+            self.in_progress = data.get('in_progress', False)
+        return self
+
+    def was_interrupted(self) -> bool:
+        """Return True if the last scan written to disk never finished."""
+        if not self.manifest_file.exists():
+            return False
+        with self.manifest_file.open('r') as f:
+            return json.load(f).get('in_progress', False)
+
+    def begin_scan(self):
+        self.in_progress = True
+        self.save()
+
+    def finish_scan(self):
+        self.in_progress = False
+        self.save()
+
+    def save(self):
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so an interrupted save never leaves a truncated manifest
+        tmp_file = self.manifest_file.with_suffix('.json.tmp')
+        with self._save_lock:
+            with self._lock:
+                data = {'collection': self.collection_name, 'in_progress': self.in_progress, 'files': dict(self.entries)}
+            with tmp_file.open('w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.manifest_file)
+
+    def reset(self):
+        with self._lock:
+            self.entries = {}
+            self.in_progress = False
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(path)
+
+    def record(self, path: str, size: int, mtime: float, sha256: str):
+        with self._lock:
+            self.entries[path] = {'size': size, 'mtime': mtime, 'sha256': sha256}
+
+    def remove(self, path: str):
+        with self._lock:
+            self.entries.pop(path, None)
+
+    def paths(self):
+        with self._lock:
+            return set(self.entries.keys())
+
+    def contains_directory(self, directory: str) -> bool:
+        """Return True if any indexed file lives under the given relative directory."""
+        prefix = directory.rstrip('/') + '/'
+        with self._lock:
+            return any(path.startswith(prefix) for path in self.entries)
+
+    def classify(self, path: str, file_path) -> tuple[str, os.stat_result, Optional[str]]:
+        """
+        Compare a file on disk with its manifest entry.
+        Returns (status, stat, sha256) where status is 'added', 'updated' or 'unchanged'.
+        The hash is only computed when size or mtime differ from the recorded values.
+        """
+        stat = os.stat(file_path)
+        entry = self.get(path)
+        if entry is None:
+            return 'added', stat, file_sha256(file_path)
+        if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return 'unchanged', stat, entry['sha256']
+        sha256 = file_sha256(file_path)
+        if sha256 == entry['sha256']:
+            # Touched but not modified; refresh the stat info so the next run takes the fast path
+            self.record(path, stat.st_size, stat.st_mtime, sha256)
+            return 'unchanged', stat, sha256
+        return 'updated', stat, sha256
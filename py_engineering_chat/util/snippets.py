@@ -0,0 +1,69 @@
+import re
+from collections import Counter
+from pydantic import BaseModel
+from typing import List, Optional
+from py_engineering_chat.util.lexical_index import tokenize_code
+
+DEFAULT_WINDOW_LINES = 12
+
+# Header written by CodeChunk.document; whole-file documents from older scans have no line range
+_DOCUMENT_HEADER = re.compile(r'^Path: (?P<path>.+?)(?: \(lines (?P<start>\d+)-(?P<end>\d+)\))?\n\n', re.DOTALL)
+
+class Snippet(BaseModel):
+    path: str
+    start_line: int
+    end_line: int
+    lines: List[str]
+    # Line range of the stored document the window was cut from
+    document_start_line: int
+    document_end_line: int
+
+    def format(self) -> str:
+        numbered = '\n'.join(f"{self.start_line + offset}: {line}" for offset, line in enumerate(self.lines))
+        header = f"{self.path}:{self.start_line}-{self.end_line}"
+        if (self.start_line, self.end_line) != (self.document_start_line, self.document_end_line):
+            header += f" (matched chunk spans lines {self.document_start_line}-{self.document_end_line})"
+        return f"{header}\n{numbered}"
+
+def parse_document(document: str):
+    """Split a stored codebase document into (path, first line number, content lines)."""
+    match = _DOCUMENT_HEADER.match(document)
+    if not match:
+        return None, 1, document.splitlines()
+    start_line = int(match.group('start')) if match.group('start') else 1
+    return match.group('path'), start_line, document[match.end():].splitlines()
+
+def best_window(query: str, lines: List[str], window_lines: int = DEFAULT_WINDOW_LINES) -> int:
+    """
+    Return the offset of the window of window_lines lines that best matches the query. Each line
+    scores the query terms it contains, weighted by how rare the term is within the document,
+    so a line naming the queried identifier beats one that merely repeats 'self'.
+    """
+    if len(lines) <= window_lines:
+        return 0
+    terms = set(tokenize_code(query))
+    line_terms = [set(tokenize_code(line)) & terms for line in lines]
+    frequency = Counter(term for matched in line_terms for term in matched)
+    scores = [sum(1.0 / frequency[term] for term in matched) for matched in line_terms]
+
+    best_offset, best_score = 0, sum(scores[:window_lines])
+    window_score = best_score
+    for offset in range(1, len(lines) - window_lines + 1):
+        window_score += scores[offset + window_lines - 1] - scores[offset - 1]
+        if window_score > best_score + 1e-9:
+            best_offset, best_score = offset, window_score
+    return best_offset
+
+def extract_snippet(query: str, document: str, window_lines: int = DEFAULT_WINDOW_LINES) -> Optional[Snippet]:
+    """Cut the best-matching window of lines out of a stored document, or None if it has no header."""
+    path, start_line, lines = parse_document(document)
+    if path is None:
+        return None
+    # Trailing blank lines are not worth spending the window on
+    while lines and not lines[-1].strip():
+        lines.pop()
+    offset = best_window(query, lines, window_lines)
+    window = lines[offset:offset + window_lines]
+    return Snippet(path=path, start_line=start_line + offset, end_line=start_line + offset + len(window) - 1,
+                   lines=window, document_start_line=start_line,
+                   document_end_line=start_line + max(len(lines), 1) - 1)
@@ -0,0 +1,241 @@
+import ast
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Iterable, List, Optional, Tuple
+
+class Symbol(BaseModel):
+    name: str
+    qualname: str
+    kind: str
+    path: str
+    start_line: int
+    end_line: int
+
+class _PythonSymbolVisitor(ast.NodeVisitor):
+    def __init__(self, path: str):
+        self.path = path
+        self.symbols: List[Symbol] = []
+        self.imports: List[str] = []
+        self._scope: List[Tuple[str, str]] = []
+
+    def _add(self, node, name: str, kind: str):
+        qualname = '.'.join([scope_name for scope_name, _ in self._scope] + [name])
+        start = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+        self.symbols.append(Symbol(name=name, qualname=qualname, kind=kind, path=self.path,
+                                   start_line=start, end_line=getattr(node, 'end_lineno', None) or node.lineno))
+
+    def visit_ClassDef(self, node):
+        self._add(node, node.name, 'class')
+        self._scope.append((node.name, 'class'))
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node):
+        in_class = bool(self._scope) and self._scope[-1][1] == 'class'
+        self._add(node, node.name, 'method' if in_class else 'function')
+        self._scope.append((node.name, 'function'))
+        self.generic_visit(node)
+        self._scope.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Assign(self, node):
+        # Module and class level names only; locals inside functions are not definitions worth indexing
+        if not self._scope or self._scope[-1][1] == 'class':
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self._add(node, target.id, 'variable')
+
+    def visit_AnnAssign(self, node):
+        if isinstance(node.target, ast.Name) and (not self._scope or self._scope[-1][1] == 'class'):
+            self._add(node, node.target.id, 'variable')
+
+    def visit_Import(self, node):
+        self.imports.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node):
+        module = '.' * node.level + (node.module or '')
+        self.imports.append(module)
+
+def extract_python_symbols(path: str, content: str) -> Tuple[List[Symbol], List[str]]:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return extract_symbols_regex(path, content)
+    visitor = _PythonSymbolVisitor(path)
+    visitor.visit(tree)
+    return visitor.symbols, list(dict.fromkeys(visitor.imports))
+
+# Definition and import patterns for languages without a parser here; each yields (kind, name)
+_DEFINITION_PATTERNS = [
+    ('class', re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:public\s+|private\s+|protected\s+|internal\s+)?'
+                         r'(?:abstract\s+|final\s+|static\s+|sealed\s+)*(?:class|interface|enum|struct|trait|module|record)\s+([A-Za-z_]\w*)')),
+    ('function', re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)')),
+    ('function', re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>')),
+    ('function', re.compile(r'^\s*func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)')),
+    ('class', re.compile(r'^\s*type\s+([A-Za-z_]\w*)\s+(?:struct|interface)\b')),
+    ('function', re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+([A-Za-z_]\w*)')),
+    ('function', re.compile(r'^\s*def\s+(?:self\.)?([A-Za-z_]\w*[?!]?)')),
+]
+_IMPORT_PATTERNS = [
+    re.compile(r'^\s*import\s+(?:[\w*{}\s,]+\s+from\s+)?[\'"]([^\'"]+)[\'"]'),
+    re.compile(r'require\(\s*[\'"]([^\'"]+)[\'"]\s*\)'),
+    re.compile(r'^\s*import\s+(?:static\s+)?([\w.]+)\s*;'),
+    re.compile(r'^\s*use\s+([\w:]+)'),
+    re.compile(r'^\s*(?:import\s+)?(?:\w+\s+)?"([\w./-]+)"\s*$'),
+]
+
+def extract_symbols_regex(path: str, content: str) -> Tuple[List[Symbol], List[str]]:
+    """Line-based fallback: finds definitions by keyword. End lines are unknown, so spans cover one line."""
+    symbols, imports = [], []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        for kind, pattern in _DEFINITION_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                name = match.group(1)
+                symbols.append(Symbol(name=name, qualname=name, kind=kind, path=path,
+                                      start_line=line_number, end_line=line_number))
+                break
+        for pattern in _IMPORT_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                imports.append(match.group(1))
+                break
+    return symbols, list(dict.fromkeys(imports))
+
+def extract_symbols(path: str, content: str) -> Tuple[List[Symbol], List[str]]:
+    """Return the definitions in a file and the modules it imports."""
+    if path.endswith(('.py', '.pyi')):
+        return extract_python_symbols(path, content)
+    return extract_symbols_regex(path, content)
+
+class SymbolIndex:
+    """
+    Per-collection table of definitions and import edges, stored in sqlite in the AI shadow directory.
+    Lookups by name or qualified name go through an index, and files are replaced one at a time
+    so the table is updated alongside the collection.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS symbols ("
+            "name TEXT NOT NULL, qualname TEXT NOT NULL, kind TEXT NOT NULL, path TEXT NOT NULL, "
+            "start_line INTEGER NOT NULL, end_line INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS symbols_qualname ON symbols (qualname)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS imports (path TEXT NOT NULL, module TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS imports_module ON imports (module)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS imports_path ON imports (path)")
+        self._conn.commit()
+
+    @staticmethod
+    def path_for_collection(shadow_dir, collection_name: str) -> Path:
+        return Path(shadow_dir) / '.symbol_index' / f"{collection_name}.sqlite"
+
+    @classmethod
+    def for_collection(cls, shadow_dir, collection_name: str) -> 'SymbolIndex':
+        return cls(cls.path_for_collection(shadow_dir, collection_name))
+
+    def update_files(self, files: Iterable[Tuple[str, List[Symbol], List[str]]]):
+        """Replace the symbols and imports of each (path, symbols, imports) entry."""
+        with self._lock:
+            for path, symbols, imports in files:
+                self._delete_path(path)
+                self._conn.executemany(
+                    "INSERT INTO symbols (name, qualname, kind, path, start_line, end_line) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(s.name, s.qualname, s.kind, s.path, s.start_line, s.end_line) for s in symbols]
+                )
+                self._conn.executemany("INSERT INTO imports (path, module) VALUES (?, ?)",
+                                       [(path, module) for module in imports])
+            self._conn.commit()
+
+    def delete_paths(self, paths: Iterable[str]):
+        with self._lock:
+            for path in paths:
+                self._delete_path(path)
+            self._conn.commit()
+
+    def _delete_path(self, path: str):
+        self._conn.execute("DELETE FROM symbols WHERE path = ?", (path,))
+        self._conn.execute("DELETE FROM imports WHERE path = ?", (path,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM symbols")
+            self._conn.execute("DELETE FROM imports")
+            self._conn.commit()
+
+    def lookup(self, name: str, limit: int = 20) -> List[Symbol]:
+        """Find definitions by bare name ('run') or qualified name ('ScanPipeline.run')."""
+        column = 'qualname' if '.' in name else 'name'
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT name, qualname, kind, path, start_line, end_line FROM symbols WHERE {column} = ? "
+                "ORDER BY CASE kind WHEN 'class' THEN 0 WHEN 'function' THEN 1 WHEN 'method' THEN 2 ELSE 3 END, path "
+                "LIMIT ?", (name, limit)
+            ).fetchall()
+        return [Symbol(name=row[0], qualname=row[1], kind=row[2], path=row[3], start_line=row[4], end_line=row[5])
+                for row in rows]
+
+    def importers(self, module: str) -> List[str]:
+        """Return the paths that import module or one of its submodules."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT path FROM imports WHERE module = ? OR module LIKE ? ORDER BY path",
+                (module, f"{module}.%")
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def imports_of(self, path: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT module FROM imports WHERE path = ?", (path,)).fetchall()
+        return [row[0] for row in rows]
+
+    def indexed_paths(self) -> set:
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM symbols UNION SELECT path FROM imports").fetchall()
+        return {row[0] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def format_symbol_definitions(symbols: List[Symbol], project_dir: Optional[str], max_lines: int = 60) -> str:
+    """Render definitions with their location and, when the file is readable, their source lines."""
+    sections = []
+    for symbol in symbols:
+        header = f"{symbol.kind} {symbol.qualname} - {symbol.path}:{symbol.start_line}-{symbol.end_line}"
+        source = ''
+        if project_dir:
+            try:
+                with open(Path(project_dir) / symbol.path, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.read().splitlines()
+                end_line = min(symbol.end_line, symbol.start_line + max_lines - 1)
+                source = '\n'.join(f"{number}: {lines[number - 1]}" for number in range(symbol.start_line, end_line + 1)
+                                   if number <= len(lines))
+                if end_line < symbol.end_line:
+                    source += f"\n... ({symbol.end_line - end_line} more lines)"
+            except OSError:
+                pass
+        sections.append(f"{header}\n{source}" if source else header)
+    return '\n\n'.join(sections)
+
+def open_project_symbol_index(settings_manager, project_name: Optional[str] = None) -> Optional[SymbolIndex]:
+    """Return the symbol index of a scanned project (the current one by default), or None if there is none."""
+    project_name = project_name or settings_manager.get_setting('current_project')
+    if not project_name:
+        return None
+    index_path = SymbolIndex.path_for_collection(settings_manager.get_ai_shadow_directory(), f"codebase_{project_name}")
+    if not index_path.exists():
+        return None
+    return SymbolIndex(index_path)
@@ -0,0 +1,28 @@
+import re
+from typing import Optional
+from py_engineering_chat.util.context_model import ContextData
+from py_engineering_chat.util.logger_util import get_configured_logger
+from py_engineering_chat.util.symbol_index import format_symbol_definitions, open_project_symbol_index
+
+def handle_symbol_query(user_input: str, settings_manager, deadline: Optional[float] = None) -> ContextData:
+    logger = get_configured_logger(__name__)
+    logger.debug(f"Handling symbol query: {user_input}")
+
+    symbol_index = open_project_symbol_index(settings_manager)
+    if symbol_index is None:
+        logger.error("No symbol index for the current project.")
+        return ContextData(context=["Error: No symbol index for the current project. Run scan-project first."])
+
+    current_project = settings_manager.get_setting('current_project')
+    project_dir = settings_manager.get_project_index_directory(current_project)
+    context_data = ContextData(context_description="Definitions of the symbols the user referenced.")
+    try:
+        for name in re.findall(r'@symbol:([\w.]+)', user_input):
+            symbols = symbol_index.lookup(name)
+            if symbols:
+                context_data.context.append(format_symbol_definitions(symbols, project_dir))
+            else:
+                context_data.context.append(f"No definition found for '{name}'.")
+    finally:
+        symbol_index.close()
+    return context_data
@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from py_engineering_chat.util import chroma_pool
+from py_engineering_chat.util.collection_versions import bump_collection_version
+from py_engineering_chat.util.logger_util import get_configured_logger
+
+# Chroma rejects larger writes; other backends just get the same batches, which keeps benchmarks comparable
+MAX_BATCH_SIZE = 5000
+DEFAULT_PAGE_SIZE = 1000
+
+def _is_stale_handle_error(error: Exception) -> bool:
+    """Whether error means the collection behind a handle was deleted or recreated since it was opened."""
+    # Chroma has raised this as InvalidCollectionException, NotFoundError and a plain ValueError across versions
+    return (type(error).__name__ in ('InvalidCollectionException', 'NotFoundError')
+            or 'does not exist' in str(error))
+
+class VectorStore(ABC):
+    """
+    A named collection of embeddings with their documents and metadata. Methods follow the Chroma
+    Collection API (where filters, include lists, result dicts), so backends are interchangeable.
+    Writes are split into batches here and, for stores opened through vector_store_pool, bump the
+    collection version so cached search results for it are invalidated.
+    """
+
+    name: str
+    # Set by open_vector_store; None for stores opened directly, which then skip version bumps
+    shadow_dir: Optional[str] = None
+
+    def add(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Insert new ids; ids that already exist are left unchanged."""
+        self._write_batches('add', ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self._write_batches('upsert', ids, embeddings, documents, metadatas)
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Change existing ids; fields passed as None keep their stored values."""
+        self._write_batches('update', ids, embeddings, documents, metadatas)
+
+    def delete(self, ids=None, where=None):
+        """Delete the given ids and/or everything matching where; with neither, nothing is deleted."""
+        if ids is None and not where:
+            return
+        self._delete(ids=ids, where=where)
+        self._changed()
+
+    def iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, where=None,
+                   include=('documents', 'metadatas')) -> Iterator[dict]:
+        """Yield get() results page by page, so large collections are never loaded at once."""
+        offset = 0
+        while True:
+            page = self.get(where=where, limit=page_size, offset=offset, include=list(include))
+            if not page['ids']:
+                return
+            yield page
+            offset += len(page['ids'])
+
+    def _write_batches(self, operation, ids, embeddings, documents, metadatas):
+        ids = list(ids)
+        for start in range(0, len(ids), MAX_BATCH_SIZE):
+            end = start + MAX_BATCH_SIZE
+            self._write(operation, ids[start:end],
+                        embeddings[start:end] if embeddings is not None else None,
+                        documents[start:end] if documents is not None else None,
+                        metadatas[start:end] if metadatas is not None else None)
+        if ids:
+            self._changed()
+
+    def _changed(self):
+        if self.shadow_dir is not None:
+            bump_collection_version(self.name, self.shadow_dir)
+
+    @abstractmethod
+    def _write(self, operation: str, ids, embeddings, documents, metadatas):
+        """Apply one batch of an 'add', 'upsert' or 'update'."""
+
+    @abstractmethod
+    def _delete(self, ids=None, where=None):
+        pass
+
+    @abstractmethod
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('metadatas', 'documents')) -> dict:
+        pass
+
+    @abstractmethod
+    def query(self, query_embeddings, n_results: int = 10, where=None,
+              include=('metadatas', 'documents', 'distances')) -> dict:
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+class ChromaVectorStore(VectorStore):
+    """A Chroma collection behind the VectorStore interface, using the process-wide client pool."""
+
+    def __init__(self, name: str, path: Optional[str] = None, create: bool = False):
+        self.name = name
+        self.path = path
+        # Raises ValueError when the collection does not exist and create is not set
+        chroma_pool.get_collection(name, path, create=create)
+
+    def _call(self, operation):
+        """
+        Run operation on the pooled collection handle. A handle to a collection that was since
+        deleted or recreated elsewhere fails, so then the handle is refreshed and the call retried once.
+        Any other error propagates straight away; a partly applied write is never replayed.
+        """
+        try:
+            return operation(chroma_pool.get_collection(self.name, self.path))
+        except Exception as e:
+            if not _is_stale_handle_error(e):
+                raise
+            get_configured_logger(__name__).debug(f"Refreshing stale handle for collection '{self.name}': {e}")
+            chroma_pool.invalidate_collection(self.name, self.path)
+            return operation(chroma_pool.get_collection(self.name, self.path))
+
+    def _write(self, operation, ids, embeddings, documents, metadatas):
+        kwargs = {key: value for key, value in (('embeddings', embeddings), ('documents', documents),
+                                                ('metadatas', metadatas)) if value is not None}
+        if 'embeddings' in kwargs and not isinstance(kwargs['embeddings'], list):
+            kwargs['embeddings'] = kwargs['embeddings'].tolist()
+        self._call(lambda collection: getattr(collection, operation)(ids=ids, **kwargs))
+
+    def _delete(self, ids=None, where=None):
+        self._call(lambda collection: collection.delete(ids=ids, where=where))
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('metadatas', 'documents')) -> dict:
+        return self._call(lambda collection: collection.get(ids=ids, where=where, limit=limit, offset=offset,
+                                                            include=list(include)))
+
+    def query(self, query_embeddings, n_results: int = 10, where=None,
+              include=('metadatas', 'documents', 'distances')) -> dict:
+        return self._call(lambda collection: collection.query(query_embeddings=query_embeddings, n_results=n_results,
+                                                              where=where, include=list(include)))
+
+    def count(self) -> int:
+        return self._call(lambda collection: collection.count())
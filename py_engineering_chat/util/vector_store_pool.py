@@ -0,0 +1,89 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from py_engineering_chat.util import chroma_pool
+from py_engineering_chat.util.collection_versions import bump_collection_version
+from py_engineering_chat.util.numpy_vector_store import NumpyVectorStore
+from py_engineering_chat.util.retrieval_settings import get_retrieval_setting
+from py_engineering_chat.util.vector_store import ChromaVectorStore, VectorStore
+
+VECTOR_STORE_BACKENDS = ('chroma', 'numpy')
+
+# One store handle per (store path, collection) for the whole process
+_stores: Dict[Tuple[str, str], VectorStore] = {}
+_lock = threading.RLock()
+
+def get_vector_store_backend(name: str) -> str:
+    """Return the retrieval vector_store setting of a collection: 'chroma' (default) or 'numpy'."""
+    backend = get_retrieval_setting(name, 'vector_store', 'chroma')
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unknown vector store '{backend}' for collection '{name}'. Choose one of: {', '.join(VECTOR_STORE_BACKENDS)}")
+    return backend
+
+def _numpy_root(path: Optional[str] = None) -> str:
+    # NumPy collections live next to the Chroma store, one directory each
+    path = os.path.abspath(path) if path else chroma_pool.get_chroma_path()
+    return os.path.join(os.path.dirname(path), '.numpy_vectors')
+
+def open_vector_store(name: str, path: Optional[str] = None, create: bool = False) -> VectorStore:
+    """
+    Return the cached store for a collection, with the backend its vector_store setting selects.
+    path is the Chroma store path; it defaults to the one in the AI shadow directory.
+    Raises ValueError when the collection does not exist, unless create is set.
+    """
+    path = os.path.abspath(path) if path else chroma_pool.get_chroma_path()
+    key = (path, name)
+    with _lock:
+        store = _stores.get(key)
+        if store is None:
+            if get_vector_store_backend(name) == 'numpy':
+                directory = os.path.join(_numpy_root(path), name)
+                if not create and not NumpyVectorStore.exists(directory):
+                    raise ValueError(f"Collection {name} does not exist.")
+                store = NumpyVectorStore(directory, name)
+            else:
+                store = ChromaVectorStore(name, path, create=create)
+            store.shadow_dir = os.path.dirname(path)
+            _stores[key] = store
+        return store
+
+def vector_store_exists(name: str, path: Optional[str] = None) -> bool:
+    try:
+        open_vector_store(name, path)
+        return True
+    except ValueError:
+        return False
+
+def delete_vector_store(name: str, path: Optional[str] = None) -> bool:
+    """Delete a collection if it exists and drop its cached handle. Returns True if one was deleted."""
+    path = os.path.abspath(path) if path else chroma_pool.get_chroma_path()
+    with _lock:
+        _stores.pop((path, name), None)
+        if get_vector_store_backend(name) == 'numpy':
+            deleted = NumpyVectorStore.destroy(os.path.join(_numpy_root(path), name))
+        else:
+            deleted = chroma_pool.delete_collection(name, path)
+        if deleted:
+            # Results cached for the old collection must not outlive it
+            bump_collection_version(name, os.path.dirname(path))
+        return deleted
+
+def recreate_vector_store(name: str, path: Optional[str] = None) -> VectorStore:
+    """Replace a collection with an empty one and cache the new handle."""
+    with _lock:
+        delete_vector_store(name, path)
+        return open_vector_store(name, path, create=True)
+
+def list_vector_stores(path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Return (name, backend) for every collection in the Chroma store and the NumPy directory."""
+    path = os.path.abspath(path) if path else chroma_pool.get_chroma_path()
+    collections = []
+    if os.path.isdir(path):
+        collections.extend((collection.name, 'chroma')
+                           for collection in chroma_pool.get_chroma_client(path).list_collections())
+    numpy_root = Path(_numpy_root(path))
+    if numpy_root.is_dir():
+        collections.extend((directory.name, 'numpy') for directory in sorted(numpy_root.iterdir())
+                           if NumpyVectorStore.exists(directory))
+    return collections